@@ -0,0 +1,31 @@
+"""add hnsw index on knowledge_bases.embedding
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # rag_query orders by `embedding <-> :embedding` (L2), so the index uses vector_l2_ops.
+    # OpenAI embeddings are unit length, which makes L2 order identical to cosine order.
+    # CONCURRENTLY keeps the table writable while the graph is built; it cannot run in a transaction.
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_kb_embedding_hnsw ON knowledge_bases "
+            "USING hnsw (embedding vector_l2_ops) WITH (m = 16, ef_construction = 64)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_kb_embedding_hnsw")
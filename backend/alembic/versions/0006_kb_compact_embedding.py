@@ -0,0 +1,42 @@
+"""add half-precision compact embedding to knowledge_bases
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import HALFVEC
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # First 512 dimensions of the text-embedding-3 vector, re-normalized, stored as halfvec:
+    # 1 KB per chunk instead of 6 KB. New uploads write both columns; existing rows are
+    # filled by `python -m app.scripts.kb_compact_backfill_runner`.
+    op.add_column('knowledge_bases', sa.Column('embedding_compact', HALFVEC(512), nullable=True))
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_kb_embedding_compact_hnsw ON knowledge_bases "
+            "USING hnsw (embedding_compact halfvec_l2_ops) WITH (m = 16, ef_construction = 64)"
+        )
+        # 64-byte binary codes for the coarse first pass of KB_VECTOR_SEARCH=binary_rerank.
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_kb_embedding_binary_hnsw ON knowledge_bases "
+            "USING hnsw ((binary_quantize(embedding_compact)::bit(512)) bit_hamming_ops) "
+            "WITH (m = 16, ef_construction = 64)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_kb_embedding_binary_hnsw")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_kb_embedding_compact_hnsw")
+    op.drop_column('knowledge_bases', 'embedding_compact')
@@ -0,0 +1,38 @@
+"""add full-text search column and per-business retrieval weights
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Lexical leg of hybrid retrieval: catches SKUs, prices and names that embeddings blur.
+    op.execute(
+        "ALTER TABLE knowledge_bases ADD COLUMN content_tsv tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('english', content)) STORED"
+    )
+    op.add_column('businesses', sa.Column('kb_vector_weight', sa.Float(), nullable=True))
+    op.add_column('businesses', sa.Column('kb_lexical_weight', sa.Float(), nullable=True))
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_kb_content_tsv ON knowledge_bases USING gin (content_tsv)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_kb_content_tsv")
+    op.drop_column('businesses', 'kb_lexical_weight')
+    op.drop_column('businesses', 'kb_vector_weight')
+    op.drop_column('knowledge_bases', 'content_tsv')
@@ -0,0 +1,36 @@
+"""add content hash to knowledge_bases for incremental ingestion
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # sha256 of the chunk text; re-uploads keep rows (and embeddings) whose hash is unchanged.
+    op.add_column('knowledge_bases', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.execute(
+        "UPDATE knowledge_bases SET content_hash = encode(sha256(convert_to(content, 'UTF8')), 'hex') "
+        "WHERE content_hash IS NULL"
+    )
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_kb_business_content_hash "
+            "ON knowledge_bases (business_id, content_hash)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_kb_business_content_hash")
+    op.drop_column('knowledge_bases', 'content_hash')
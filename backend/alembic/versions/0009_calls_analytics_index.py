@@ -0,0 +1,30 @@
+"""add covering index on calls for analytics
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # analytics.summary/series filter on (business_id, started_at) and only read status and
+    # duration_seconds; INCLUDE lets both run as index-only scans once the table is vacuumed.
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_calls_business_started_at "
+            "ON calls (business_id, started_at) INCLUDE (status, duration_seconds)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_calls_business_started_at")
@@ -0,0 +1,41 @@
+"""add call_daily_stats rollup table
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Filled for existing calls by `python -m app.scripts.call_stats_runner`.
+    op.create_table(
+        'call_daily_stats',
+        sa.Column('business_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('call_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('duration_sum', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('duration_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('escalated_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('escalation_reasons', postgresql.JSONB(), nullable=False, server_default='{}'),
+        sa.Column('transferred_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('sentiment_sum', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('sentiment_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True)),
+        sa.ForeignKeyConstraint(['business_id'], ['businesses.id']),
+        sa.PrimaryKeyConstraint('business_id', 'day'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('call_daily_stats')
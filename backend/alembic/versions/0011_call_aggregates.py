@@ -0,0 +1,77 @@
+"""add per-call turn, sentiment and latency aggregates to calls
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+_COLUMNS = [
+    ('turn_count', sa.Integer()),
+    ('customer_message_count', sa.Integer()),
+    ('ai_message_count', sa.Integer()),
+    ('sentiment_avg', sa.Float()),
+    ('sentiment_min', sa.Float()),
+    ('ai_latency_avg_ms', sa.Float()),
+    ('ai_latency_p95_ms', sa.Float()),
+    ('ai_latency_max_ms', sa.Float()),
+]
+
+
+def upgrade() -> None:
+    for name, type_ in _COLUMNS:
+        op.add_column('calls', sa.Column(name, type_, nullable=True))
+    # Finished calls get the same figures from their messages and turn_latency events;
+    # new calls have them written by the call loop at hangup.
+    op.execute(
+        """
+        UPDATE calls AS c
+        SET turn_count = m.customer_messages,
+            customer_message_count = m.customer_messages,
+            ai_message_count = m.ai_messages,
+            sentiment_avg = m.sentiment_avg,
+            sentiment_min = m.sentiment_min
+        FROM (
+            SELECT call_id,
+                   count(*) FILTER (WHERE sender = 'customer') AS customer_messages,
+                   count(*) FILTER (WHERE sender = 'ai') AS ai_messages,
+                   avg(sentiment_score) AS sentiment_avg,
+                   min(sentiment_score) AS sentiment_min
+            FROM call_messages
+            GROUP BY call_id
+        ) AS m
+        WHERE m.call_id = c.id AND c.ended_at IS NOT NULL
+        """
+    )
+    op.execute(
+        """
+        UPDATE calls AS c
+        SET ai_latency_avg_ms = l.avg_ms,
+            ai_latency_p95_ms = l.p95_ms,
+            ai_latency_max_ms = l.max_ms
+        FROM (
+            SELECT call_id,
+                   avg((details->>'total_ms')::float) AS avg_ms,
+                   percentile_cont(0.95) WITHIN GROUP (ORDER BY (details->>'total_ms')::float) AS p95_ms,
+                   max((details->>'total_ms')::float) AS max_ms
+            FROM call_events
+            WHERE event_type = 'turn_latency'
+            GROUP BY call_id
+        ) AS l
+        WHERE l.call_id = c.id AND c.ended_at IS NOT NULL
+        """
+    )
+
+
+def downgrade() -> None:
+    for name, _ in reversed(_COLUMNS):
+        op.drop_column('calls', name)
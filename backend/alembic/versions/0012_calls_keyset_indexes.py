@@ -0,0 +1,36 @@
+"""add keyset pagination indexes on calls
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0012'
+down_revision = '0011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # list_calls pages with WHERE (started_at, id) < (:started_at, :id) ORDER BY started_at DESC, id DESC.
+    # Staff only list calls escalated to them, which the partial index serves on its own.
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_calls_business_started_id "
+            "ON calls (business_id, started_at DESC, id DESC)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_calls_escalated_to_started_id "
+            "ON calls (escalated_to_user_id, started_at DESC, id DESC) "
+            "WHERE escalated_to_user_id IS NOT NULL"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_calls_escalated_to_started_id")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_calls_business_started_id")
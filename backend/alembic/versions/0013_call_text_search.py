@@ -0,0 +1,41 @@
+"""add full-text search columns on call_messages and calls
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0013'
+down_revision = '0012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # GET /calls/search matches transcripts turn by turn and call summaries.
+    op.execute(
+        "ALTER TABLE call_messages ADD COLUMN content_tsv tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('english', content)) STORED"
+    )
+    op.execute(
+        "ALTER TABLE calls ADD COLUMN summary_tsv tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('english', coalesce(summary, ''))) STORED"
+    )
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_call_messages_content_tsv "
+            "ON call_messages USING gin (content_tsv)"
+        )
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_calls_summary_tsv ON calls USING gin (summary_tsv)")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_calls_summary_tsv")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_call_messages_content_tsv")
+    op.drop_column('calls', 'summary_tsv')
+    op.drop_column('call_messages', 'content_tsv')
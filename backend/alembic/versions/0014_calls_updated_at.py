@@ -0,0 +1,73 @@
+"""add calls.updated_at, kept current by triggers, and index call_events by call
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0014'
+down_revision = '0013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The call detail ETag. Messages and events are written by the call loop, webhooks and
+    # the API, so the database bumps it rather than every writer remembering to.
+    op.add_column(
+        'calls',
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+    )
+    op.execute("UPDATE calls SET updated_at = coalesce(ended_at, started_at, updated_at)")
+    op.execute(
+        """
+        CREATE FUNCTION calls_touch_updated_at() RETURNS trigger AS $$
+        BEGIN
+            NEW.updated_at := clock_timestamp();
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE FUNCTION calls_touch_from_child() RETURNS trigger AS $$
+        BEGIN
+            UPDATE calls SET updated_at = clock_timestamp()
+            WHERE id = CASE WHEN TG_OP = 'DELETE' THEN OLD.call_id ELSE NEW.call_id END;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        "CREATE TRIGGER calls_touch_updated_at BEFORE UPDATE ON calls "
+        "FOR EACH ROW EXECUTE FUNCTION calls_touch_updated_at()"
+    )
+    for table in ('call_messages', 'call_events'):
+        op.execute(
+            f"CREATE TRIGGER {table}_touch_call AFTER INSERT OR UPDATE OR DELETE ON {table} "
+            "FOR EACH ROW EXECUTE FUNCTION calls_touch_from_child()"
+        )
+    # Call detail aggregates a call's events by call_id, oldest first.
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_call_events_call_id_timestamp "
+            "ON call_events (call_id, timestamp)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_call_events_call_id_timestamp")
+    for table in ('call_events', 'call_messages'):
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_touch_call ON {table}")
+    op.execute("DROP TRIGGER IF EXISTS calls_touch_updated_at ON calls")
+    op.execute("DROP FUNCTION IF EXISTS calls_touch_from_child()")
+    op.execute("DROP FUNCTION IF EXISTS calls_touch_updated_at()")
+    op.drop_column('calls', 'updated_at')
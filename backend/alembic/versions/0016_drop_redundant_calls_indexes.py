@@ -0,0 +1,33 @@
+"""drop calls indexes superseded by the keyset index
+
+Revision ID: 0016
+Revises: 0015
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0016'
+down_revision = '0015'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # ix_calls_business_started_id (business_id, started_at DESC, id DESC) serves every
+    # business_id and (business_id, started_at) lookup, and analytics now reads
+    # call_daily_stats rather than scanning calls, so these only slow down inserts.
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_calls_business_id")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_calls_business_started_at")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_calls_business_started_at "
+            "ON calls (business_id, started_at) INCLUDE (status, duration_seconds)"
+        )
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_calls_business_id ON calls (business_id)")
@@ -0,0 +1,43 @@
+"""drop the per-row call_messages/call_events triggers that touched calls
+
+Revision ID: 0017
+Revises: 0016
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0017'
+down_revision = '0016'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Each message or event row updated (and locked) its calls row, several times per live
+    # turn. The call detail ETag now reads the children's count and newest timestamp
+    # instead; calls_touch_updated_at still stamps updates of the call itself.
+    for table in ('call_events', 'call_messages'):
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_touch_call ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS calls_touch_from_child()")
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+        CREATE FUNCTION calls_touch_from_child() RETURNS trigger AS $$
+        BEGIN
+            UPDATE calls SET updated_at = clock_timestamp()
+            WHERE id = CASE WHEN TG_OP = 'DELETE' THEN OLD.call_id ELSE NEW.call_id END;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for table in ('call_messages', 'call_events'):
+        op.execute(
+            f"CREATE TRIGGER {table}_touch_call AFTER INSERT OR UPDATE OR DELETE ON {table} "
+            "FOR EACH ROW EXECUTE FUNCTION calls_touch_from_child()"
+        )
@@ -37,15 +37,73 @@ class Settings(BaseSettings):
     redis_url: str = "redis://localhost:6379/0"
     upstash_redis_rest_url: str | None = None
     upstash_redis_rest_token: str | None = None
+    kb_hnsw_ef_search: int = 80
+    # Opt-in (relaxed_order or strict_order); needs pgvector >= 0.8, older servers reject the setting.
+    kb_hnsw_iterative_scan: str | None = None
+    # full (float32 1536-d), compact (halfvec 512-d) or binary_rerank (binary 512-d pass, re-ranked on full vectors).
+    kb_vector_search: str = "full"
+    kb_rerank_candidates: int = 40
+    # Hybrid retrieval: vector and full-text candidates merged by weighted reciprocal rank fusion.
+    kb_hybrid_enabled: bool = True
+    kb_hybrid_candidates: int = 20
+    kb_rrf_k: int = 60
+    kb_vector_weight: float = 1.0
+    kb_lexical_weight: float = 1.0
+    # Retrieval over-fetches kb_context_candidates chunks; MMR and merging keep what fits the budget.
+    kb_context_candidates: int = 8
+    kb_context_max_chunks: int = 5
+    kb_context_mmr_lambda: float = 0.7
+    kb_context_token_budget: int = 600
+    kb_chunk_tokens: int = 200
+    # Upload embedding requests: the API accepts up to 2048 inputs / 300k tokens per call.
+    kb_embed_batch_size: int = 256
+    kb_embed_batch_tokens: int = 200_000
+    kb_embed_concurrency: int = 4
+    # Businesses with at most kb_memory_index_max_rows chunks are searched in process memory.
+    kb_memory_index_enabled: bool = True
+    kb_memory_index_max_rows: int = 5000
+    kb_memory_index_budget_mb: int = 256
+    embedding_cache_max_entries: int = 2000
+    embedding_cache_ttl_seconds: int = 86400
+    answer_cache_enabled: bool = True
+    answer_cache_threshold: float = 0.93
+    answer_cache_max_entries: int = 200
+    answer_cache_ttl_seconds: int = 86400
+    # Per-worker memory for cached answers (embeddings and audio) across all businesses.
+    answer_cache_budget_mb: int = 64
+    # Authenticated users are cached in Redis this long (0 disables the principal cache).
+    auth_principal_cache_seconds: int = 60
+    # PBKDF2-SHA256 work factor; stored hashes with other round counts are rehashed at login.
+    password_hash_rounds: int = 29000
+    password_hash_workers: int = 2
+    # Logins/registrations beyond this many queued hashes get 503 instead of waiting.
+    password_hash_max_pending: int = 32
 
     openai_api_key: str
+    openai_base_url: str | None = None
     openai_primary_model: str = "gpt-4o-mini"
     openai_complex_model: str = "gpt-4o"
+    openai_max_concurrency: int = 64
+    openai_tenant_concurrency: int = 8
+    openai_realtime_deadline_seconds: float = 6.0
+    openai_classify_deadline_seconds: float = 1.5
+    openai_embed_deadline_seconds: float = 2.0
+    openai_background_deadline_seconds: float = 90.0
+    openai_hedge_enabled: bool = True
     deepgram_api_key: str
+    deepgram_base_url: str | None = None
+    stt_pool_size: int = 2
+    stt_pool_max_idle_seconds: float = 300.0
+    stt_replay_buffer_ms: int = 3000
+    turn_prediction_enabled: bool = True
+    turn_commit_threshold: float = 0.75
+    turn_min_silence_ms: int = 200
     elevenlabs_api_key: str
     elevenlabs_voice_id: str | None = None
+    elevenlabs_base_url: str = "https://api.elevenlabs.io"
     telnyx_api_key: str
     telnyx_webhook_secret: str | None = None
+    telnyx_api_base: str | None = None
     telnyx_audio_format: str = "mulaw"
     telnyx_sample_rate: int = 8000
     ffmpeg_path: str | None = None
@@ -68,8 +126,13 @@ class Settings(BaseSettings):
 
     call_audio_ttl_days: int = 30
     rate_limit_per_minute: int = 120
+    rate_limit_enabled: bool = True
     public_base_url: str | None = None
 
+    metrics_multiproc_dir: str | None = None
+    metrics_flush_seconds: float = 5.0
+    metrics_token: str | None = None
+
     @field_validator("openai_api_key", "deepgram_api_key", "elevenlabs_api_key", "telnyx_api_key", mode="before")
     @classmethod
     def strip_keys(cls, v: Any) -> Any:
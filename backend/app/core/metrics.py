@@ -0,0 +1,400 @@
+"""Low-overhead Prometheus-style metrics.
+
+Recording is a plain attribute update on a pre-bound child (`labels()` once, then
+`inc`/`observe` on the hot path), so it stays well under a microsecond. Each uvicorn
+worker keeps its own registry; when `METRICS_MULTIPROC_DIR` is set, workers flush a
+JSON snapshot there periodically and `/metrics` merges every live worker's snapshot.
+Counters and histograms are summed across workers, gauges get a `worker` label.
+"""
+
+import asyncio
+import bisect
+import json
+import os
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+import httpx
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = tuple[str, ...]
+
+
+class CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class GaugeChild(CounterChild):
+    __slots__ = ()
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+
+class HistogramChild:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, "_Metric"] = {}
+
+    def register(self, metric: "_Metric") -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Duplicate metric: {metric.name}")
+        self._metrics[metric.name] = metric
+
+    def snapshot(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "time": time.time(),
+            "metrics": {name: metric.snapshot() for name, metric in self._metrics.items()},
+        }
+
+
+REGISTRY = Registry()
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        registry: Registry = REGISTRY,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._children: dict[LabelValues, object] = {}
+        registry.register(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: object):
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children[key] = self._new_child()
+        return child
+
+    def _samples(self) -> list[list]:
+        return [[list(key), child.value] for key, child in self._children.items()]
+
+    def snapshot(self) -> dict:
+        return {
+            "kind": self.kind,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "samples": self._samples(),
+        }
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> CounterChild:
+        return CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._function: Callable[[], dict[LabelValues, float] | float] | None = None
+
+    def _new_child(self) -> GaugeChild:
+        return GaugeChild()
+
+    def set_function(self, function: Callable[[], dict[LabelValues, float] | float]) -> None:
+        """Compute the gauge at collection time instead of on the hot path."""
+        self._function = function
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.labels().dec(amount)
+
+    def _samples(self) -> list[list]:
+        if self._function is None:
+            return super()._samples()
+        values = self._function()
+        if not isinstance(values, dict):
+            values = {(): values}
+        return [[list(key), float(value)] for key, value in values.items()]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: tuple[float, ...] = DEFAULT_BUCKETS, **kwargs) -> None:
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(*args, **kwargs)
+
+    def _new_child(self) -> HistogramChild:
+        return HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def snapshot(self) -> dict:
+        data = super().snapshot()
+        data["buckets"] = list(self.buckets)
+        return data
+
+    def _samples(self) -> list[list]:
+        return [
+            [list(key), {"counts": list(child.counts), "sum": child.sum}] for key, child in self._children.items()
+        ]
+
+
+# Snapshot files and exposition
+
+
+def _snapshot_path(directory: str, pid: int) -> Path:
+    return Path(directory) / f"metrics-{pid}.json"
+
+
+def write_snapshot(directory: str, snapshot: dict) -> None:
+    path = _snapshot_path(directory, snapshot["pid"])
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(snapshot), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def remove_snapshot(directory: str) -> None:
+    _snapshot_path(directory, os.getpid()).unlink(missing_ok=True)
+
+
+def read_snapshots(directory: str, max_age_seconds: float) -> list[dict]:
+    snapshots = []
+    cutoff = time.time() - max_age_seconds
+    for path in Path(directory).glob("metrics-*.json"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                continue
+            snapshots.append(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError):
+            continue
+    return snapshots
+
+
+async def flush_periodically(directory: str, interval_seconds: float) -> None:
+    Path(directory).mkdir(parents=True, exist_ok=True)
+    while True:
+        # Snapshot on the event loop so label children are not mutated mid-copy; only the write is offloaded.
+        await asyncio.to_thread(write_snapshot, directory, REGISTRY.snapshot())
+        await asyncio.sleep(interval_seconds)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: list[str], values: list[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+def render(snapshots: list[dict]) -> str:
+    merged: dict[str, dict] = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot["metrics"].items():
+            target = merged.setdefault(name, {**metric, "samples": {}})
+            labelnames = metric["labelnames"]
+            if metric["kind"] == "gauge":
+                target["labelnames"] = [*labelnames, "worker"]
+            for labels, value in metric["samples"]:
+                if metric["kind"] == "gauge":
+                    key = (*labels, str(snapshot["pid"]))
+                    target["samples"][key] = value
+                elif metric["kind"] == "counter":
+                    key = tuple(labels)
+                    target["samples"][key] = target["samples"].get(key, 0.0) + value
+                else:
+                    key = tuple(labels)
+                    current = target["samples"].get(key)
+                    if current is None:
+                        target["samples"][key] = {"counts": list(value["counts"]), "sum": value["sum"]}
+                    else:
+                        current["counts"] = [a + b for a, b in zip(current["counts"], value["counts"])]
+                        current["sum"] += value["sum"]
+
+    lines: list[str] = []
+    for name, metric in sorted(merged.items()):
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['kind']}")
+        names = metric["labelnames"]
+        for labels, value in sorted(metric["samples"].items()):
+            labels = list(labels)
+            if metric["kind"] != "histogram":
+                lines.append(f"{name}{_label_text(names, labels)} {_format_value(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip([*metric["buckets"], float("inf")], value["counts"]):
+                cumulative += count
+                bucket_labels = _label_text([*names, "le"], [*labels, _format_value(bound)])
+                lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{name}_sum{_label_text(names, labels)} {_format_value(value['sum'])}")
+            lines.append(f"{name}_count{_label_text(names, labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+# Application metrics
+
+ACTIVE_CALLS = Gauge("sharpmind_active_calls", "Calls currently handled by this worker.")
+MEDIA_FRAMES = Counter("sharpmind_media_frames_total", "Telnyx media frames by direction.", ("direction",))
+MEDIA_QUEUE_DEPTH = Gauge(
+    "sharpmind_media_queue_depth", "Frames waiting in CallMediaChannels queues.", ("direction", "stat")
+)
+DB_POOL_CHECKED_OUT = Gauge("sharpmind_db_pool_checked_out", "Database connections checked out of the pool.")
+DB_POOL_WAIT = Histogram("sharpmind_db_pool_wait_seconds", "Time spent obtaining a pooled DB connection.")
+REDIS_ROUND_TRIPS = Histogram("sharpmind_redis_round_trip_seconds", "Redis round trips by operation.", ("op",))
+PROVIDER_LATENCY = Histogram(
+    "sharpmind_provider_request_seconds", "Outbound provider request latency.", ("vendor",)
+)
+PROVIDER_ERRORS = Counter("sharpmind_provider_errors_total", "Outbound provider request errors.", ("vendor",))
+OPENAI_GATEWAY_OUTCOMES = Counter(
+    "sharpmind_openai_gateway_total", "OpenAI gateway outcomes by purpose.", ("purpose", "outcome")
+)
+EMBEDDING_CACHE = Counter(
+    "sharpmind_embedding_cache_total", "Query embedding lookups by result.", ("result",)
+)
+ANSWER_CACHE = Counter("sharpmind_answer_cache_total", "Semantic answer cache events.", ("result",))
+VECTOR_INDEX = Counter("sharpmind_vector_index_total", "In-memory vector index events.", ("result",))
+PASSWORD_HASH_PENDING = Gauge("sharpmind_password_hash_pending", "Password hashes running or queued on this worker.")
+PASSWORD_HASH_REJECTED = Counter(
+    "sharpmind_password_hash_rejected_total", "Password hashes refused because the hashing queue was full."
+)
+PRINCIPAL_CACHE = Counter(
+    "sharpmind_principal_cache_total", "Authenticated principal lookups by result.", ("result",)
+)
+VECTOR_INDEX_BYTES = Gauge("sharpmind_vector_index_bytes", "Memory held by in-memory vector indexes.")
+WEBHOOK_DELIVERIES = Counter(
+    "sharpmind_action_deliveries_total", "Action point delivery outcomes.", ("action_type", "status")
+)
+HTTP_LATENCY = Histogram(
+    "sharpmind_http_request_seconds", "HTTP request latency by route.", ("method", "route", "status")
+)
+TURN_STAGE_LATENCY = Histogram(
+    "sharpmind_turn_stage_seconds",
+    "Voice pipeline stage latency per turn.",
+    ("stage",),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+
+@contextmanager
+def track_provider(vendor: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        PROVIDER_ERRORS.labels(vendor).inc()
+        raise
+    finally:
+        PROVIDER_LATENCY.labels(vendor).observe(time.perf_counter() - started)
+
+
+class MeteredTransport(httpx.AsyncBaseTransport):
+    """httpx transport that records provider latency (to response headers) and errors."""
+
+    def __init__(self, vendor: str, transport: httpx.AsyncBaseTransport | None = None) -> None:
+        self._transport = transport or httpx.AsyncHTTPTransport()
+        self._latency = PROVIDER_LATENCY.labels(vendor)
+        self._errors = PROVIDER_ERRORS.labels(vendor)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception:
+            self._errors.inc()
+            raise
+        finally:
+            self._latency.observe(time.perf_counter() - started)
+        if response.status_code >= 400:
+            self._errors.inc()
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class HTTPMetricsMiddleware:
+    """ASGI middleware recording request latency by route template."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # FastAPI routes expose their path template; plain Starlette routes (docs) only the endpoint.
+            route = scope.get("route")
+            endpoint = scope.get("endpoint")
+            path = route.path if route is not None else getattr(endpoint, "__name__", "unmatched")
+            HTTP_LATENCY.labels(scope["method"], path, status_code).observe(time.perf_counter() - started)
@@ -5,4 +5,8 @@ from app.core.config import get_settings
 
 
 settings = get_settings()
-limiter = Limiter(key_func=get_remote_address, default_limits=[f"{settings.rate_limit_per_minute}/minute"])
+limiter = Limiter(
+    key_func=get_remote_address,
+    default_limits=[f"{settings.rate_limit_per_minute}/minute"],
+    enabled=settings.rate_limit_enabled,
+)
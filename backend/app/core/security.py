@@ -1,14 +1,34 @@
+import asyncio
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from functools import lru_cache
+from typing import Any, TypeVar
 import hashlib
 
 import jwt
 from passlib.context import CryptContext
 
 from app.core.config import get_settings
+from app.core.metrics import PASSWORD_HASH_PENDING, PASSWORD_HASH_REJECTED
 
 
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+T = TypeVar("T")
+
+
+@lru_cache
+def get_pwd_context() -> CryptContext:
+    # Hashes made with any other round count are flagged for rehash on the next login,
+    # so PASSWORD_HASH_ROUNDS can be tuned in either direction.
+    rounds = get_settings().password_hash_rounds
+    return CryptContext(
+        schemes=["pbkdf2_sha256"],
+        deprecated="auto",
+        pbkdf2_sha256__default_rounds=rounds,
+        pbkdf2_sha256__min_rounds=rounds,
+        pbkdf2_sha256__max_rounds=rounds,
+    )
 
 
 def _normalize_password(password: str) -> str:
@@ -19,17 +39,92 @@ def _normalize_password(password: str) -> str:
 
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(_normalize_password(password))
+    return get_pwd_context().hash(_normalize_password(password))
 
 
 def verify_password(password: str, password_hash: str) -> bool:
-    return pwd_context.verify(_normalize_password(password), password_hash)
+    return get_pwd_context().verify(_normalize_password(password), password_hash)
+
+
+def verify_and_update_password(password: str, password_hash: str) -> tuple[bool, str | None]:
+    """Whether the password matches, and a new hash when the stored one uses outdated settings."""
+    return get_pwd_context().verify_and_update(_normalize_password(password), password_hash)
+
+
+class PasswordHasherBusy(Exception):
+    """More password hashes are waiting than PASSWORD_HASH_MAX_PENDING allows."""
+
+
+class PasswordHasher:
+    """Runs password hashing on a small dedicated thread pool.
+
+    A hash takes tens of milliseconds of CPU; run inline it stalls the event loop,
+    including live media sockets. hashlib releases the GIL while hashing, so the pool
+    also hashes in parallel. Requests beyond `max_pending` fail fast with
+    PasswordHasherBusy (503) instead of queueing without bound.
+    """
+
+    def __init__(self, workers: int, max_pending: int) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._max_pending = max_pending
+        self._lock = threading.Lock()
+        self.pending = 0
+
+    def _release(self, _future: Future | None) -> None:
+        with self._lock:
+            self.pending -= 1
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        with self._lock:
+            if self.pending >= self._max_pending:
+                PASSWORD_HASH_REJECTED.inc()
+                raise PasswordHasherBusy()
+            self.pending += 1
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._release(None)
+            raise
+        # A cancelled caller (client disconnect) leaves the hash running, so the slot is
+        # only freed when the job itself finishes.
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_hasher: PasswordHasher | None = None
+
+
+def get_password_hasher() -> PasswordHasher:
+    global _hasher
+    if _hasher is None:
+        settings = get_settings()
+        _hasher = PasswordHasher(settings.password_hash_workers, settings.password_hash_max_pending)
+        PASSWORD_HASH_PENDING.set_function(lambda: _hasher.pending if _hasher is not None else 0)
+    return _hasher
+
+
+def shutdown_password_hasher() -> None:
+    global _hasher
+    if _hasher is not None:
+        _hasher.shutdown()
+        _hasher = None
+
+
+async def hash_password_async(password: str) -> str:
+    return await get_password_hasher().run(hash_password, password)
+
+
+async def verify_and_update_password_async(password: str, password_hash: str) -> tuple[bool, str | None]:
+    return await get_password_hasher().run(verify_and_update_password, password, password_hash)
 
 
-def create_access_token(subject: str, expires_minutes: int = 60 * 24) -> str:
+def create_access_token(subject: str, token_version: int = 0, expires_minutes: int = 60 * 24) -> str:
     settings = get_settings()
     expire = datetime.now(timezone.utc) + timedelta(minutes=expires_minutes)
-    payload: dict[str, Any] = {"sub": subject, "exp": expire}
+    payload: dict[str, Any] = {"sub": subject, "ver": token_version, "exp": expire}
     return jwt.encode(payload, settings.jwt_secret, algorithm="HS256")
 
 
@@ -1,10 +1,24 @@
 import enum
 import uuid
-from datetime import datetime
-
-from pgvector.sqlalchemy import Vector
-from sqlalchemy import DateTime, Enum, Float, ForeignKey, Index, Integer, String, Text
-from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID
+from datetime import date, datetime
+
+from pgvector.sqlalchemy import HALFVEC, Vector
+from sqlalchemy import (
+    BigInteger,
+    Computed,
+    Date,
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    func,
+    text,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TSVECTOR, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -43,6 +57,9 @@ class Business(Base):
     phone_number: Mapped[str] = mapped_column(String(32), unique=True, nullable=False)
     owner_user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    # Rank fusion weights for knowledge base retrieval; NULL uses KB_VECTOR_WEIGHT / KB_LEXICAL_WEIGHT.
+    kb_vector_weight: Mapped[float | None] = mapped_column(Float, nullable=True)
+    kb_lexical_weight: Mapped[float | None] = mapped_column(Float, nullable=True)
 
     users: Mapped[list["User"]] = relationship(back_populates="business")
 
@@ -57,6 +74,8 @@ class User(Base):
     phone: Mapped[str | None] = mapped_column(String(32))
     push_token: Mapped[str | None] = mapped_column(String(512))
     password_hash: Mapped[str] = mapped_column(String(255), nullable=False)
+    # Carried as the "ver" claim; bumping it revokes the user's outstanding tokens.
+    token_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
 
     business: Mapped["Business"] = relationship(back_populates="users")
 
@@ -66,6 +85,23 @@ class KnowledgeBase(Base):
     __table_args__ = (
         Index("ix_kb_business_id", "business_id"),
         Index("ix_kb_business_category", "business_id", "category"),
+        Index(
+            "ix_kb_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_l2_ops"},
+        ),
+        Index(
+            "ix_kb_embedding_compact_hnsw",
+            "embedding_compact",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding_compact": "halfvec_l2_ops"},
+        ),
+        Index("ix_kb_content_tsv", "content_tsv", postgresql_using="gin"),
+        Index("ix_kb_business_content_hash", "business_id", "content_hash"),
+        # ix_kb_embedding_binary_hnsw (binary_quantize expression index) is managed by migration 0006.
     )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -73,7 +109,13 @@ class KnowledgeBase(Base):
     category: Mapped[str] = mapped_column(String(255), nullable=False)
     content: Mapped[str] = mapped_column(Text, nullable=False)
     chunk_index: Mapped[int] = mapped_column(Integer, default=0)
-    embedding: Mapped[list[float]] = mapped_column(Vector(1536))
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    # Vectors are deferred so listing or editing chunks doesn't pull 6 KB per row.
+    embedding: Mapped[list[float]] = mapped_column(Vector(1536), deferred=True)
+    embedding_compact: Mapped[list[float] | None] = mapped_column(HALFVEC(512), nullable=True, deferred=True)
+    content_tsv: Mapped[str | None] = mapped_column(
+        TSVECTOR, Computed("to_tsvector('english', content)", persisted=True), deferred=True
+    )
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
 
 
@@ -92,9 +134,20 @@ class EscalationRule(Base):
 class Call(Base):
     __tablename__ = "calls"
     __table_args__ = (
-        Index("ix_calls_business_id", "business_id"),
         Index("ix_calls_caller_number", "caller_number"),
         Index("ix_calls_started_at", "started_at"),
+        # Keyset pagination of call lists (ORDER BY started_at DESC, id DESC), for owners
+        # and for staff, who only see calls escalated to them; also the only business_id
+        # index, serving exports and per-business lookups.
+        Index("ix_calls_business_started_id", "business_id", text("started_at DESC"), text("id DESC")),
+        Index(
+            "ix_calls_escalated_to_started_id",
+            "escalated_to_user_id",
+            text("started_at DESC"),
+            text("id DESC"),
+            postgresql_where=text("escalated_to_user_id IS NOT NULL"),
+        ),
+        Index("ix_calls_summary_tsv", "summary_tsv", postgresql_using="gin"),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -106,18 +159,58 @@ class Call(Base):
     status: Mapped[CallStatus] = mapped_column(
         Enum(CallStatus, native_enum=False), default=CallStatus.completed
     )
-    transcript: Mapped[str | None] = mapped_column(Text)
+    # Never served by the API; deferred so loading calls doesn't pull full transcripts.
+    transcript: Mapped[str | None] = mapped_column(Text, deferred=True)
     summary: Mapped[str | None] = mapped_column(Text)
     action_points: Mapped[dict | None] = mapped_column(JSONB)
     audio_url: Mapped[str | None] = mapped_column(String(1024))
     escalated_to_user_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True))
+    # Written once at hangup from the call loop's running totals (services/call_stats.py).
+    turn_count: Mapped[int | None] = mapped_column(Integer)
+    customer_message_count: Mapped[int | None] = mapped_column(Integer)
+    ai_message_count: Mapped[int | None] = mapped_column(Integer)
+    sentiment_avg: Mapped[float | None] = mapped_column(Float)
+    sentiment_min: Mapped[float | None] = mapped_column(Float)
+    ai_latency_avg_ms: Mapped[float | None] = mapped_column(Float)
+    ai_latency_p95_ms: Mapped[float | None] = mapped_column(Float)
+    ai_latency_max_ms: Mapped[float | None] = mapped_column(Float)
+    summary_tsv: Mapped[str | None] = mapped_column(
+        TSVECTOR, Computed("to_tsvector('english', coalesce(summary, ''))", persisted=True), deferred=True
+    )
+    # Set by a trigger on every update of the row (migration 0014); the call detail ETag
+    # combines it with the count and newest timestamp of the call's messages and events.
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     messages: Mapped[list["CallMessage"]] = relationship(back_populates="call")
     events: Mapped[list["CallEvent"]] = relationship(back_populates="call")
 
 
+class CallDailyStats(Base):
+    """Per-business, per-UTC-day call totals read by the analytics endpoints.
+
+    Incremented when a call ends (services/call_stats.py) and recomputed from the raw
+    tables by `python -m app.scripts.call_stats_runner`.
+    """
+
+    __tablename__ = "call_daily_stats"
+
+    business_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("businesses.id"), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    call_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    duration_sum: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    duration_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    escalated_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # {"Keyword rule match": 3, ...}: escalated calls by the reason of their first escalation.
+    escalation_reasons: Mapped[dict] = mapped_column(JSONB, default=dict, nullable=False)
+    transferred_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    sentiment_sum: Mapped[float] = mapped_column(Float, default=0, nullable=False)
+    sentiment_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+
+
 class CallEvent(Base):
     __tablename__ = "call_events"
+    __table_args__ = (Index("ix_call_events_call_id_timestamp", "call_id", "timestamp"),)
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     call_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("calls.id"))
@@ -130,7 +223,10 @@ class CallEvent(Base):
 
 class CallMessage(Base):
     __tablename__ = "call_messages"
-    __table_args__ = (Index("ix_call_messages_call_id", "call_id"),)
+    __table_args__ = (
+        Index("ix_call_messages_call_id", "call_id"),
+        Index("ix_call_messages_content_tsv", "content_tsv", postgresql_using="gin"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     call_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("calls.id"))
@@ -138,6 +234,9 @@ class CallMessage(Base):
     content: Mapped[str] = mapped_column(Text, nullable=False)
     timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
     sentiment_score: Mapped[float | None] = mapped_column(Float)
+    content_tsv: Mapped[str | None] = mapped_column(
+        TSVECTOR, Computed("to_tsvector('english', content)", persisted=True), deferred=True
+    )
 
     call: Mapped["Call"] = relationship(back_populates="messages")
 
@@ -1,13 +1,31 @@
+import time
 from collections.abc import AsyncGenerator
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import get_settings
+from app.core.metrics import DB_POOL_CHECKED_OUT, DB_POOL_WAIT
+
+
+_pool_wait = DB_POOL_WAIT.labels()
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            _pool_wait.observe(time.perf_counter() - started)
 
 
 settings = get_settings()
-engine = create_async_engine(settings.database_url, pool_pre_ping=True)
+engine = create_async_engine(settings.database_url, pool_pre_ping=True, poolclass=TimedQueuePool)
 AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+DB_POOL_CHECKED_OUT.set_function(lambda: engine.pool.checkedout())
 
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.security import decode_token
 from app.db.models import User, UserRole
 from app.db.session import get_session
+from app.services.principal_cache import cache_principal, get_principal
 
 
 security = HTTPBearer()
@@ -27,12 +28,20 @@ async def get_current_user(
     user_id = payload.get("sub")
     try:
         user_uuid = UUID(str(user_id))
+        token_version = int(payload.get("ver", 0))
     except Exception as exc:  # noqa: BLE001
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token") from exc
+    # Cached principals are detached; see services/principal_cache.py before mutating one.
+    user = await get_principal(user_uuid, token_version)
+    if user is not None:
+        return user
     result = await session.execute(select(User).where(User.id == user_uuid))
     user = result.scalar_one_or_none()
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    if user.token_version != token_version:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
+    await cache_principal(user)
     return user
 
 
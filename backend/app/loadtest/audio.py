@@ -0,0 +1,45 @@
+import wave
+from pathlib import Path
+
+import numpy as np
+
+
+SAMPLE_RATE = 8000
+FRAME_BYTES = 160  # 20 ms of 8 kHz mu-law
+MULAW_SILENCE = 0xFF
+
+
+def encode_mulaw(samples: np.ndarray) -> bytes:
+    pcm = np.clip(samples.astype(np.int32), -32635, 32635)
+    sign = np.where(pcm < 0, 0x80, 0x00)
+    magnitude = np.abs(pcm) + 0x84
+    exponent = np.clip(np.floor(np.log2(magnitude)).astype(np.int32) - 7, 0, 7)
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    return (~(sign | (exponent << 4) | mantissa) & 0xFF).astype(np.uint8).tobytes()
+
+
+def synthetic_utterance(seconds: float = 1.2, frequency: float = 220.0) -> bytes:
+    """A voiced-sounding tone with a syllable-rate envelope, loud enough to trip VAD."""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    envelope = 0.6 + 0.4 * np.sin(2 * np.pi * 4 * t)
+    samples = 8000 * envelope * np.sin(2 * np.pi * frequency * t)
+    return encode_mulaw(samples)
+
+
+def silence(seconds: float) -> bytes:
+    return bytes([MULAW_SILENCE]) * int(seconds * SAMPLE_RATE)
+
+
+def load_utterance(path: Path) -> bytes:
+    """Load raw 8 kHz mu-law (`.ulaw`/`.raw`) or a mono 16-bit 8 kHz WAV recording."""
+    if path.suffix.lower() == ".wav":
+        with wave.open(str(path), "rb") as handle:
+            if handle.getsampwidth() != 2 or handle.getnchannels() != 1 or handle.getframerate() != SAMPLE_RATE:
+                raise ValueError(f"{path} must be mono 16-bit {SAMPLE_RATE} Hz")
+            samples = np.frombuffer(handle.readframes(handle.getnframes()), dtype=np.int16)
+        return encode_mulaw(samples)
+    return path.read_bytes()
+
+
+def frames(audio: bytes) -> list[bytes]:
+    return [audio[i : i + FRAME_BYTES] for i in range(0, len(audio), FRAME_BYTES)]
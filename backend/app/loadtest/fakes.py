@@ -0,0 +1,256 @@
+import asyncio
+import hashlib
+import json
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+
+import numpy as np
+from aiohttp import WSMsgType, web
+
+from app.loadtest.audio import synthetic_utterance
+from app.loadtest.latency import LatencyModel
+from app.services.vad import EnergyVAD
+
+
+StreamStartHandler = Callable[[str, str], Awaitable[None]]
+
+CALLER_SCRIPT = [
+    "What are your opening hours?",
+    "Do you take reservations for tonight?",
+    "How much is the delivery fee?",
+    "Can I speak to someone about my order?",
+]
+
+
+class FakeVendors:
+    """Local stand-ins for OpenAI, Deepgram, ElevenLabs and Telnyx on one aiohttp server.
+
+    The vendors' paths do not overlap, so each client is pointed at the same base
+    URL. Every vendor gets its own latency distribution.
+    """
+
+    def __init__(
+        self,
+        port: int,
+        latencies: dict[str, LatencyModel],
+        on_stream_start: StreamStartHandler,
+        token_gap_ms: float = 15.0,
+        endpointing_ms: float = 300.0,
+    ) -> None:
+        self.port = port
+        self._latencies = latencies
+        self._on_stream_start = on_stream_start
+        self._token_gap = token_gap_ms / 1000
+        self._endpointing_ms = endpointing_ms
+        self._runner: web.AppRunner | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def _app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/v1/responses", self._openai_responses)
+        app.router.add_post("/v1/embeddings", self._openai_embeddings)
+        app.router.add_get("/v1/listen", self._deepgram_listen)
+        app.router.add_post("/v1/text-to-speech/{voice_id}/stream", self._elevenlabs_stream)
+        app.router.add_post("/v2/calls/{call_control_id}/actions/{action}", self._telnyx_action)
+        return app
+
+    async def start(self) -> None:
+        self._runner = web.AppRunner(self._app())
+        await self._runner.setup()
+        await web.TCPSite(self._runner, "127.0.0.1", self.port).start()
+
+    async def stop(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        if self._runner:
+            await self._runner.cleanup()
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    # OpenAI
+
+    @staticmethod
+    def _reply_for(prompt: str) -> str:
+        if "Respond with only 'yes' or 'no'" in prompt or "requires escalation" in prompt:
+            return "no"
+        if "Extract action points" in prompt:
+            return "[]"
+        return "Thanks for asking. We are open from nine to five, Monday through Saturday."
+
+    @staticmethod
+    def _response_object(model: str, text: str) -> dict:
+        return {
+            "id": f"resp_{uuid.uuid4().hex}",
+            "object": "response",
+            "created_at": int(time.time()),
+            "model": model,
+            "status": "completed",
+            "parallel_tool_calls": True,
+            "tool_choice": "auto",
+            "tools": [],
+            "output": [
+                {
+                    "type": "message",
+                    "id": f"msg_{uuid.uuid4().hex}",
+                    "role": "assistant",
+                    "status": "completed",
+                    "content": [{"type": "output_text", "text": text, "annotations": []}],
+                }
+            ],
+        }
+
+    async def _openai_responses(self, request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        model = body.get("model", "")
+        text = self._reply_for(str(body.get("input", "")))
+        await self._latencies["openai"].sleep()
+        if not body.get("stream"):
+            return web.json_response(self._response_object(model, text))
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        sequence = 0
+
+        async def emit(event: dict) -> None:
+            nonlocal sequence
+            event["sequence_number"] = sequence
+            sequence += 1
+            await response.write(f"event: {event['type']}\ndata: {json.dumps(event)}\n\n".encode("utf-8"))
+
+        item_id = f"msg_{uuid.uuid4().hex}"
+        for index, word in enumerate(text.split(" ")):
+            if index:
+                await asyncio.sleep(self._token_gap)
+            await emit(
+                {
+                    "type": "response.output_text.delta",
+                    "item_id": item_id,
+                    "output_index": 0,
+                    "content_index": 0,
+                    "delta": word if index == 0 else f" {word}",
+                    "logprobs": [],
+                }
+            )
+        await emit({"type": "response.completed", "response": self._response_object(model, text)})
+        await response.write_eof()
+        return response
+
+    async def _openai_embeddings(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        inputs = body.get("input")
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        dimensions = int(body.get("dimensions") or 1536)
+        await self._latencies["openai"].sleep()
+        data = []
+        for index, text in enumerate(inputs):
+            seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+            vector = np.random.default_rng(seed).standard_normal(dimensions)
+            vector /= np.linalg.norm(vector)
+            data.append({"object": "embedding", "index": index, "embedding": vector.tolist()})
+        return web.json_response(
+            {
+                "object": "list",
+                "data": data,
+                "model": body.get("model", ""),
+                "usage": {"prompt_tokens": 0, "total_tokens": 0},
+            }
+        )
+
+    # Deepgram
+
+    @staticmethod
+    def _deepgram_result(text: str, is_final: bool) -> str:
+        return json.dumps(
+            {
+                "type": "Results",
+                "channel_index": [0, 1],
+                "duration": 0.0,
+                "start": 0.0,
+                "is_final": is_final,
+                "speech_final": is_final,
+                "from_finalize": False,
+                "channel": {"alternatives": [{"transcript": text, "confidence": 0.99, "words": []}]},
+                "metadata": {
+                    "request_id": uuid.uuid4().hex,
+                    "model_uuid": "",
+                    "model_info": {"name": "fake", "version": "0", "arch": "fake"},
+                },
+            }
+        )
+
+    async def _deepgram_listen(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        vad = EnergyVAD()
+        latency = self._latencies["deepgram"]
+        utterance = 0
+        speech_frames = 0
+        in_speech = False
+
+        async def finalize(text: str) -> None:
+            await latency.sleep()
+            if ws.closed:
+                return
+            await ws.send_str(self._deepgram_result(text, is_final=True))
+            await ws.send_str(json.dumps({"type": "UtteranceEnd", "channel": [0, 1], "last_word_end": 0.0}))
+
+        async for message in ws:
+            if message.type == WSMsgType.TEXT:
+                if "CloseStream" in message.data:
+                    break
+                continue
+            if message.type != WSMsgType.BINARY:
+                continue
+            text = CALLER_SCRIPT[utterance % len(CALLER_SCRIPT)]
+            if vad.process(message.data):
+                if not in_speech:
+                    in_speech = True
+                    speech_frames = 0
+                    await ws.send_str(json.dumps({"type": "SpeechStarted", "channel": [0, 1], "timestamp": 0.0}))
+                speech_frames += 1
+                # An interim with a growing prefix of the scripted line every ~300 ms of speech.
+                if speech_frames % 15 == 0:
+                    words = text.split(" ")
+                    partial = " ".join(words[: min(len(words), speech_frames // 15 + 1)])
+                    await ws.send_str(self._deepgram_result(partial, is_final=False))
+            elif in_speech and vad.silence_ms >= self._endpointing_ms:
+                in_speech = False
+                utterance += 1
+                self._spawn(finalize(text))
+        await ws.close()
+        return ws
+
+    # ElevenLabs
+
+    async def _elevenlabs_stream(self, request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        text = body.get("text", "")
+        audio = synthetic_utterance(seconds=max(0.5, len(text) / 15), frequency=330.0)
+        await self._latencies["elevenlabs"].sleep()
+        response = web.StreamResponse(headers={"Content-Type": "audio/mpeg"})
+        await response.prepare(request)
+        chunk_size = 1600
+        for i in range(0, len(audio), chunk_size):
+            await response.write(audio[i : i + chunk_size])
+        await response.write_eof()
+        return response
+
+    # Telnyx
+
+    async def _telnyx_action(self, request: web.Request) -> web.Response:
+        call_control_id = request.match_info["call_control_id"]
+        action = request.match_info["action"]
+        body = await request.json() if request.can_read_body else {}
+        await self._latencies["telnyx"].sleep()
+        if action == "streaming_start" and body.get("stream_url"):
+            self._spawn(self._on_stream_start(call_control_id, body["stream_url"]))
+        return web.json_response({"data": {"result": "ok"}})
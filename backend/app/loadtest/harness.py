@@ -0,0 +1,182 @@
+import asyncio
+import base64
+import json
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+import httpx
+from aiohttp import ClientSession, WSMsgType
+from nacl.signing import SigningKey
+
+from app.loadtest.audio import FRAME_BYTES, MULAW_SILENCE, frames
+from app.loadtest.latency import summarize
+
+
+@dataclass
+class LoadTestConfig:
+    target_url: str
+    to_number: str
+    calls: int = 10
+    concurrency: int = 10
+    turns: int = 3
+    ramp_seconds: float = 0.0
+    turn_timeout: float = 15.0
+    utterances: list[bytes] = field(default_factory=list)
+
+
+@dataclass
+class CallResult:
+    setup_ms: float | None = None
+    turn_latencies_ms: list[float] = field(default_factory=list)
+    error: str | None = None
+
+
+def sign_webhook(signing_key: SigningKey, body: bytes) -> dict[str, str]:
+    timestamp = str(int(time.time()))
+    signature = signing_key.sign(f"{timestamp}|".encode("utf-8") + body).signature
+    return {
+        "content-type": "application/json",
+        "telnyx-signature-ed25519": base64.b64encode(signature).decode("ascii"),
+        "telnyx-timestamp": timestamp,
+    }
+
+
+class CallerMedia:
+    """Plays the caller's side of a Telnyx media stream.
+
+    Audio frames go out in real time (silence between utterances, as Telnyx does)
+    and turn latency is measured from the last speech frame sent to the first
+    outbound media frame received after it.
+    """
+
+    def __init__(self, ws) -> None:
+        self._ws = ws
+        self._outgoing: deque[bytes] = deque()
+        self._last_frame_at = 0.0
+        self._first_frame_after: tuple[float, asyncio.Future] | None = None
+        self._speech_done: asyncio.Future | None = None
+
+    async def send_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        silence = bytes([MULAW_SILENCE]) * FRAME_BYTES
+        next_tick = loop.time()
+        while not self._ws.closed:
+            frame = self._outgoing.popleft() if self._outgoing else silence
+            payload = {"event": "media", "media": {"payload": base64.b64encode(frame).decode("ascii")}}
+            await self._ws.send_str(json.dumps(payload))
+            if not self._outgoing and self._speech_done and not self._speech_done.done():
+                self._speech_done.set_result(loop.time())
+            next_tick += 0.02
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+
+    async def receive_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        async for message in self._ws:
+            if message.type != WSMsgType.TEXT:
+                continue
+            if json.loads(message.data).get("event") != "media":
+                continue
+            now = loop.time()
+            self._last_frame_at = now
+            if self._first_frame_after:
+                since, waiter = self._first_frame_after
+                if now > since and not waiter.done():
+                    waiter.set_result(now)
+
+    async def wait_quiet(self, quiet: float = 0.5, timeout: float = 10.0) -> None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while loop.time() < deadline:
+            if self._last_frame_at and loop.time() - self._last_frame_at >= quiet:
+                return
+            await asyncio.sleep(0.05)
+
+    async def speak(self, utterance: bytes, timeout: float) -> float:
+        loop = asyncio.get_running_loop()
+        self._speech_done = loop.create_future()
+        self._outgoing.extend(frames(utterance))
+        spoken_at = await self._speech_done
+        waiter = loop.create_future()
+        self._first_frame_after = (spoken_at, waiter)
+        try:
+            replied_at = await asyncio.wait_for(waiter, timeout=timeout)
+        finally:
+            self._first_frame_after = None
+        return (replied_at - spoken_at) * 1000
+
+
+class LoadTest:
+    def __init__(self, config: LoadTestConfig, signing_key: SigningKey) -> None:
+        self.config = config
+        self._signing_key = signing_key
+        self._streams: dict[str, asyncio.Future] = {}
+        self.results: list[CallResult] = []
+
+    async def on_stream_start(self, call_control_id: str, stream_url: str) -> None:
+        waiter = self._streams.get(call_control_id)
+        if waiter and not waiter.done():
+            waiter.set_result(stream_url)
+
+    async def _run_call(self, index: int, client: httpx.AsyncClient, http: ClientSession) -> CallResult:
+        result = CallResult()
+        loop = asyncio.get_running_loop()
+        call_control_id = f"loadtest-{index}-{int(time.time() * 1000)}"
+        self._streams[call_control_id] = loop.create_future()
+        body = json.dumps(
+            {
+                "call_control_id": call_control_id,
+                "caller_number": f"+1555{index:07d}",
+                "to_number": self.config.to_number,
+            }
+        ).encode("utf-8")
+        started = loop.time()
+        try:
+            response = await client.post(
+                "/api/v1/calls/inbound", content=body, headers=sign_webhook(self._signing_key, body)
+            )
+            response.raise_for_status()
+            stream_url = await asyncio.wait_for(self._streams[call_control_id], timeout=30)
+            result.setup_ms = (loop.time() - started) * 1000
+            ws_url = stream_url.replace("https://", "wss://").replace("http://", "ws://")
+            async with http.ws_connect(ws_url) as ws:
+                media = CallerMedia(ws)
+                tasks = [asyncio.create_task(media.send_loop()), asyncio.create_task(media.receive_loop())]
+                try:
+                    await media.wait_quiet()
+                    for turn in range(self.config.turns):
+                        utterance = self.config.utterances[turn % len(self.config.utterances)]
+                        result.turn_latencies_ms.append(await media.speak(utterance, self.config.turn_timeout))
+                        await media.wait_quiet()
+                    await ws.send_str(json.dumps({"event": "stop"}))
+                finally:
+                    for task in tasks:
+                        task.cancel()
+        except Exception as exc:  # noqa: BLE001
+            result.error = f"{type(exc).__name__}: {exc}"
+        finally:
+            self._streams.pop(call_control_id, None)
+        return result
+
+    async def run(self) -> None:
+        semaphore = asyncio.Semaphore(self.config.concurrency)
+        delay = self.config.ramp_seconds / self.config.calls if self.config.calls else 0
+
+        async def bounded(index: int, client: httpx.AsyncClient, http: ClientSession) -> None:
+            await asyncio.sleep(index * delay)
+            async with semaphore:
+                self.results.append(await self._run_call(index, client, http))
+
+        async with httpx.AsyncClient(base_url=self.config.target_url, timeout=30) as client:
+            async with ClientSession() as http:
+                await asyncio.gather(*(bounded(i, client, http) for i in range(self.config.calls)))
+
+    def report(self) -> dict:
+        turns = [latency for result in self.results for latency in result.turn_latencies_ms]
+        errors = [result.error for result in self.results if result.error]
+        return {
+            "calls": {"total": len(self.results), "failed": len(errors)},
+            "errors": sorted(set(errors))[:10],
+            "setup_ms": summarize([r.setup_ms for r in self.results if r.setup_ms is not None]),
+            "turn_latency_ms": summarize(turns),
+        }
@@ -0,0 +1,80 @@
+import asyncio
+import random
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class LatencyModel:
+    """Latency distribution for a fake provider, parsed from `kind:arg[:arg]` specs.
+
+    Supported specs: `fixed:MS`, `uniform:LOW_MS:HIGH_MS` and `lognormal:MEDIAN_MS:SIGMA`.
+    """
+
+    kind: str
+    a: float
+    b: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        parts = spec.split(":")
+        kind = parts[0]
+        values = [float(part) for part in parts[1:]]
+        if kind == "fixed" and len(values) == 1:
+            return cls(kind, values[0])
+        if kind in {"uniform", "lognormal"} and len(values) == 2:
+            return cls(kind, values[0], values[1])
+        raise ValueError(f"Invalid latency spec: {spec}")
+
+    def sample_ms(self, rng: random.Random = random) -> float:
+        if self.kind == "fixed":
+            return self.a
+        if self.kind == "uniform":
+            return rng.uniform(self.a, self.b)
+        return self.a * rng.lognormvariate(0.0, self.b)
+
+    async def sleep(self) -> None:
+        await asyncio.sleep(self.sample_ms() / 1000)
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    if not samples:
+        return {"count": 0}
+    values = np.asarray(samples, dtype=np.float64)
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "count": int(values.size),
+        "p50": float(p50),
+        "p95": float(p95),
+        "p99": float(p99),
+        "max": float(values.max()),
+    }
+
+
+def histogram_quantile(bounds: tuple[float, ...], counts: list[int], q: float) -> float:
+    """Upper bucket bound containing the q-th quantile (inf if it falls in the overflow bucket)."""
+    total = sum(counts)
+    if not total:
+        return 0.0
+    cumulative = 0
+    for bound, count in zip([*bounds, float("inf")], counts):
+        cumulative += count
+        if cumulative >= q * total:
+            return bound
+    return float("inf")
+
+
+class LoopLagProbe:
+    """Measures event-loop lag as the overshoot of a short periodic sleep."""
+
+    def __init__(self, interval: float = 0.05) -> None:
+        self._interval = interval
+        self.samples_ms: list[float] = []
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self._interval)
+            self.samples_ms.append(max(0.0, (loop.time() - started - self._interval) * 1000))
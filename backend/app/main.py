@@ -1,13 +1,34 @@
-from fastapi import FastAPI
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 
 from app.core.config import get_settings
 from app.core.logging import configure_logging, get_logger
+from app.core.metrics import HTTPMetricsMiddleware, flush_periodically, remove_snapshot
+from app.core.pagination import NEXT_CURSOR_HEADER
 from app.core.rate_limit import limiter
+from app.core.security import PasswordHasherBusy, shutdown_password_hasher
 from app.realtime.socket import socket_app
-from app.routers import analytics, auth, businesses, calls, customers, escalation_rules, media, supabase, users, webhooks
+from app.routers import (
+    analytics,
+    auth,
+    businesses,
+    calls,
+    customers,
+    escalation_rules,
+    media,
+    metrics,
+    supabase,
+    users,
+    webhooks,
+)
+from app.services.stt import get_stt_manager
 
 OPENAPI_TAGS = [
     {"name": "auth", "description": "Authentication and token management."},
@@ -22,6 +43,39 @@ OPENAPI_TAGS = [
 ]
 
 
+async def _password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy) -> JSONResponse:
+    return JSONResponse(
+        status_code=503, content={"detail": "Too many sign-in requests, retry shortly"}, headers={"Retry-After": "1"}
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    settings = get_settings()
+    stt_manager = get_stt_manager()
+    await stt_manager.warm()
+    stt_refresher = asyncio.create_task(stt_manager.refresh_periodically()) if stt_manager.enabled else None
+    flusher: asyncio.Task | None = None
+    if settings.metrics_multiproc_dir:
+        flusher = asyncio.create_task(
+            flush_periodically(settings.metrics_multiproc_dir, settings.metrics_flush_seconds)
+        )
+    try:
+        yield
+    finally:
+        if flusher:
+            flusher.cancel()
+            with suppress(asyncio.CancelledError):
+                await flusher
+            remove_snapshot(settings.metrics_multiproc_dir)
+        if stt_refresher:
+            stt_refresher.cancel()
+            with suppress(asyncio.CancelledError):
+                await stt_refresher
+        await stt_manager.close()
+        shutdown_password_hasher()
+
+
 def create_app() -> FastAPI:
     settings = get_settings()
     configure_logging(settings.app_env)
@@ -46,16 +100,20 @@ def create_app() -> FastAPI:
         redoc_url="/redoc",
         openapi_url="/openapi.json",
         openapi_tags=OPENAPI_TAGS,
+        lifespan=lifespan,
     )
     app.state.limiter = limiter
     app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+    app.add_exception_handler(PasswordHasherBusy, _password_hasher_busy_handler)
 
+    app.add_middleware(HTTPMetricsMiddleware)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=cors_origins,
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER],
     )
 
     app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
@@ -68,6 +126,7 @@ def create_app() -> FastAPI:
     app.include_router(media.router, prefix="/api/v1", tags=["media"])
     app.include_router(supabase.router, prefix="/api/v1", tags=["supabase"])
     app.include_router(users.router, prefix="/api/v1", tags=["users"])
+    app.include_router(metrics.router, include_in_schema=False)
 
     app.mount("/ws/alerts/socket.io", socket_app)
 
@@ -1,11 +1,12 @@
-from datetime import datetime, timedelta
+from collections import Counter
+from datetime import date, datetime, timedelta
 
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.deps import get_current_user, require_owner, require_same_business
-from app.db.models import Call, CallMessage, User
+from app.db.models import CallDailyStats, User
 from app.db.session import get_session
 from app.schemas.analytics import AnalyticsSeriesResponse, AnalyticsSummaryResponse, CallVolumePoint, DurationByDayPoint, EscalationReasonPoint
 
@@ -13,6 +14,12 @@ from app.schemas.analytics import AnalyticsSeriesResponse, AnalyticsSummaryRespo
 router = APIRouter()
 
 
+def _first_day(period: str) -> date:
+    # Rollups are per UTC day, so a period covers whole days ending today.
+    days = int(period.rstrip("d"))
+    return (datetime.utcnow() - timedelta(days=days)).date()
+
+
 @router.get("/summary", response_model=AnalyticsSummaryResponse)
 async def summary(
     business_id: str = Query(...),
@@ -22,36 +29,26 @@ async def summary(
 ) -> AnalyticsSummaryResponse:
     require_owner(current_user)
     require_same_business(current_user, business_id)
-    days = int(period.rstrip("d"))
-    since = datetime.utcnow() - timedelta(days=days)
 
-    total_calls = await session.execute(
-        select(func.count(Call.id)).where(Call.business_id == business_id, Call.started_at >= since)
-    )
-    avg_duration = await session.execute(
-        select(func.avg(Call.duration_seconds)).where(Call.business_id == business_id, Call.started_at >= since)
+    result = await session.execute(
+        select(
+            func.sum(CallDailyStats.call_count).label("total"),
+            func.sum(CallDailyStats.duration_sum).label("duration_sum"),
+            func.sum(CallDailyStats.duration_count).label("duration_count"),
+            func.sum(CallDailyStats.escalated_count).label("escalated"),
+            func.sum(CallDailyStats.sentiment_sum).label("sentiment_sum"),
+            func.sum(CallDailyStats.sentiment_count).label("sentiment_count"),
+        ).where(CallDailyStats.business_id == business_id, CallDailyStats.day >= _first_day(period))
     )
-    escalated = await session.execute(
-        select(func.count(Call.id)).where(
-            Call.business_id == business_id,
-            Call.started_at >= since,
-            Call.status == "escalated",
-        )
-    )
-    sentiment_avg = await session.execute(
-        select(func.avg(CallMessage.sentiment_score))
-        .join(Call, CallMessage.call_id == Call.id)
-        .where(Call.business_id == business_id, Call.started_at >= since)
-    )
-
-    total = total_calls.scalar() or 0
-    escalation_rate = (escalated.scalar() or 0) / total if total else 0
+    row = result.one()
+    total = row.total or 0
+    escalation_rate = (row.escalated or 0) / total if total else 0
 
     return AnalyticsSummaryResponse(
         total_calls=total,
-        avg_duration=float(avg_duration.scalar() or 0),
+        avg_duration=float(row.duration_sum / row.duration_count) if row.duration_count else 0.0,
         escalation_rate=escalation_rate,
-        sentiment_avg=sentiment_avg.scalar(),
+        sentiment_avg=float(row.sentiment_sum / row.sentiment_count) if row.sentiment_count else None,
     )
 
 
@@ -64,38 +61,31 @@ async def series(
 ) -> AnalyticsSeriesResponse:
     require_owner(current_user)
     require_same_business(current_user, business_id)
-    days = int(period.rstrip("d"))
-    since = datetime.utcnow() - timedelta(days=days)
 
-    calls_by_day = await session.execute(
-        select(func.date_trunc("day", Call.started_at), func.count(Call.id))
-        .where(Call.business_id == business_id, Call.started_at >= since)
-        .group_by(func.date_trunc("day", Call.started_at))
-        .order_by(func.date_trunc("day", Call.started_at))
-    )
-    volume_points = [
-        CallVolumePoint(date=row[0].strftime("%Y-%m-%d"), count=row[1])
-        for row in calls_by_day.all()
-    ]
-
-    duration_by_day = await session.execute(
-        select(func.date_trunc("day", Call.started_at), func.avg(Call.duration_seconds))
-        .where(Call.business_id == business_id, Call.started_at >= since)
-        .group_by(func.date_trunc("day", Call.started_at))
-        .order_by(func.date_trunc("day", Call.started_at))
+    result = await session.execute(
+        select(
+            CallDailyStats.day,
+            CallDailyStats.call_count,
+            CallDailyStats.duration_sum,
+            CallDailyStats.duration_count,
+            CallDailyStats.escalation_reasons,
+        )
+        .where(CallDailyStats.business_id == business_id, CallDailyStats.day >= _first_day(period))
+        .order_by(CallDailyStats.day)
     )
+    rows = result.all()
+    volume_points = [CallVolumePoint(date=row.day.strftime("%Y-%m-%d"), count=row.call_count) for row in rows]
     duration_points = [
-        DurationByDayPoint(day=row[0].strftime("%a"), avg_duration=float(row[1] or 0))
-        for row in duration_by_day.all()
-    ]
-
-    escalated_count = await session.execute(
-        select(func.count(Call.id))
-        .where(Call.business_id == business_id, Call.started_at >= since, Call.status == "escalated")
-    )
-    escalation_reasons = [
-        EscalationReasonPoint(reason="Escalated", count=escalated_count.scalar() or 0)
+        DurationByDayPoint(
+            day=row.day.strftime("%a"),
+            avg_duration=row.duration_sum / row.duration_count if row.duration_count else 0.0,
+        )
+        for row in rows
     ]
+    reasons: Counter[str] = Counter()
+    for row in rows:
+        reasons.update(row.escalation_reasons or {})
+    escalation_reasons = [EscalationReasonPoint(reason=reason, count=count) for reason, count in reasons.most_common()]
 
     return AnalyticsSeriesResponse(
         call_volume=volume_points,
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import create_access_token, hash_password, verify_password
+from app.core.security import create_access_token, hash_password_async, verify_and_update_password_async
 from app.core.rate_limit import limiter
 from app.db.models import User, UserRole
 from app.deps import get_current_user, get_optional_user, require_owner, require_same_business
@@ -19,9 +19,16 @@ router = APIRouter()
 async def login(request: Request, payload: LoginRequest, session: AsyncSession = Depends(get_session)) -> TokenResponse:
     result = await session.execute(select(User).where(User.email == payload.email))
     user = result.scalar_one_or_none()
-    if not user or not verify_password(payload.password, user.password_hash):
+    if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
-    token = create_access_token(str(user.id))
+    valid, new_hash = await verify_and_update_password_async(payload.password, user.password_hash)
+    if not valid:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    if new_hash:
+        # Stored with an outdated work factor (PASSWORD_HASH_ROUNDS changed): upgrade it now.
+        user.password_hash = new_hash
+        await session.commit()
+    token = create_access_token(str(user.id), user.token_version)
     return TokenResponse(access_token=token)
 
 
@@ -50,12 +57,12 @@ async def register(
         role=payload.role,
         business_id=payload.business_id,
         phone=payload.phone,
-        password_hash=hash_password(payload.password),
+        password_hash=await hash_password_async(payload.password),
     )
     session.add(user)
     await session.commit()
     await session.refresh(user)
-    token = create_access_token(str(user.id))
+    token = create_access_token(str(user.id), user.token_version)
     return TokenResponse(access_token=token)
 
 
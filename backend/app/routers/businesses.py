@@ -1,13 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import get_settings
 from app.deps import get_current_user, require_owner, require_same_business
 from app.db.models import Business, KnowledgeBase, User
 from app.db.session import get_session
-from app.schemas.businesses import BusinessCreate, BusinessResponse, KnowledgeBaseUpload
-from app.schemas.knowledge_base import KnowledgeBaseCategoryResponse
-from app.services.knowledge_base import chunk_text, embed_many
+from app.schemas.businesses import (
+    AnswerCacheFalseHit,
+    AnswerCacheReport,
+    BusinessCreate,
+    BusinessResponse,
+    KnowledgeBaseUpload,
+    RetrievalWeights,
+)
+from app.schemas.knowledge_base import KnowledgeBaseCategoryResponse, KnowledgeIngestionJob
+from app.services.answer_cache import get_answer_cache
+from app.services.kb_version import bump_kb_version
+from app.services.chunking import Chunk, chunk_document
+from app.services.kb_ingestion import create_job, get_job, run_ingestion
+from app.services.knowledge_base import chunk_text
+from app.services.principal_cache import invalidate_principal
 
 
 router = APIRouter()
@@ -29,8 +44,10 @@ async def create_business(
     await session.commit()
     await session.refresh(business)
     if current_user.business_id is None:
-        current_user.business_id = business.id
+        # current_user may be a cached, detached principal: write the link explicitly.
+        await session.execute(update(User).where(User.id == current_user.id).values(business_id=business.id))
         await session.commit()
+        await invalidate_principal(current_user)
     return BusinessResponse.model_validate(business)
 
 
@@ -67,29 +84,58 @@ async def lookup_business_by_phone(
     return BusinessResponse.model_validate(business)
 
 
-@router.put("/{business_id}/knowledge", response_model=dict)
+@router.put("/{business_id}/knowledge", response_model=KnowledgeIngestionJob, status_code=status.HTTP_202_ACCEPTED)
 async def upload_knowledge(
     business_id: str,
     payload: KnowledgeBaseUpload,
-    session: AsyncSession = Depends(get_session),
+    background: BackgroundTasks,
     current_user: User = Depends(get_current_user),
-) -> dict:
+) -> KnowledgeIngestionJob:
+    """Replace a category's content; chunks are diffed, embedded and written in the background."""
     require_owner(current_user)
     require_same_business(current_user, business_id)
-    chunk_size = payload.chunk_size or 800
-    chunks = chunk_text(payload.content, chunk_size=chunk_size)
-    embeddings = await embed_many(chunks)
-    for idx, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-        kb = KnowledgeBase(
-            business_id=business_id,
-            category=payload.category,
-            content=chunk,
-            chunk_index=idx,
-            embedding=embedding,
-        )
-        session.add(kb)
-    await session.commit()
-    return {"status": "ok", "chunks": len(chunks)}
+    if payload.chunk_size and not payload.chunk_tokens:
+        chunks = [Chunk(text) for text in chunk_text(payload.content, chunk_size=payload.chunk_size)]
+    else:
+        target = payload.chunk_tokens or get_settings().kb_chunk_tokens
+        chunks = await run_in_threadpool(lambda: list(chunk_document(payload.content, target)))
+    job = await create_job(business_id, payload.category)
+    background.add_task(run_ingestion, job, payload.category, chunks)
+    return KnowledgeIngestionJob(**job)
+
+
+@router.post(
+    "/{business_id}/knowledge/files", response_model=KnowledgeIngestionJob, status_code=status.HTTP_202_ACCEPTED
+)
+async def upload_knowledge_file(
+    business_id: str,
+    background: BackgroundTasks,
+    category: str = Form(...),
+    file: UploadFile = File(...),
+    chunk_tokens: int | None = Form(default=None, gt=0),
+    current_user: User = Depends(get_current_user),
+) -> KnowledgeIngestionJob:
+    """Replace a category with a UTF-8 text/Markdown file, chunked from the spooled upload."""
+    require_owner(current_user)
+    require_same_business(current_user, business_id)
+    target = chunk_tokens or get_settings().kb_chunk_tokens
+    chunks = await run_in_threadpool(lambda: list(chunk_document(file.file, target)))
+    job = await create_job(business_id, category)
+    background.add_task(run_ingestion, job, category, chunks)
+    return KnowledgeIngestionJob(**job)
+
+
+@router.get("/{business_id}/knowledge/jobs/{job_id}", response_model=KnowledgeIngestionJob)
+async def get_knowledge_job(
+    business_id: str,
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+) -> KnowledgeIngestionJob:
+    require_same_business(current_user, business_id)
+    job = await get_job(job_id)
+    if not job or job["business_id"] != business_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return KnowledgeIngestionJob(**job)
 
 
 @router.get("/{business_id}/knowledge", response_model=list[KnowledgeBaseCategoryResponse])
@@ -99,23 +145,63 @@ async def list_knowledge(
     current_user: User = Depends(get_current_user),
 ) -> list[KnowledgeBaseCategoryResponse]:
     require_same_business(current_user, business_id)
+    # One row per category, assembled in Postgres; no embeddings cross the wire. Chunks are
+    # verbatim slices of the upload, so joining them gives back the text the editor saved.
+    content = func.string_agg(KnowledgeBase.content, aggregate_order_by("", KnowledgeBase.chunk_index))
     result = await session.execute(
-        select(KnowledgeBase)
+        select(
+            KnowledgeBase.category,
+            content.label("content"),
+            func.max(KnowledgeBase.updated_at).label("updated_at"),
+        )
         .where(KnowledgeBase.business_id == business_id)
-        .order_by(KnowledgeBase.category.asc(), KnowledgeBase.chunk_index.asc())
+        .group_by(KnowledgeBase.category)
+        .order_by(KnowledgeBase.category.asc())
     )
-    rows = result.scalars().all()
-    grouped: dict[str, KnowledgeBaseCategoryResponse] = {}
-    for row in rows:
-        if row.category not in grouped:
-            grouped[row.category] = KnowledgeBaseCategoryResponse(
-                category=row.category,
-                content=row.content,
-                updated_at=row.updated_at,
-            )
-        else:
-            grouped[row.category].content += f"\n{row.content}"
-            if row.updated_at and grouped[row.category].updated_at:
-                if row.updated_at > grouped[row.category].updated_at:
-                    grouped[row.category].updated_at = row.updated_at
-    return list(grouped.values())
+    return [
+        KnowledgeBaseCategoryResponse(category=row.category, content=row.content, updated_at=row.updated_at)
+        for row in result.all()
+    ]
+
+
+@router.put("/{business_id}/retrieval-weights", response_model=RetrievalWeights)
+async def update_retrieval_weights(
+    business_id: str,
+    payload: RetrievalWeights,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+) -> RetrievalWeights:
+    require_owner(current_user)
+    require_same_business(current_user, business_id)
+    result = await session.execute(select(Business).where(Business.id == business_id))
+    business = result.scalar_one_or_none()
+    if not business:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Business not found")
+    business.kb_vector_weight = payload.vector_weight
+    business.kb_lexical_weight = payload.lexical_weight
+    await session.commit()
+    # In-memory indexes carry the weights they were loaded with.
+    await bump_kb_version(business_id)
+    return payload
+
+
+@router.get("/{business_id}/answer-cache", response_model=AnswerCacheReport)
+async def answer_cache_report(
+    business_id: str,
+    current_user: User = Depends(get_current_user),
+) -> AnswerCacheReport:
+    require_owner(current_user)
+    require_same_business(current_user, business_id)
+    return AnswerCacheReport(**await get_answer_cache().report(business_id))
+
+
+@router.post("/{business_id}/answer-cache/false-hits", response_model=dict)
+async def flag_answer_cache_false_hit(
+    business_id: str,
+    payload: AnswerCacheFalseHit,
+    current_user: User = Depends(get_current_user),
+) -> dict:
+    require_owner(current_user)
+    require_same_business(current_user, business_id)
+    await get_answer_cache().flag_false_hit(business_id, payload.matched_question)
+    return {"status": "ok"}
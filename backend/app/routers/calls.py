@@ -1,38 +1,82 @@
-from datetime import datetime
+import hashlib
+import uuid
+from datetime import datetime, timezone
+from typing import Literal
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, status
-from sqlalchemy import and_, func, select
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, func, literal_column, select, tuple_
+from sqlalchemy.dialects.postgresql import JSON, aggregate_order_by
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 
-from app.deps import get_current_user, require_same_business
+from app.deps import get_current_user, require_owner, require_same_business
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
 from app.core.rate_limit import limiter
-from app.db.models import Call, CallMessage, User, UserRole
+from app.db.models import Call, CallEvent, CallMessage, User, UserRole
 from app.db.session import get_session
 from app.schemas.calls import (
     CallDetailResponse,
+    CallEventResponse,
     CallListResponse,
     CallMessageCreate,
     CallMessageResponse,
+    CallSearchResult,
     InboundCallWebhook,
 )
+from app.services.call_export import stream_export
 from app.services.call_handler import handle_inbound_call
+from app.services.call_search import search_calls
 from app.services.webhook_security import verify_telnyx_signature
 from app.services.storage import generate_audio_signed_url
 
 
 router = APIRouter()
+# Columns behind CallListResponse; transcripts and action points stay in the database.
+_LIST_COLUMNS = (
+    Call.id,
+    Call.business_id,
+    Call.caller_number,
+    Call.started_at,
+    Call.ended_at,
+    Call.duration_seconds,
+    Call.status,
+    Call.summary,
+    Call.turn_count,
+    Call.sentiment_avg,
+    Call.sentiment_min,
+)
+_DETAIL_COLUMNS = (
+    *_LIST_COLUMNS,
+    Call.action_points,
+    Call.audio_url,
+    Call.escalated_to_user_id,
+    Call.customer_message_count,
+    Call.ai_message_count,
+    Call.ai_latency_avg_ms,
+    Call.ai_latency_p95_ms,
+    Call.ai_latency_max_ms,
+)
 
 
 @router.get("/calls", response_model=list[CallListResponse])
 async def list_calls(
+    response: Response,
     business_id: str = Query(...),
     date_from: datetime | None = None,
     date_to: datetime | None = None,
-    limit: int = 20,
+    limit: int = Query(20, ge=1, le=500),
     offset: int = 0,
+    cursor: str | None = None,
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ) -> list[CallListResponse]:
+    """Calls newest first.
+
+    Full pages carry an `X-Next-Cursor` header; passing it back as `cursor` continues after
+    the last row (keyset pagination, constant cost per page). `offset` still works for
+    older clients but is ignored when a cursor is given.
+    """
     require_same_business(current_user, business_id)
     filters = [Call.business_id == business_id]
     if current_user.role == UserRole.staff:
@@ -41,25 +85,208 @@ async def list_calls(
         filters.append(Call.started_at >= date_from)
     if date_to:
         filters.append(Call.started_at <= date_to)
-    query = select(Call).where(and_(*filters)).order_by(Call.started_at.desc()).limit(limit).offset(offset)
+    if cursor:
+        try:
+            after = decode_cursor(cursor, datetime.fromisoformat, uuid.UUID)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+        filters.append(tuple_(Call.started_at, Call.id) < after)
+        offset = 0
+    query = (
+        select(Call)
+        .options(load_only(*_LIST_COLUMNS))
+        .where(and_(*filters))
+        .order_by(Call.started_at.desc(), Call.id.desc())
+        .limit(limit)
+        .offset(offset)
+    )
     result = await session.execute(query)
-    return [CallListResponse.model_validate(call) for call in result.scalars().all()]
+    calls = result.scalars().all()
+    if len(calls) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(calls[-1].started_at, calls[-1].id)
+    return [CallListResponse.model_validate(call) for call in calls]
+
+
+@router.get("/calls/export")
+async def export_calls(
+    business_id: str = Query(...),
+    date_from: datetime = Query(...),
+    date_to: datetime | None = None,
+    kind: Literal["calls", "messages", "events"] = "calls",
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    gzip: bool = False,
+    current_user: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """Stream every call (or message, or event) of calls started in [date_from, date_to)."""
+    require_owner(current_user)
+    require_same_business(current_user, business_id)
+    date_to = date_to or datetime.now(timezone.utc)
+    media_type = "application/x-ndjson" if fmt == "ndjson" else "text/csv"
+    filename = f"{kind}.{fmt}"
+    if gzip:
+        media_type, filename = "application/gzip", filename + ".gz"
+    return StreamingResponse(
+        stream_export(kind, business_id, date_from, date_to, fmt, compress=gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/calls/search", response_model=list[CallSearchResult])
+async def search_call_transcripts(
+    response: Response,
+    business_id: str = Query(...),
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = None,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+) -> list[CallSearchResult]:
+    """Calls whose transcript or summary matches `q` (web search syntax: "exact phrase", -word, or)."""
+    require_same_business(current_user, business_id)
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, float, uuid.UUID)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+    staff_user_id = current_user.id if current_user.role == UserRole.staff else None
+    hits = await search_calls(session, business_id, q, limit, after, staff_user_id)
+    if len(hits) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(hits[-1].rank, hits[-1].call_id)
+    return [CallSearchResult.model_validate(hit) for hit in hits]
+
+
+def _json_rows(*fields) -> dict:
+    return func.json_build_object(*(part for field in fields for part in (literal_column(f"'{field.key}'"), field)))
+
+
+# The transcript and events of a call as JSON arrays, aggregated in Postgres so
+# `?expand=true` costs one round trip.
+_MESSAGES_JSON = (
+    select(
+        func.coalesce(
+            func.json_agg(
+                aggregate_order_by(
+                    _json_rows(
+                        CallMessage.id,
+                        CallMessage.call_id,
+                        CallMessage.sender,
+                        CallMessage.content,
+                        CallMessage.timestamp,
+                        CallMessage.sentiment_score,
+                    ),
+                    CallMessage.timestamp,
+                )
+            ),
+            literal_column("'[]'::json"),
+            type_=JSON,
+        )
+    )
+    .where(CallMessage.call_id == Call.id)
+    .correlate(Call)
+    .scalar_subquery()
+)
+_EVENTS_JSON = (
+    select(
+        func.coalesce(
+            func.json_agg(
+                aggregate_order_by(
+                    _json_rows(CallEvent.id, CallEvent.event_type, CallEvent.timestamp, CallEvent.details),
+                    CallEvent.timestamp,
+                )
+            ),
+            literal_column("'[]'::json"),
+            type_=JSON,
+        )
+    )
+    .where(CallEvent.call_id == Call.id)
+    .correlate(Call)
+    .scalar_subquery()
+)
+
+
+def _children_stamp(model) -> object:
+    return (
+        select(func.concat(func.count(), ":", func.max(model.timestamp)))
+        .where(model.call_id == Call.id)
+        .correlate(Call)
+        .scalar_subquery()
+    )
+
+
+# Messages and events are only ever added to a call, so their counts and newest timestamps
+# change whenever the expanded detail does; read from the call_id indexes, no writes needed.
+_CHILDREN_STAMP = func.concat(_children_stamp(CallMessage), "/", _children_stamp(CallEvent))
+
+
+def _authorize_call(current_user: User, business_id, escalated_to_user_id) -> None:
+    require_same_business(current_user, business_id)
+    if current_user.role == UserRole.staff and escalated_to_user_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+
+
+def _call_etag(updated_at: datetime, children: str | None) -> str:
+    """Weak ETag of a call row, plus its messages and events when `children` is given."""
+    version = f"{int(updated_at.timestamp() * 1_000_000):x}"
+    if children is None:
+        return f'W/"{version}-0"'
+    return f'W/"{version}-{hashlib.blake2b(children.encode(), digest_size=8).hexdigest()}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    return if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(","))
 
 
 @router.get("/calls/{call_id}", response_model=CallDetailResponse)
 async def get_call(
     call_id: str,
+    request: Request,
+    response: Response,
+    expand: bool = False,
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ) -> CallDetailResponse:
-    result = await session.execute(select(Call).where(Call.id == call_id))
-    call = result.scalar_one_or_none()
-    if not call:
+    """A call; `expand=true` adds its messages and events.
+
+    Responses carry an ETag built from `calls.updated_at` (bumped by a trigger on every
+    update of the row) and, when expanded, the count and newest timestamp of its messages
+    and events, so revalidation with If-None-Match gets a 304 from indexed lookups alone.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        query = select(Call.business_id, Call.escalated_to_user_id, Call.updated_at).where(Call.id == call_id)
+        if expand:
+            query = query.add_columns(_CHILDREN_STAMP.label("children"))
+        result = await session.execute(query)
+        current = result.one_or_none()
+        if not current:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Call not found")
+        _authorize_call(current_user, current.business_id, current.escalated_to_user_id)
+        etag = _call_etag(current.updated_at, current.children if expand else None)
+        if _etag_matches(if_none_match, etag):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": "private, no-cache"}
+            )
+
+    query = select(Call).options(load_only(*_DETAIL_COLUMNS, Call.updated_at)).where(Call.id == call_id)
+    if expand:
+        query = query.add_columns(
+            _MESSAGES_JSON.label("messages"), _EVENTS_JSON.label("events"), _CHILDREN_STAMP.label("children")
+        )
+    result = await session.execute(query)
+    row = result.one_or_none()
+    if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Call not found")
-    require_same_business(current_user, call.business_id)
-    if current_user.role == UserRole.staff and call.escalated_to_user_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
-    return CallDetailResponse.model_validate(call)
+    call = row[0]
+    _authorize_call(current_user, call.business_id, call.escalated_to_user_id)
+    detail = CallDetailResponse.model_validate(call)
+    if expand:
+        detail.messages = [CallMessageResponse.model_validate(message) for message in row.messages]
+        detail.events = [CallEventResponse.model_validate(event) for event in row.events]
+    response.headers["ETag"] = _call_etag(call.updated_at, row.children if expand else None)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return detail
 
 
 @router.get("/calls/{call_id}/audio", response_model=dict)
@@ -68,8 +295,10 @@ async def get_call_audio(
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ) -> dict:
-    result = await session.execute(select(Call).where(Call.id == call_id))
-    call = result.scalar_one_or_none()
+    result = await session.execute(
+        select(Call.business_id, Call.escalated_to_user_id, Call.audio_url).where(Call.id == call_id)
+    )
+    call = result.one_or_none()
     if not call:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Call not found")
     require_same_business(current_user, call.business_id)
@@ -86,8 +315,8 @@ async def add_call_message(
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ) -> CallMessageResponse:
-    result = await session.execute(select(Call).where(Call.id == call_id))
-    call = result.scalar_one_or_none()
+    result = await session.execute(select(Call.business_id, Call.escalated_to_user_id).where(Call.id == call_id))
+    call = result.one_or_none()
     if not call:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Call not found")
     require_same_business(current_user, call.business_id)
@@ -4,10 +4,13 @@ import json
 
 from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
 
+from app.core.metrics import MEDIA_FRAMES
 from app.services.media_bridge import iter_tts_audio, push_audio
 
 
 router = APIRouter()
+_frames_in = MEDIA_FRAMES.labels("inbound")
+_frames_out = MEDIA_FRAMES.labels("outbound")
 
 
 @router.websocket("/media/telnyx")
@@ -23,6 +26,7 @@ async def telnyx_media_stream(websocket: WebSocket, call_id: str = Query(...)) -
                 media = payload.get("media", {})
                 data = media.get("payload")
                 if data:
+                    _frames_in.inc()
                     await push_audio(call_id, base64.b64decode(data))
             elif event in {"stop", "closed"}:
                 break
@@ -33,7 +37,7 @@ async def telnyx_media_stream(websocket: WebSocket, call_id: str = Query(...)) -
 
 
 async def _send_tts_audio(websocket: WebSocket, call_id: str) -> None:
-    async for chunk in iter_tts_audio(call_id):
+    async for turn, chunk in iter_tts_audio(call_id):
         payload = {
             "event": "media",
             "media": {
@@ -42,3 +46,7 @@ async def _send_tts_audio(websocket: WebSocket, call_id: str) -> None:
             },
         }
         await websocket.send_text(json.dumps(payload))
+        _frames_out.inc()
+        if turn is not None and not turn.first_frame_sent.is_set():
+            turn.mark("first_outbound_frame")
+            turn.first_frame_sent.set()
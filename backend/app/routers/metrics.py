@@ -0,0 +1,29 @@
+import asyncio
+import os
+import secrets
+
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import get_settings
+from app.core.metrics import REGISTRY, read_snapshots, render
+
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics(authorization: str | None = Header(default=None)) -> PlainTextResponse:
+    settings = get_settings()
+    if settings.metrics_token and not secrets.compare_digest(
+        authorization or "", f"Bearer {settings.metrics_token}"
+    ):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    snapshots = [REGISTRY.snapshot()]
+    if settings.metrics_multiproc_dir:
+        # Snapshots older than a few flush intervals belong to workers that have exited.
+        others = await asyncio.to_thread(
+            read_snapshots, settings.metrics_multiproc_dir, settings.metrics_flush_seconds * 3
+        )
+        snapshots.extend(snapshot for snapshot in others if snapshot.get("pid") != os.getpid())
+    return PlainTextResponse(render(snapshots), media_type="text/plain; version=0.0.4")
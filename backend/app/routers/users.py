@@ -2,11 +2,12 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import hash_password
+from app.core.security import hash_password_async
 from app.db.models import User, UserRole
 from app.db.session import get_session
 from app.deps import get_current_user, require_owner, require_same_business
 from app.schemas.users import UserCreate, UserResponse, UserUpdate
+from app.services.principal_cache import invalidate_principal, revoke_tokens
 
 
 router = APIRouter()
@@ -43,7 +44,7 @@ async def create_user(
         role=payload.role,
         business_id=current_user.business_id,
         phone=payload.phone,
-        password_hash=hash_password(payload.password),
+        password_hash=await hash_password_async(payload.password),
     )
     session.add(user)
     await session.commit()
@@ -64,13 +65,21 @@ async def update_user(
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     require_same_business(current_user, user.business_id)
+    # New credentials or permissions must not ride on tokens issued before them.
+    revoke = payload.password is not None or (payload.role is not None and payload.role != user.role)
     if payload.role is not None:
         user.role = payload.role
     if payload.phone is not None:
         user.phone = payload.phone
     if payload.push_token is not None:
         user.push_token = payload.push_token
-    await session.commit()
+    if payload.password is not None:
+        user.password_hash = await hash_password_async(payload.password)
+    if revoke:
+        await revoke_tokens(session, user)
+    else:
+        await session.commit()
+        await invalidate_principal(user)
     await session.refresh(user)
     return UserResponse.model_validate(user)
 
@@ -91,4 +100,5 @@ async def delete_user(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot delete current user")
     await session.delete(user)
     await session.commit()
+    await invalidate_principal(user)
     return {"status": "deleted"}
@@ -1,6 +1,6 @@
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from app.schemas.common import APIModel
 
@@ -17,7 +17,39 @@ class BusinessResponse(APIModel):
     owner_user_id: UUID
 
 
+class AnswerCacheHit(BaseModel):
+    question: str
+    matched_question: str
+    answer: str
+    similarity: float
+    at: float
+
+
+class AnswerCacheReport(BaseModel):
+    lookups: int
+    hits: int
+    hit_rate: float
+    stores: int
+    false_hits: int
+    false_hit_rate: float
+    worker_entries: int
+    recent_hits: list[AnswerCacheHit]
+
+
+class AnswerCacheFalseHit(BaseModel):
+    matched_question: str
+
+
+class RetrievalWeights(BaseModel):
+    # None falls back to the server defaults (KB_VECTOR_WEIGHT / KB_LEXICAL_WEIGHT).
+    vector_weight: float | None = Field(default=None, ge=0)
+    lexical_weight: float | None = Field(default=None, ge=0)
+
+
 class KnowledgeBaseUpload(BaseModel):
     category: str
     content: str
+    # Sentence chunks of about this many tokens (default KB_CHUNK_TOKENS).
+    chunk_tokens: int | None = Field(default=None, gt=0)
+    # Legacy fixed-width chunks of this many characters; ignored when chunk_tokens is set.
     chunk_size: int | None = None
@@ -16,26 +16,58 @@ class CallListResponse(APIModel):
     duration_seconds: int | None
     status: CallStatus
     summary: str | None
+    # Per-call aggregates, set when the call ends.
+    turn_count: int | None = None
+    sentiment_avg: float | None = None
+    sentiment_min: float | None = None
+
+
+class CallMessageResponse(APIModel):
+    id: UUID
+    call_id: UUID
+    sender: MessageSender
+    content: str
+    timestamp: datetime
+    sentiment_score: float | None
+
+
+class CallEventResponse(APIModel):
+    id: UUID
+    event_type: str
+    timestamp: datetime
+    details: dict | None
 
 
 class CallDetailResponse(CallListResponse):
     action_points: dict | None
     audio_url: str | None
+    customer_message_count: int | None = None
+    ai_message_count: int | None = None
+    ai_latency_avg_ms: float | None = None
+    ai_latency_p95_ms: float | None = None
+    ai_latency_max_ms: float | None = None
+    updated_at: datetime | None = None
+    # Only with ?expand=true: the transcript turn by turn and the call's events, oldest first.
+    messages: list[CallMessageResponse] | None = None
+    events: list[CallEventResponse] | None = None
 
 
-class CallMessageCreate(BaseModel):
-    sender: MessageSender
-    content: str
-    sentiment: float | None = None
+class CallSearchResult(APIModel):
+    call_id: UUID
+    caller_number: str
+    started_at: datetime
+    status: CallStatus
+    # Matching message, or None when the call summary matched.
+    message_id: UUID | None
+    rank: float
+    # HTML-escaped text with matches wrapped in <mark>.
+    snippet: str
 
 
-class CallMessageResponse(APIModel):
-    id: UUID
-    call_id: UUID
+class CallMessageCreate(BaseModel):
     sender: MessageSender
     content: str
-    timestamp: datetime
-    sentiment_score: float | None
+    sentiment: float | None = None
 
 
 class InboundCallWebhook(BaseModel):
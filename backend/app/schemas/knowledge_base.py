@@ -7,3 +7,20 @@ class KnowledgeBaseCategoryResponse(BaseModel):
     category: str
     content: str
     updated_at: datetime | None
+
+
+class KnowledgeIngestionJob(BaseModel):
+    job_id: str
+    business_id: str
+    category: str
+    # queued, embedding, writing, done or failed
+    status: str
+    total_chunks: int
+    to_embed: int
+    embedded: int
+    kept: int
+    added: int
+    removed: int
+    reused: int
+    error: str | None
+    updated_at: datetime
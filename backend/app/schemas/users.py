@@ -24,5 +24,6 @@ class UserCreate(BaseModel):
 
 class UserUpdate(BaseModel):
     role: UserRole | None = None
+    password: str | None = None
     phone: str | None = None
     push_token: str | None = None
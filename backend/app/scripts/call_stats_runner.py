@@ -0,0 +1,63 @@
+"""Backfill or reconcile the call_daily_stats analytics rollups.
+
+Recomputes each day in the range from calls, call_messages and call_events and replaces
+the stored rollups, a few days per transaction. Run once after migration 0010 to backfill
+history, then periodically (e.g. nightly over the last few days) to repair any drift from
+the per-call updates.
+
+    python -m app.scripts.call_stats_runner                     # every day with calls
+    python -m app.scripts.call_stats_runner --days 3            # reconcile recent days
+    python -m app.scripts.call_stats_runner --since 2026-01-01 --business <uuid>
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func, select
+
+from app.db.models import Call
+from app.db.session import AsyncSessionLocal, engine
+from app.services.call_stats import reconcile_daily_stats, stats_day
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--since", type=date.fromisoformat, help="first day (default: first call)")
+    parser.add_argument("--days", type=int, help="reconcile only the last N days, including today")
+    parser.add_argument("--business", help="only this business id")
+    parser.add_argument("--batch-days", type=int, default=7)
+    args = parser.parse_args()
+
+    end = datetime.utcnow().date() + timedelta(days=1)
+    start = args.since
+    if args.days:
+        start = end - timedelta(days=args.days)
+    if start is None:
+        async with AsyncSessionLocal() as session:
+            query = select(func.min(Call.started_at))
+            if args.business:
+                query = query.where(Call.business_id == args.business)
+            first = (await session.execute(query)).scalar()
+        if first is None:
+            print("no calls")
+            await engine.dispose()
+            return
+        start = stats_day(first)
+
+    written = 0
+    started = time.perf_counter()
+    while start < end:
+        batch_end = min(start + timedelta(days=args.batch_days), end)
+        async with AsyncSessionLocal() as session:
+            written += await reconcile_daily_stats(session, start, batch_end, args.business)
+            await session.commit()
+        print(f"through={batch_end - timedelta(days=1)} rows={written} seconds={time.perf_counter() - started:.1f}")
+        start = batch_end
+    print(f"done rows={written}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
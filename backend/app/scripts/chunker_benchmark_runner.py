@@ -0,0 +1,104 @@
+"""Compare the sentence chunker with the legacy fixed-width chunk_text.
+
+Chunks a Markdown manual (a synthetic one of `--megabytes` unless `--file` is given)
+with both, reporting wall time, peak Python memory (tracemalloc), chunk count, token
+sizes and how often chunks start or end mid-sentence. chunk_text gets the
+whole document as a string, as the JSON upload did; chunk_document streams the file.
+
+    python -m app.scripts.chunker_benchmark_runner --megabytes 5
+"""
+
+import argparse
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from app.services.chunking import chunk_document
+from app.services.knowledge_base import chunk_text
+from app.services.text_tokens import HAS_TIKTOKEN, count_tokens
+
+
+_WORDS = (
+    "warranty order refund shipping customer account invoice battery charger model serial "
+    "install replace contact support return within days receipt store hours weekend price"
+).split()
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", type=Path)
+    parser.add_argument("--megabytes", type=float, default=5.0)
+    parser.add_argument("--chunk-size", type=int, default=800, help="chunk_text characters")
+    parser.add_argument("--chunk-tokens", type=int, default=200, help="chunk_document token target")
+    parser.add_argument("--seed", type=int, default=7)
+    return parser.parse_args()
+
+
+def _synthetic_manual(path: Path, megabytes: float, rng: random.Random) -> None:
+    written = 0
+    with path.open("w", encoding="utf-8") as out:
+        section = 0
+        while written < megabytes * 1024 * 1024:
+            section += 1
+            lines = [f"## Section {section}\n"]
+            for _ in range(rng.randint(2, 6)):
+                sentences = []
+                for _ in range(rng.randint(2, 7)):
+                    words = rng.choices(_WORDS, k=rng.randint(6, 24))
+                    sentences.append(" ".join(words).capitalize() + rng.choice([".", ".", ".", "?", "!"]))
+                lines.append(" ".join(sentences) + "\n\n")
+            text = "".join(lines)
+            out.write(text)
+            written += len(text)
+
+
+def _measure(name: str, produce) -> dict:
+    tracemalloc.start()
+    started = time.perf_counter()
+    chunks = produce()
+    seconds = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    tokens = np.asarray([count_tokens(chunk) for chunk in chunks])
+    mid_start = sum(1 for text in chunks if text.lstrip()[:1].islower())
+    mid_sentence = sum(1 for text in chunks if text.rstrip()[-1:] not in {".", "!", "?"})
+    return {
+        "chunker": name,
+        "seconds": round(seconds, 3),
+        "peak_mb": round(peak / 1024 / 1024, 1),
+        "chunks": len(chunks),
+        "tokens_mean": round(float(tokens.mean()), 1) if len(tokens) else 0,
+        "tokens_p95": float(np.percentile(tokens, 95)) if len(tokens) else 0,
+        "starts_mid_sentence_pct": round(100 * mid_start / max(len(chunks), 1), 1),
+        "ends_mid_sentence_pct": round(100 * mid_sentence / max(len(chunks), 1), 1),
+    }
+
+
+def main() -> None:
+    args = _parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.file
+        if path is None:
+            path = Path(directory) / "manual.md"
+            _synthetic_manual(path, args.megabytes, random.Random(args.seed))
+        print(f"file={path} bytes={path.stat().st_size} tiktoken={HAS_TIKTOKEN}")
+        results = [
+            _measure("chunk_text", lambda: chunk_text(path.read_text(encoding="utf-8"), chunk_size=args.chunk_size)),
+            _measure("chunk_document", lambda: list(_stream(path, args.chunk_tokens))),
+        ]
+    for result in results:
+        print("  ".join(f"{key}={value}" for key, value in result.items()))
+
+
+def _stream(path: Path, chunk_tokens: int):
+    with path.open("rb") as source:
+        for chunk in chunk_document(source, chunk_tokens):
+            yield chunk.text
+
+
+if __name__ == "__main__":
+    main()
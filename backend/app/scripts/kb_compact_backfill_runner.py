@@ -0,0 +1,56 @@
+"""Fill knowledge_bases.embedding_compact for rows written before migration 0006.
+
+Runs in small batches, each in its own transaction, so it can run against a live table
+and be resumed. The conversion happens in Postgres (subvector + l2_normalize), so no
+vectors cross the wire.
+
+    python -m app.scripts.kb_compact_backfill_runner [--batch 2000]
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+
+from app.db.session import AsyncSessionLocal, engine
+from app.services.knowledge_base import COMPACT_DIMENSIONS
+
+
+_BACKFILL_SQL = text(
+    f"""
+    WITH batch AS (
+        SELECT id FROM knowledge_bases
+        WHERE embedding_compact IS NULL AND embedding IS NOT NULL
+        LIMIT :batch
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE knowledge_bases AS kb
+    SET embedding_compact = l2_normalize(subvector(kb.embedding, 1, {COMPACT_DIMENSIONS}))::halfvec({COMPACT_DIMENSIONS})
+    FROM batch
+    WHERE kb.id = batch.id
+    """
+)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch", type=int, default=2000)
+    args = parser.parse_args()
+
+    total = 0
+    started = time.perf_counter()
+    while True:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(_BACKFILL_SQL, {"batch": args.batch})
+            await session.commit()
+        if not result.rowcount:
+            break
+        total += result.rowcount
+        print(f"backfilled={total} seconds={time.perf_counter() - started:.1f}")
+    print(f"done backfilled={total}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,74 @@
+"""Maintain per-business partial HNSW indexes for large knowledge bases.
+
+The shared HNSW index serves every tenant; for a business with many chunks, a partial
+index over just its rows keeps filtered searches fast and their recall high. rag_query
+forces custom plans so the planner can match `business_id = '<id>'` to these indexes.
+
+    python -m app.scripts.kb_partial_index_runner --min-rows 100000 [--drop-below 50000] [--dry-run]
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import text
+
+from app.db.session import engine
+
+
+INDEX_PREFIX = "ix_kb_hnsw_tenant_"
+
+
+def _index_name(business_id) -> str:
+    return f"{INDEX_PREFIX}{business_id.hex}"
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--min-rows", type=int, default=100_000)
+    parser.add_argument("--drop-below", type=int, help="Drop partial indexes of businesses below this size")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        counts = {
+            row.business_id: row.rows
+            for row in await conn.execute(
+                text("SELECT business_id, count(*) AS rows FROM knowledge_bases GROUP BY business_id")
+            )
+        }
+        existing = {
+            row.indexname
+            for row in await conn.execute(
+                text("SELECT indexname FROM pg_indexes WHERE tablename = 'knowledge_bases' AND indexname LIKE :prefix"),
+                {"prefix": f"{INDEX_PREFIX}%"},
+            )
+        }
+        wanted = {_index_name(business_id): business_id for business_id, rows in counts.items() if rows >= args.min_rows}
+
+        for name, business_id in wanted.items():
+            if name in existing:
+                continue
+            print(f"create {name} rows={counts[business_id]}")
+            if not args.dry_run:
+                # business_id comes from the table as a UUID, so inlining it is safe.
+                await conn.execute(
+                    text(
+                        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON knowledge_bases "
+                        "USING hnsw (embedding vector_l2_ops) WITH (m = 16, ef_construction = 64) "
+                        f"WHERE business_id = '{business_id}'"
+                    )
+                )
+
+        if args.drop_below is not None:
+            sizes = {_index_name(business_id): rows for business_id, rows in counts.items()}
+            for name in sorted(existing - wanted.keys()):
+                if sizes.get(name, 0) < args.drop_below:
+                    print(f"drop {name} rows={sizes.get(name, 0)}")
+                    if not args.dry_run:
+                        await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,174 @@
+"""Simulate concurrent calls end to end against fake OpenAI, Deepgram, ElevenLabs and Telnyx.
+
+By default the API runs in-process on its own event loop so event-loop lag and DB
+pool wait can be reported alongside per-turn latency. Postgres and Redis are real
+(`DATABASE_URL`, `REDIS_URL`); the business for `--to-number` must exist or be
+created with `--seed-business`.
+
+    python -m app.scripts.loadtest_runner --calls 50 --concurrency 25 --turns 3 --seed-business
+
+With `--target`, calls go to an already running deployment instead; start it with
+the environment printed by the runner so it talks to the fakes.
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import threading
+from pathlib import Path
+
+from nacl.signing import SigningKey
+
+from app.loadtest.audio import load_utterance, synthetic_utterance
+from app.loadtest.fakes import FakeVendors
+from app.loadtest.harness import LoadTest, LoadTestConfig
+from app.loadtest.latency import LatencyModel, LoopLagProbe, histogram_quantile, summarize
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--ramp-seconds", type=float, default=0.0)
+    parser.add_argument("--to-number", default="+15550000000")
+    parser.add_argument("--seed-business", action="store_true")
+    parser.add_argument("--audio", type=Path, action="append", default=[], help="Caller utterance recording")
+    parser.add_argument("--target", help="Base URL of a running API; omit to run the API in-process")
+    parser.add_argument("--port", type=int, default=18000)
+    parser.add_argument("--fake-port", type=int, default=18001)
+    parser.add_argument("--signing-key", help="Base64 Ed25519 seed for signing inbound webhooks")
+    parser.add_argument("--openai-latency", default="lognormal:350:0.4")
+    parser.add_argument("--openai-token-gap-ms", type=float, default=15.0)
+    parser.add_argument("--deepgram-latency", default="lognormal:150:0.3")
+    parser.add_argument("--elevenlabs-latency", default="lognormal:250:0.3")
+    parser.add_argument("--telnyx-latency", default="fixed:50")
+    return parser.parse_args()
+
+
+def _server_env(fake_url: str, public_url: str, signing_key: SigningKey) -> dict[str, str]:
+    return {
+        "OPENAI_BASE_URL": f"{fake_url}/v1",
+        "DEEPGRAM_BASE_URL": fake_url,
+        "ELEVENLABS_BASE_URL": fake_url,
+        "ELEVENLABS_VOICE_ID": "loadtest",
+        "TELNYX_API_BASE": fake_url,
+        "TELNYX_WEBHOOK_SECRET": base64.b64encode(signing_key.verify_key.encode()).decode("ascii"),
+        "PUBLIC_BASE_URL": public_url,
+        "RATE_LIMIT_ENABLED": "false",
+        "FFMPEG_PATH": "",
+    }
+
+
+class InProcessServer:
+    """Runs the API under uvicorn on a dedicated thread and event loop."""
+
+    def __init__(self, port: int) -> None:
+        import uvicorn
+
+        from app.main import create_app
+
+        self.loop = asyncio.new_event_loop()
+        self._server = uvicorn.Server(
+            uvicorn.Config(create_app(), host="127.0.0.1", port=port, log_level="warning", loop="none")
+        )
+        self._thread = threading.Thread(target=self.loop.run_until_complete, args=(self._server.serve(),), daemon=True)
+
+    async def start(self) -> None:
+        self._thread.start()
+        while not self._server.started:
+            await asyncio.sleep(0.05)
+
+    def run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=10)
+
+
+async def _seed_business(phone_number: str) -> None:
+    import uuid
+
+    from sqlalchemy import select
+
+    from app.db.models import Business
+    from app.db.session import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(Business).where(Business.phone_number == phone_number))
+        if result.scalar_one_or_none() is None:
+            session.add(Business(name="Load test", phone_number=phone_number, owner_user_id=uuid.uuid4()))
+            await session.commit()
+
+
+async def main() -> None:
+    args = _parse_args()
+    signing_key = SigningKey(base64.b64decode(args.signing_key)) if args.signing_key else SigningKey.generate()
+    utterances = [load_utterance(path) for path in args.audio] or [synthetic_utterance()]
+    target = args.target or f"http://127.0.0.1:{args.port}"
+    config = LoadTestConfig(
+        target_url=target,
+        to_number=args.to_number,
+        calls=args.calls,
+        concurrency=args.concurrency,
+        turns=args.turns,
+        ramp_seconds=args.ramp_seconds,
+        utterances=utterances,
+    )
+    load_test = LoadTest(config, signing_key)
+    latencies = {
+        "openai": LatencyModel.parse(args.openai_latency),
+        "deepgram": LatencyModel.parse(args.deepgram_latency),
+        "elevenlabs": LatencyModel.parse(args.elevenlabs_latency),
+        "telnyx": LatencyModel.parse(args.telnyx_latency),
+    }
+    fakes = FakeVendors(args.fake_port, latencies, load_test.on_stream_start, token_gap_ms=args.openai_token_gap_ms)
+    await fakes.start()
+    env = _server_env(fakes.base_url, target, signing_key)
+
+    server: InProcessServer | None = None
+    probe = LoopLagProbe()
+    try:
+        if args.target:
+            print("Configure the target with:")
+            for key, value in env.items():
+                print(f"  {key}={value}")
+        else:
+            # config.py loads .env on import with override=True, so apply the overrides after it.
+            from app.core.config import get_settings
+
+            os.environ.update(env)
+            get_settings.cache_clear()
+            server = InProcessServer(args.port)
+            await server.start()
+            server.run(probe.run())
+            if args.seed_business:
+                await asyncio.wrap_future(server.run(_seed_business(args.to_number)))
+
+        await load_test.run()
+        report = load_test.report()
+        if server:
+            from app.core.metrics import DB_POOL_WAIT
+            from app.db.session import engine
+
+            pool_wait = DB_POOL_WAIT.labels()
+            checkouts = sum(pool_wait.counts)
+            report["event_loop_lag_ms"] = summarize(probe.samples_ms)
+            report["db_pool_wait"] = {
+                "checkouts": checkouts,
+                "mean_ms": pool_wait.sum * 1000 / checkouts if checkouts else 0.0,
+                "p95_le_ms": histogram_quantile(pool_wait.bounds, pool_wait.counts, 0.95) * 1000,
+                "pool_size": engine.pool.size(),
+            }
+        print(json.dumps(report, indent=2))
+    finally:
+        if server:
+            server.stop()
+        await fakes.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
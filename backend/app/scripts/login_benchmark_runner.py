@@ -0,0 +1,106 @@
+"""Measure login password checks: throughput and event-loop lag, inline vs hashing pool.
+
+Runs `--logins` password verifications at `--concurrency` on one event loop, first
+inline (as the auth routes used to) and then through the hashing pool, while a ticker
+task records how late each of its 10 ms sleeps wakes up. No database or HTTP involved:
+this isolates the part of a login that blocks.
+
+    python -m app.scripts.login_benchmark_runner --logins 400 --concurrency 32
+    python -m app.scripts.login_benchmark_runner --rounds 100000 --workers 4
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+import numpy as np
+
+
+_TICK = 0.01
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--rounds", type=int, help="PASSWORD_HASH_ROUNDS (default: settings)")
+    parser.add_argument("--workers", type=int, help="PASSWORD_HASH_WORKERS (default: settings)")
+    return parser.parse_args()
+
+
+async def _ticker(lags: list[float], stop: asyncio.Event) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + _TICK
+        await asyncio.sleep(_TICK)
+        lags.append(max(loop.time() - expected, 0.0) * 1000)
+
+
+async def _run(name: str, verify, logins: int, concurrency: int) -> dict:
+    lags: list[float] = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(lags, stop))
+    remaining = iter(range(logins))
+
+    async def client() -> None:
+        for _ in remaining:
+            await verify()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    seconds = time.perf_counter() - started
+    stop.set()
+    await ticker
+    lag = np.asarray(lags or [0.0])
+    return {
+        "mode": name,
+        "logins_per_s": round(logins / seconds, 1),
+        "seconds": round(seconds, 2),
+        "loop_lag_p50_ms": round(float(np.percentile(lag, 50)), 1),
+        "loop_lag_p99_ms": round(float(np.percentile(lag, 99)), 1),
+        "loop_lag_max_ms": round(float(lag.max()), 1),
+    }
+
+
+async def main() -> None:
+    args = _parse_args()
+    if args.rounds:
+        os.environ["PASSWORD_HASH_ROUNDS"] = str(args.rounds)
+    if args.workers:
+        os.environ["PASSWORD_HASH_WORKERS"] = str(args.workers)
+    # Enough queue headroom that the benchmark measures queueing, not rejections.
+    os.environ["PASSWORD_HASH_MAX_PENDING"] = str(args.concurrency)
+    # Imported after the overrides: the context and pool read settings on first use.
+    from app.core.config import get_settings
+    from app.core.security import (
+        hash_password,
+        shutdown_password_hasher,
+        verify_and_update_password,
+        verify_and_update_password_async,
+    )
+
+    settings = get_settings()
+    password = "correct horse battery staple"
+    stored = hash_password(password)
+
+    async def inline() -> None:
+        verify_and_update_password(password, stored)
+
+    async def pooled() -> None:
+        await verify_and_update_password_async(password, stored)
+
+    print(
+        f"rounds={settings.password_hash_rounds} workers={settings.password_hash_workers} "
+        f"logins={args.logins} concurrency={args.concurrency}"
+    )
+    for result in (
+        await _run("inline", inline, args.logins, args.concurrency),
+        await _run("pool", pooled, args.logins, args.concurrency),
+    ):
+        print("  ".join(f"{key}={value}" for key, value in result.items()))
+    shutdown_password_hasher()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,99 @@
+"""Offline retrieval quality evaluation for knowledge base search.
+
+Reads a JSONL file of labelled questions against businesses already loaded in the
+database, one per line:
+
+    {"business_id": "...", "query": "how much is the X-200?", "relevant": ["X-200", "$149"]}
+
+`relevant` lists text snippets that a correct chunk contains (robust to re-chunking);
+an optional `category` restricts the search. Each configuration (pure vector, hybrid
+with the business's weights, and hybrid at every `--lexical-weights` value) is scored
+by hit rate, recall and MRR at k, plus query latency.
+
+    python -m app.scripts.retrieval_eval_runner eval.jsonl --k 5 --lexical-weights 0.5 1 2
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+
+from app.db.session import AsyncSessionLocal, engine
+from app.loadtest.latency import summarize
+from app.services.knowledge_base import embed_text
+from app.services.rag import search_knowledge
+from app.services.vector_index import FusionWeights
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dataset", type=Path)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--lexical-weights", type=float, nargs="*", default=[0.5, 1.0, 2.0])
+    parser.add_argument("--memory-index", action="store_true", help="Evaluate the in-process index instead of SQL")
+    return parser.parse_args()
+
+
+def _score(results: list[str], relevant: list[str]) -> tuple[float, float, float]:
+    """(hit, recall, reciprocal rank) of one result list."""
+    needles = [snippet.lower() for snippet in relevant]
+    found = set()
+    first_rank = None
+    for rank, content in enumerate(results, start=1):
+        matches = {needle for needle in needles if needle in content.lower()}
+        if matches and first_rank is None:
+            first_rank = rank
+        found |= matches
+    recall = len(found) / len(needles) if needles else 0.0
+    return float(first_rank is not None), recall, 1.0 / first_rank if first_rank else 0.0
+
+
+async def main() -> None:
+    args = _parse_args()
+    cases = [json.loads(line) for line in args.dataset.read_text().splitlines() if line.strip()]
+    configs: list[tuple[str, bool, FusionWeights | None]] = [("vector", False, None), ("hybrid", True, None)]
+    configs += [(f"hybrid_lexical_{weight:g}", True, FusionWeights(1.0, weight)) for weight in args.lexical_weights]
+
+    embeddings = [await embed_text(case["query"], case["business_id"]) for case in cases]
+    report = []
+    async with AsyncSessionLocal() as session:
+        for name, hybrid, weights in configs:
+            hits, recalls, reciprocal_ranks, latencies = [], [], [], []
+            for case, embedding in zip(cases, embeddings):
+                started = time.perf_counter()
+                results = await search_knowledge(
+                    session,
+                    case["business_id"],
+                    case["query"],
+                    embedding,
+                    limit=args.k,
+                    category=case.get("category"),
+                    hybrid=hybrid,
+                    weights=weights,
+                    use_memory_index=args.memory_index,
+                )
+                latencies.append((time.perf_counter() - started) * 1000)
+                await session.commit()
+                hit, recall, reciprocal_rank = _score([chunk.content for chunk in results], case["relevant"])
+                hits.append(hit)
+                recalls.append(recall)
+                reciprocal_ranks.append(reciprocal_rank)
+            summary = {
+                "config": name,
+                f"hit@{args.k}": sum(hits) / len(cases),
+                f"recall@{args.k}": sum(recalls) / len(cases),
+                "mrr": sum(reciprocal_ranks) / len(cases),
+                "latency_ms": summarize(latencies),
+            }
+            report.append(summary)
+            print(
+                f"{name:24} hit={summary[f'hit@{args.k}']:.3f} recall={summary[f'recall@{args.k}']:.3f} "
+                f"mrr={summary['mrr']:.3f} p50={summary['latency_ms'].get('p50', 0):.2f}ms"
+            )
+    print(json.dumps({"cases": len(cases), "k": args.k, "results": report}, indent=2))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
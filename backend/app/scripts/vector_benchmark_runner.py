@@ -0,0 +1,170 @@
+"""Recall/latency benchmark for filtered HNSW search on a synthetic table.
+
+Loads an unlogged `kb_vector_bench` table with clustered unit vectors spread over
+businesses with a skewed (Zipf) size distribution, builds the same HNSW index as
+migration 0005, then compares approximate top-k against exact top-k for a sweep of
+`hnsw.ef_search` values and iterative scan modes, with and without the business filter.
+Uses `DATABASE_URL`; the table is dropped afterwards unless `--keep` is given.
+
+    python -m app.scripts.vector_benchmark_runner --rows 1000000 --dims 1536 --queries 200
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import asyncpg
+import numpy as np
+from pgvector.asyncpg import register_vector
+
+from app.core.config import get_settings
+from app.loadtest.latency import summarize
+
+
+TABLE = "kb_vector_bench"
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--dims", type=int, default=1536)
+    parser.add_argument("--tenants", type=int, default=500)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[40, 80, 160, 320])
+    parser.add_argument("--modes", nargs="+", default=["off", "relaxed_order", "strict_order"])
+    parser.add_argument("--batch", type=int, default=10_000)
+    parser.add_argument("--maintenance-work-mem", default="2GB")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--reuse", action="store_true", help="Reuse an existing benchmark table")
+    parser.add_argument("--keep", action="store_true")
+    return parser.parse_args()
+
+
+def _unit_rows(vectors: np.ndarray) -> np.ndarray:
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+async def _load(conn: asyncpg.Connection, args: argparse.Namespace, rng: np.random.Generator) -> None:
+    await conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    await conn.execute(
+        f"CREATE UNLOGGED TABLE {TABLE} (id bigint PRIMARY KEY, business_id int NOT NULL, "
+        f"embedding vector({args.dims}) NOT NULL)"
+    )
+    centers = rng.normal(size=(args.clusters, args.dims)).astype(np.float32)
+    started = time.perf_counter()
+    for offset in range(0, args.rows, args.batch):
+        size = min(args.batch, args.rows - offset)
+        vectors = _unit_rows(
+            centers[rng.integers(0, args.clusters, size)] + 0.3 * rng.normal(size=(size, args.dims)).astype(np.float32)
+        )
+        tenants = np.minimum(rng.zipf(1.3, size), args.tenants) - 1
+        records = [(offset + i, int(tenants[i]), vectors[i]) for i in range(size)]
+        await conn.copy_records_to_table(TABLE, records=records, columns=["id", "business_id", "embedding"])
+    print(f"loaded rows={args.rows} seconds={time.perf_counter() - started:.1f}")
+
+    await conn.execute(f"CREATE INDEX ON {TABLE} (business_id)")
+    await conn.execute(f"SET maintenance_work_mem = '{args.maintenance_work_mem}'")
+    started = time.perf_counter()
+    await conn.execute(
+        f"CREATE INDEX {TABLE}_hnsw ON {TABLE} USING hnsw (embedding vector_l2_ops) WITH (m = 16, ef_construction = 64)"
+    )
+    print(f"hnsw_build seconds={time.perf_counter() - started:.1f}")
+    await conn.execute(f"ANALYZE {TABLE}")
+
+
+async def _queries(conn: asyncpg.Connection, args: argparse.Namespace, rng: np.random.Generator):
+    rows = await conn.fetch(f"SELECT business_id, embedding FROM {TABLE} ORDER BY random() LIMIT $1", args.queries)
+    queries = []
+    for row in rows:
+        vector = np.asarray(row["embedding"], dtype=np.float32)
+        noisy = _unit_rows((vector + 0.05 * rng.normal(size=vector.shape).astype(np.float32))[np.newaxis, :])[0]
+        queries.append((row["business_id"], noisy))
+    return queries
+
+
+def _search_sql(filtered: bool) -> str:
+    # Same shape as rag_query: materialized approximate scan, re-sorted by exact distance.
+    where = "WHERE business_id = $3" if filtered else ""
+    return (
+        f"WITH nearest AS MATERIALIZED (SELECT id, embedding <-> $1 AS distance FROM {TABLE} {where} "
+        "ORDER BY embedding <-> $1 LIMIT $2) SELECT id FROM nearest ORDER BY distance"
+    )
+
+
+async def _exact(conn: asyncpg.Connection, queries, k: int, filtered: bool) -> list[set[int]]:
+    truth = []
+    sql = _search_sql(filtered)
+    for business_id, vector in queries:
+        async with conn.transaction():
+            # Without index scans the planner falls back to exact distance ordering.
+            await conn.execute("SET LOCAL enable_indexscan = off")
+            params = (vector, k, business_id) if filtered else (vector, k)
+            truth.append({row["id"] for row in await conn.fetch(sql, *params)})
+    return truth
+
+
+async def _approximate(
+    conn: asyncpg.Connection, queries, truth: list[set[int]], k: int, filtered: bool, ef_search: int, mode: str
+) -> dict:
+    sql = _search_sql(filtered)
+    latencies, recalls, short = [], [], 0
+    for (business_id, vector), expected in zip(queries, truth):
+        async with conn.transaction():
+            await conn.execute(
+                "SELECT set_config('hnsw.ef_search', $1, true), set_config('hnsw.iterative_scan', $2, true)",
+                str(ef_search),
+                mode,
+            )
+            params = (vector, k, business_id) if filtered else (vector, k)
+            started = time.perf_counter()
+            found = {row["id"] for row in await conn.fetch(sql, *params)}
+            latencies.append((time.perf_counter() - started) * 1000)
+        if expected:
+            recalls.append(len(found & expected) / len(expected))
+        short += len(found) < len(expected)
+    return {
+        "filtered": filtered,
+        "ef_search": ef_search,
+        "iterative_scan": mode,
+        "recall": float(np.mean(recalls)) if recalls else None,
+        "short_results": short,
+        "latency_ms": summarize(latencies),
+    }
+
+
+async def main() -> None:
+    args = _parse_args()
+    rng = np.random.default_rng(args.seed)
+    dsn = get_settings().database_url.replace("postgresql+asyncpg://", "postgresql://")
+    conn = await asyncpg.connect(dsn)
+    try:
+        await conn.execute("CREATE EXTENSION IF NOT EXISTS vector")
+        await register_vector(conn)
+        if not args.reuse:
+            await _load(conn, args, rng)
+        queries = await _queries(conn, args, rng)
+        results = []
+        for filtered in (False, True):
+            truth = await _exact(conn, queries, args.k, filtered)
+            for mode in args.modes:
+                for ef_search in args.ef_search:
+                    result = await _approximate(conn, queries, truth, args.k, filtered, ef_search, mode)
+                    results.append(result)
+                    latency = result["latency_ms"]
+                    print(
+                        f"filtered={filtered!s:5} mode={mode:13} ef_search={ef_search:4} "
+                        f"recall={result['recall'] or 0:.3f} short={result['short_results']:3} "
+                        f"p50={latency.get('p50', 0):.2f}ms p95={latency.get('p95', 0):.2f}ms"
+                    )
+        print(json.dumps({"rows": args.rows, "dims": args.dims, "k": args.k, "results": results}, indent=2))
+    finally:
+        if not args.keep:
+            await conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        await conn.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -2,22 +2,31 @@ import json
 
 from app.core.logging import get_logger
 from app.services.openai_client import get_openai_client
+from app.services.openai_gateway import BACKGROUND, OpenAIUnavailable, get_openai_gateway
 
 
 logger = get_logger()
 
 
-async def extract_action_points(summary_text: str) -> list[dict]:
+async def extract_action_points(summary_text: str, business_id: str | None = None) -> list[dict]:
     client = get_openai_client()
     prompt = (
         "Extract action points as JSON array. "
         "Each item must include: type (sms|email|webhook), details. "
         "Respond with JSON only."
     )
-    response = await client.responses.create(
-        model="gpt-4o-mini",
-        input=f"{prompt}\n\nSummary:\n{summary_text}",
-    )
+    try:
+        response = await get_openai_gateway().call(
+            BACKGROUND,
+            lambda: client.responses.create(
+                model="gpt-4o-mini",
+                input=f"{prompt}\n\nSummary:\n{summary_text}",
+            ),
+            tenant=business_id,
+        )
+    except OpenAIUnavailable as exc:
+        logger.warning("action_points_unavailable", error=str(exc))
+        return []
     try:
         parsed = json.loads(response.output_text)
         if isinstance(parsed, list):
@@ -0,0 +1,285 @@
+"""Per-business semantic cache of answered caller questions.
+
+Each worker keeps, per business, a matrix of unit-normalized question embeddings next to
+the answers (and the Telnyx-ready audio they were spoken with). A new question whose
+cosine similarity to a cached one clears `ANSWER_CACHE_THRESHOLD` is answered from the
+cache without RAG, generation or TTS.
+
+Answers are dropped when the business's knowledge base version changes (see kb_version).
+All businesses together stay within `ANSWER_CACHE_BUDGET_MB` per worker; the least
+recently used businesses are evicted first.
+Redis holds the rest of what workers share: questions flagged as false hits, hit/miss
+counters and a short log of recent hits for auditing.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import numpy as np
+from redis.exceptions import RedisError
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.core.logging import get_logger
+from app.core.metrics import ANSWER_CACHE
+from app.services.kb_version import get_kb_version
+from app.services.session_state import get_redis, redis_enabled
+from app.services.turn_detection import normalize_utterance
+
+
+logger = get_logger()
+AUDIT_LOG_SIZE = 200
+_BLOCKED_REFRESH_SECONDS = 5.0
+_background: set[asyncio.Task] = set()
+
+
+def _blocked_key(business_id: str) -> str:
+    return f"answer_cache:blocked:{business_id}"
+
+
+def _stats_key(business_id: str) -> str:
+    return f"answer_cache:stats:{business_id}"
+
+
+def _audit_key(business_id: str) -> str:
+    return f"answer_cache:audit:{business_id}"
+
+
+def question_hash(question: str) -> str:
+    return hashlib.sha1(normalize_utterance(question).encode("utf-8")).hexdigest()
+
+
+def _spawn(coro) -> None:
+    task = asyncio.create_task(coro)
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+@dataclass
+class CachedAnswer:
+    question: str
+    answer: str
+    audio: bytes | None
+    expires_at: float
+    hits: int = 0
+    key: str = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.key = question_hash(self.question)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.question.encode("utf-8")) + len(self.answer.encode("utf-8")) + len(self.audio or b"")
+
+
+@dataclass
+class _BusinessAnswers:
+    version: int
+    entries: list[CachedAnswer] = field(default_factory=list)
+    matrix: np.ndarray | None = None
+    nbytes: int = 0
+
+    def best_match(self, vector: np.ndarray) -> tuple[int, float] | None:
+        if self.matrix is None or not self.entries:
+            return None
+        similarities = self.matrix @ vector
+        index = int(np.argmax(similarities))
+        return index, float(similarities[index])
+
+    def add(self, entry: CachedAnswer, vector: np.ndarray, max_entries: int) -> None:
+        row = vector[np.newaxis, :]
+        self.matrix = row if self.matrix is None else np.vstack([self.matrix, row])
+        self.entries.append(entry)
+        self.nbytes += entry.nbytes + row.nbytes
+        if len(self.entries) > max_entries:
+            self.remove(0)
+
+    def remove(self, index: int) -> None:
+        self.nbytes -= self.entries[index].nbytes + self.matrix[index].nbytes
+        del self.entries[index]
+        self.matrix = np.delete(self.matrix, index, axis=0) if self.entries else None
+
+    def remove_keys(self, keys: set[str]) -> None:
+        for index in reversed(range(len(self.entries))):
+            if self.entries[index].key in keys:
+                self.remove(index)
+
+
+def _unit(vector: np.ndarray) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+
+class AnswerCache:
+    def __init__(self, threshold: float, max_entries: int, ttl_seconds: int, budget_bytes: int) -> None:
+        self._threshold = threshold
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._budget_bytes = budget_bytes
+        # Least recently used business first.
+        self._businesses: OrderedDict[str, _BusinessAnswers] = OrderedDict()
+        # Question hashes flagged as false hits, refreshed from Redis every few seconds.
+        self._blocked: TTLCache[str, set[str]] = TTLCache(100_000, _BLOCKED_REFRESH_SECONDS)
+
+    async def _blocked_questions(self, business_id: str) -> set[str]:
+        blocked = self._blocked.get(business_id)
+        if blocked is not None:
+            return blocked
+        blocked = set()
+        if redis_enabled():
+            try:
+                blocked = set(await get_redis().smembers(_blocked_key(business_id)))
+            except (RedisError, OSError) as exc:
+                logger.warning("answer_cache_redis_failed", error=str(exc))
+        self._blocked.set(business_id, blocked)
+        return blocked
+
+    async def _answers(self, business_id: str) -> _BusinessAnswers:
+        version = await get_kb_version(business_id)
+        blocked = await self._blocked_questions(business_id)
+        answers = self._businesses.get(business_id)
+        if answers is None or answers.version != version:
+            if answers is not None:
+                ANSWER_CACHE.labels("invalidated").inc()
+            answers = self._businesses[business_id] = _BusinessAnswers(version)
+        elif blocked:
+            answers.remove_keys(blocked)
+        self._businesses.move_to_end(business_id)
+        return answers
+
+    @property
+    def nbytes(self) -> int:
+        return sum(answers.nbytes for answers in self._businesses.values())
+
+    def _enforce_budget(self, answers: _BusinessAnswers) -> None:
+        total = self.nbytes
+        while total > self._budget_bytes and len(self._businesses) > 1:
+            _, evicted = self._businesses.popitem(last=False)
+            total -= evicted.nbytes
+            ANSWER_CACHE.labels("evicted").inc()
+        # A single business over the whole budget keeps only its newest answers.
+        while answers.nbytes > self._budget_bytes and answers.entries:
+            answers.remove(0)
+
+    async def lookup(self, business_id: str, question: str, vector: np.ndarray) -> CachedAnswer | None:
+        answers = await self._answers(business_id)
+        match = answers.best_match(_unit(vector))
+        if match is not None and match[1] >= self._threshold:
+            index, similarity = match
+            entry = answers.entries[index]
+            if entry.expires_at > time.time():
+                entry.hits += 1
+                ANSWER_CACHE.labels("hit").inc()
+                _spawn(self._record_hit(business_id, question, entry, similarity))
+                return entry
+            answers.remove(index)
+        ANSWER_CACHE.labels("miss").inc()
+        _spawn(self._incr(business_id, "lookups"))
+        return None
+
+    async def store(
+        self, business_id: str, question: str, vector: np.ndarray, answer: str, audio: bytes | None
+    ) -> None:
+        answers = await self._answers(business_id)
+        blocked = await self._blocked_questions(business_id)
+        entry = CachedAnswer(question, answer, audio, time.time() + self._ttl_seconds)
+        if entry.key in blocked:
+            return
+        answers.add(entry, _unit(vector), self._max_entries)
+        self._enforce_budget(answers)
+        ANSWER_CACHE.labels("stored").inc()
+        _spawn(self._incr(business_id, "stores"))
+
+    async def _incr(self, business_id: str, field_name: str) -> None:
+        if not redis_enabled():
+            return
+        try:
+            await get_redis().hincrby(_stats_key(business_id), field_name, 1)
+        except (RedisError, OSError) as exc:
+            logger.warning("answer_cache_redis_failed", error=str(exc))
+
+    async def _record_hit(self, business_id: str, question: str, entry: CachedAnswer, similarity: float) -> None:
+        if not redis_enabled():
+            return
+        audit = {
+            "question": question,
+            "matched_question": entry.question,
+            "answer": entry.answer,
+            "similarity": round(similarity, 4),
+            "at": time.time(),
+        }
+        try:
+            async with get_redis().pipeline(transaction=False) as pipe:
+                pipe.hincrby(_stats_key(business_id), "lookups", 1)
+                pipe.hincrby(_stats_key(business_id), "hits", 1)
+                pipe.lpush(_audit_key(business_id), json.dumps(audit))
+                pipe.ltrim(_audit_key(business_id), 0, AUDIT_LOG_SIZE - 1)
+                await pipe.execute()
+        except (RedisError, OSError) as exc:
+            logger.warning("answer_cache_redis_failed", error=str(exc))
+
+    async def flag_false_hit(self, business_id: str, matched_question: str) -> None:
+        """Stop serving a cached question on every worker and count the false hit."""
+        key = question_hash(matched_question)
+        answers = self._businesses.get(business_id)
+        if answers is not None:
+            answers.remove_keys({key})
+        self._blocked.pop(business_id)
+        if not redis_enabled():
+            return
+        try:
+            async with get_redis().pipeline(transaction=False) as pipe:
+                pipe.sadd(_blocked_key(business_id), key)
+                pipe.expire(_blocked_key(business_id), self._ttl_seconds)
+                pipe.hincrby(_stats_key(business_id), "false_hits", 1)
+                await pipe.execute()
+        except (RedisError, OSError) as exc:
+            logger.warning("answer_cache_redis_failed", error=str(exc))
+
+    async def report(self, business_id: str) -> dict:
+        stats: dict[str, str] = {}
+        audits: list[str] = []
+        if redis_enabled():
+            try:
+                async with get_redis().pipeline(transaction=False) as pipe:
+                    pipe.hgetall(_stats_key(business_id))
+                    pipe.lrange(_audit_key(business_id), 0, AUDIT_LOG_SIZE - 1)
+                    stats, audits = await pipe.execute()
+            except (RedisError, OSError) as exc:
+                # Report this worker's view rather than failing the endpoint.
+                logger.warning("answer_cache_redis_failed", error=str(exc))
+        lookups = int(stats.get("lookups", 0))
+        hits = int(stats.get("hits", 0))
+        false_hits = int(stats.get("false_hits", 0))
+        answers = self._businesses.get(business_id)
+        return {
+            "lookups": lookups,
+            "hits": hits,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "stores": int(stats.get("stores", 0)),
+            "false_hits": false_hits,
+            "false_hit_rate": false_hits / hits if hits else 0.0,
+            "worker_entries": len(answers.entries) if answers else 0,
+            "recent_hits": [json.loads(item) for item in audits],
+        }
+
+
+_cache: AnswerCache | None = None
+
+
+def get_answer_cache() -> AnswerCache:
+    global _cache
+    if _cache is None:
+        settings = get_settings()
+        _cache = AnswerCache(
+            settings.answer_cache_threshold,
+            settings.answer_cache_max_entries,
+            settings.answer_cache_ttl_seconds,
+            settings.answer_cache_budget_mb * 1024 * 1024,
+        )
+    return _cache
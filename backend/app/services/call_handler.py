@@ -1,7 +1,12 @@
+import asyncio
+import time
 import uuid
+from dataclasses import dataclass
 from datetime import datetime
 
+import numpy as np
 from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
 
 from app.core.config import get_settings
 from app.core.logging import get_logger
@@ -9,30 +14,41 @@ from app.db.models import Business, Call, CallMessage, CallStatus, CustomerProfi
 from app.db.session import AsyncSessionLocal
 from app.schemas.calls import InboundCallWebhook
 from app.services.action_points import extract_action_points
+from app.services.answer_cache import get_answer_cache
+from app.services.call_stats import CallAggregates, record_call_stats
+from app.services.context_packer import RetrievedChunk, pack_context
 from app.services.escalation import detect_sensitive
 from app.services.media_bridge import push_tts_audio, register_call, unregister_call
 from app.services.notifications import notify_escalation, notify_user_channels, trigger_action_point
-from app.services.observability import record_call_event
+from app.services.observability import (
+    TurnTimer,
+    current_turn,
+    record_call_event,
+    record_stage,
+    record_turn_latency,
+    stage_span,
+    use_turn,
+)
+from app.services.knowledge_base import embed_text
 from app.services.model_router import choose_model
 from app.services.openai_client import get_openai_client
+from app.services.openai_gateway import BACKGROUND, FALLBACK_REPLY, REALTIME, OpenAIUnavailable, get_openai_gateway
 from app.services.rag import rag_query
 from app.services.session_state import get_session, set_session
-from app.services.stt import create_stt_stream
+from app.services.stt import STTStream, create_stt_stream
 from app.services.telephony import start_media_stream, stop_media_stream, transfer_call_to_human
-from app.services.tts import create_tts_stream
+from app.services.tts import TTSStream, create_tts_stream
+from app.services.turn_detection import TurnEndPredictor, normalize_utterance
 
 
 logger = get_logger()
+# How long a turn waits for its reply audio to reach the caller before it is recorded.
+FIRST_FRAME_WAIT_SECONDS = 1.0
 
 
 async def handle_inbound_call(payload: InboundCallWebhook) -> None:
     async with AsyncSessionLocal() as session:
-        start_time = datetime.utcnow()
         call_id = uuid.uuid4()
-        channels = register_call(str(call_id))
-        stt = await create_stt_stream(channels.inbound_audio)
-        tts = await create_tts_stream(lambda chunk: push_tts_audio(str(call_id), chunk))
-
         business_id = payload.business_id
         if not business_id:
             if not payload.to_number:
@@ -69,45 +85,91 @@ async def handle_inbound_call(payload: InboundCallWebhook) -> None:
         session.add(call)
         await session.commit()
 
-        greeting = _personalize_greeting(profile)
-        await tts.send_stream(greeting)
-
-        await set_session(str(call_id), {"status": "active", "caller": payload.caller_number})
-
+        # Claim media and STT resources only once the call is known to belong to a business.
+        channels = register_call(str(call_id))
+        stt: STTStream | None = None
+        aggregates = CallAggregates()
+        timing_tasks: set[asyncio.Task] = set()
         settings = get_settings()
         try:
+            setup = TurnTimer()
+            with setup.span("stt_connect"):
+                stt = await create_stt_stream(channels.inbound_audio)
+            # Frames are tagged with the turn whose reply they carry (None for the greeting).
+            tts = await create_tts_stream(lambda chunk: push_tts_audio(str(call_id), chunk, current_turn()))
+
+            greeting = _personalize_greeting(profile)
+            with setup.span("greeting_tts"):
+                await tts.send_stream(greeting)
+            await record_call_event(session, str(call_id), "call_setup", setup.details()["stages_ms"])
+
+            await set_session(str(call_id), {"status": "active", "caller": payload.caller_number})
+
             if payload.call_control_id and settings.public_base_url:
                 stream_url = f"{settings.public_base_url}/api/v1/media/telnyx?call_id={call_id}"
-                start_media_stream(payload.call_control_id, stream_url)
+                await start_media_stream(payload.call_control_id, stream_url)
 
             # Live loop: wait for STT final transcripts (driven by Telnyx media stream).
             if stt.enabled:
                 interim_text = ""
-                prefetched: list[str] = []
-                is_speaking = False
-                for _ in range(200):
+                interim_metadata: dict = {}
+                prefetched: list[RetrievedChunk] = []
+                predictor = TurnEndPredictor(settings.turn_commit_threshold, settings.turn_min_silence_ms)
+                early: _EarlyTurn | None = None
+                committed_text = ""
+                turns = 0
+                idle_deadline = time.monotonic() + 25
+                events = 0
+                while events < 200:
+                    remaining = idle_deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    # Poll briefly while a turn is forming so the local predictor can fire before is_final.
+                    watching = settings.turn_prediction_enabled and (predictor.pending or early is not None)
+                    event = await stt.get_next_event(timeout=min(remaining, 0.02) if watching else remaining)
+                    if not event:
+                        if early is None:
+                            if watching and predictor.should_commit(stt.silence_ms):
+                                timer = TurnTimer()
+                                timer.record("endpoint_silence", stt.silence_ms)
+                                early = _EarlyTurn(
+                                    predictor.text,
+                                    asyncio.create_task(
+                                        _prepare_reply_detached(call, predictor.text, prefetched, timer)
+                                    ),
+                                    timer,
+                                )
+                        elif early.task.done():
+                            if await _commit_early_turn(
+                                session, call, early, turns + 1, interim_metadata, tts, aggregates, timing_tasks
+                            ):
+                                turns += 1
+                                committed_text = normalize_utterance(early.text)
+                            early = None
+                            predictor.reset()
+                            interim_text = ""
+                            prefetched = []
+                        continue
+                    events += 1
+                    idle_deadline = time.monotonic() + 25
                     session_state = await get_session(str(call_id))
                     if session_state.get("takeover_requested") and payload.call_control_id:
                         phone = session_state.get("takeover_phone")
                         user_id = session_state.get("takeover_user_id")
                         if phone:
-                            transfer_call_to_human(payload.call_control_id, phone)
+                            early = _cancel_early(early)
+                            await transfer_call_to_human(payload.call_control_id, phone)
                             call.status = CallStatus.transferred
                             call.escalated_to_user_id = user_id
                             await session.commit()
                             break
-                    event = await stt.get_next_event(timeout=25)
-                    if not event:
-                        break
                     event_type = event.get("type")
                     if event_type == "vad_start":
-                        is_speaking = True
+                        predictor.observe_speech()
+                        early = _cancel_early(early)
                         if tts.is_active():
                             tts.flush_stream()
                         continue
-                    if event_type == "vad_end":
-                        is_speaking = False
-                        continue
                     if event_type != "transcript":
                         continue
                     is_final = event.get("is_final", False)
@@ -115,25 +177,55 @@ async def handle_inbound_call(payload: InboundCallWebhook) -> None:
                     metadata = event.get("metadata", {})
                     if not is_final:
                         interim_text = text
+                        interim_metadata = metadata
+                        if predictor.observe_interim(text):
+                            # The caller kept talking: roll back the speculative reply.
+                            early = _cancel_early(early)
                         if tts.is_active() and interim_text:
                             tts.flush_stream()
                         if len(interim_text) > 50 and not prefetched:
                             prefetched = await rag_query(session, str(call.business_id), interim_text)
                         continue
                     user_text = text or interim_text
+                    if committed_text:
+                        # Deepgram's final for an utterance we already answered early.
+                        user_text = _uncommitted_tail(user_text, committed_text)
+                        committed_text = ""
                     if not user_text:
+                        predictor.reset()
                         continue
                     if tts.is_active():
                         tts.flush_stream()
-                    if is_speaking or user_text:
-                        await _process_turn(session, call, user_text, metadata=metadata, prefetched=prefetched)
+                    reply = None
+                    timer = TurnTimer()
+                    if early and normalize_utterance(early.text) == normalize_utterance(user_text):
+                        await asyncio.wait([early.task])
+                        reply = _early_result(early)
+                        timer = early.timer
+                    else:
+                        _cancel_early(early)
+                    early = None
+                    turns += 1
+                    timer.turn = turns
+                    with use_turn(timer):
+                        if reply is None:
+                            record_stage("endpoint_silence", stt.silence_ms)
+                            reply = await _prepare_reply(session, call, user_text, prefetched)
+                        await _commit_turn(session, call, user_text, reply, metadata, tts, aggregates, timing_tasks)
+                    predictor.reset()
                     interim_text = ""
                     prefetched = []
             else:
                 logger.warning("stt_not_enabled", call_id=str(call_id))
 
+            if timing_tasks:
+                # The last turn's reply may still be playing; its latency belongs in the aggregates.
+                await asyncio.wait(timing_tasks, timeout=FIRST_FRAME_WAIT_SECONDS)
+
             call.ended_at = datetime.utcnow()
             call.duration_seconds = int((call.ended_at - call.started_at).total_seconds())
+            aggregates.apply(call)
+            await record_call_stats(session, call, aggregates)
             await session.commit()
 
             await _post_call_summarize(session, call)
@@ -144,10 +236,11 @@ async def handle_inbound_call(payload: InboundCallWebhook) -> None:
                 {"duration_seconds": call.duration_seconds, "started_at": call.started_at.isoformat()},
             )
         finally:
-            await stt.close()
+            if stt:
+                await stt.close()
             unregister_call(str(call_id))
             if payload.call_control_id:
-                stop_media_stream(payload.call_control_id)
+                await stop_media_stream(payload.call_control_id)
 
 
 def _personalize_greeting(profile: CustomerProfile | None) -> str:
@@ -156,27 +249,169 @@ def _personalize_greeting(profile: CustomerProfile | None) -> str:
     return "Hi there! Thanks for calling. How can I help you today?"
 
 
-async def _process_turn(
+@dataclass
+class _Reply:
+    text: str
+    audio: bytes | None = None
+    # Query embedding, kept when the reply may be added to the answer cache.
+    cache_vector: np.ndarray | None = None
+
+
+@dataclass
+class _EarlyTurn:
+    text: str
+    task: asyncio.Task
+    timer: TurnTimer
+
+
+def _cancel_early(early: _EarlyTurn | None) -> None:
+    """Roll back a speculative reply that has not been spoken yet."""
+    if early and not early.task.done():
+        early.task.cancel()
+        logger.info("turn_rollback", text=early.text)
+    return None
+
+
+def _early_result(early: _EarlyTurn) -> _Reply | None:
+    if early.task.cancelled():
+        return None
+    if early.task.exception():
+        logger.warning("early_turn_failed", error=str(early.task.exception()))
+        return None
+    return early.task.result()
+
+
+async def _commit_early_turn(
+    session,
+    call: Call,
+    early: _EarlyTurn,
+    turn: int,
+    metadata: dict,
+    tts: TTSStream,
+    aggregates: CallAggregates,
+    timing_tasks: set[asyncio.Task],
+) -> bool:
+    """Speak and record a finished speculative reply as turn `turn`; False if it was dropped."""
+    reply = _early_result(early)
+    if reply is None:
+        return False
+    early.timer.turn = turn
+    with use_turn(early.timer):
+        await _commit_turn(session, call, early.text, reply, metadata, tts, aggregates, timing_tasks)
+    return True
+
+
+def _uncommitted_tail(final_text: str, committed_text: str) -> str:
+    """The raw words of `final_text` after its normalized prefix `committed_text`.
+
+    Each raw word is normalized on its own, since one may yield no tokens ("-") or
+    several ("p.m."). Returns `final_text` unchanged when it does not start with the
+    committed words.
+    """
+    committed = committed_text.split()
+    words = final_text.split()
+    consumed = 0
+    index = 0
+    while consumed < len(committed) and index < len(words):
+        tokens = normalize_utterance(words[index]).split()
+        if tokens != committed[consumed : consumed + len(tokens)]:
+            return final_text
+        consumed += len(tokens)
+        index += 1
+    if consumed < len(committed):
+        return final_text
+    # Drop punctuation-only words ("-", "...") left between the commit and the tail.
+    while index < len(words) and not normalize_utterance(words[index]):
+        index += 1
+    return " ".join(words[index:])
+
+
+async def _prepare_reply(
+    session, call: Call, user_text: str, prefetched: list[RetrievedChunk] | None = None
+) -> _Reply:
+    business_id = str(call.business_id)
+    settings = get_settings()
+    vector = None
+    if settings.answer_cache_enabled:
+        try:
+            # rag_query embeds the same text next, and will find it in the embedding cache.
+            with stage_span("rag_embed"):
+                vector = await embed_text(user_text, business_id)
+        except OpenAIUnavailable:
+            vector = None
+        else:
+            cached = await get_answer_cache().lookup(business_id, user_text, vector)
+            if cached:
+                return _Reply(cached.answer, audio=cached.audio)
+    chunks = prefetched or await rag_query(session, business_id, user_text)
+    rag_snippets = pack_context(
+        chunks,
+        settings.kb_context_token_budget,
+        max_chunks=settings.kb_context_max_chunks,
+        mmr_lambda=settings.kb_context_mmr_lambda,
+    )
+    model = await choose_model(user_text, business_id)
+    text = await _generate_response(model, user_text, rag_snippets, business_id)
+    return _Reply(text, cache_vector=vector if text != FALLBACK_REPLY else None)
+
+
+async def _prepare_reply_detached(
+    call: Call, user_text: str, prefetched: list[RetrievedChunk], timer: TurnTimer
+) -> _Reply:
+    # Speculative replies run alongside the live loop, so they must not share its session.
+    async with AsyncSessionLocal() as session:
+        with use_turn(timer):
+            return await _prepare_reply(session, call, user_text, prefetched)
+
+
+async def _finish_turn_timing(call_id: str, timer: TurnTimer, aggregates: CallAggregates) -> None:
+    # Waits for the reply's first outbound frame off the live loop, so transcripts and
+    # barge-in keep flowing, then records the turn with its own session.
+    try:
+        await asyncio.wait_for(timer.first_frame_sent.wait(), timeout=FIRST_FRAME_WAIT_SECONDS)
+    except asyncio.TimeoutError:
+        pass
+    aggregates.add_latency(timer.stages.get("first_outbound_frame", timer.elapsed_ms()))
+    try:
+        async with AsyncSessionLocal() as session:
+            await record_turn_latency(session, call_id, timer)
+    except SQLAlchemyError as exc:
+        logger.warning("turn_latency_record_failed", call_id=call_id, error=str(exc))
+
+
+async def _commit_turn(
     session,
     call: Call,
     user_text: str,
+    reply: _Reply,
     metadata: dict,
-    prefetched: list[str] | None = None,
+    tts: TTSStream,
+    aggregates: CallAggregates,
+    timing_tasks: set[asyncio.Task],
 ) -> None:
-    rag_snippets = prefetched or await rag_query(session, str(call.business_id), user_text)
-    model = await choose_model(user_text)
-    response = await _generate_response(model, user_text, rag_snippets)
-
+    response = reply.text
+    sentiment = metadata.get("sentiment")
     session.add(
         CallMessage(
             call_id=call.id,
             sender=MessageSender.customer,
             content=user_text,
-            sentiment_score=metadata.get("sentiment"),
+            sentiment_score=sentiment,
         )
     )
     session.add(CallMessage(call_id=call.id, sender=MessageSender.ai, content=response))
     await session.commit()
+    aggregates.add_turn(sentiment)
+    timer = current_turn()
+    if reply.audio:
+        audio = reply.audio
+        await tts.play_audio(audio)
+    else:
+        audio = await tts.send_stream(response)
+    if timer:
+        task = asyncio.create_task(_finish_turn_timing(str(call.id), timer, aggregates))
+        timing_tasks.add(task)
+        task.add_done_callback(timing_tasks.discard)
 
     escalated, reason, score = await detect_sensitive(session, str(call.business_id), f"{user_text} {response}", metadata)
     if escalated:
@@ -204,26 +439,55 @@ async def _process_turn(
                 "Call escalation",
                 f"Call {call.id} escalated: {reason}",
             )
+    elif reply.cache_vector is not None:
+        await get_answer_cache().store(str(call.business_id), user_text, reply.cache_vector, response, audio)
 
 
-async def _generate_response(model: str, user_text: str, rag_snippets: list[str]) -> str:
+async def _generate_response(
+    model: str, user_text: str, rag_snippets: list[str], business_id: str | None = None
+) -> str:
     client = get_openai_client()
     context = "\n".join(rag_snippets)
     prompt = f"Context:\n{context}\n\nUser:\n{user_text}\n\nAssistant:"
-    response = await client.responses.create(model=model, input=prompt)
-    return response.output_text
+    requested = time.perf_counter()
+    parts: list[str] = []
+    try:
+        async for delta in get_openai_gateway().stream_text(
+            REALTIME, lambda: client.responses.create(model=model, input=prompt, stream=True), tenant=business_id
+        ):
+            if not parts:
+                record_stage("llm_first_token", (time.perf_counter() - requested) * 1000)
+            parts.append(delta)
+    except OpenAIUnavailable as exc:
+        logger.warning("llm_reply_unavailable", model=model, partial=bool(parts), error=str(exc))
+        if not parts:
+            return FALLBACK_REPLY
+    record_stage("llm_complete", (time.perf_counter() - requested) * 1000)
+    return "".join(parts)
 
 
 async def _post_call_summarize(session, call: Call) -> None:
-    messages = await session.execute(select(CallMessage).where(CallMessage.call_id == call.id))
-    transcript = "\n".join([f"{m.sender}: {m.content}" for m in messages.scalars().all()])
-    client = get_openai_client()
-    summary = await client.responses.create(
-        model="gpt-4o-mini",
-        input=f"Summarize the call and list action points as JSON.\n\nTranscript:\n{transcript}",
+    messages = await session.execute(
+        select(CallMessage.sender, CallMessage.content)
+        .where(CallMessage.call_id == call.id)
+        .order_by(CallMessage.timestamp)
     )
+    transcript = "\n".join([f"{m.sender}: {m.content}" for m in messages.all()])
+    client = get_openai_client()
+    try:
+        summary = await get_openai_gateway().call(
+            BACKGROUND,
+            lambda: client.responses.create(
+                model="gpt-4o-mini",
+                input=f"Summarize the call and list action points as JSON.\n\nTranscript:\n{transcript}",
+            ),
+            tenant=str(call.business_id),
+        )
+    except OpenAIUnavailable as exc:
+        logger.warning("call_summary_unavailable", call_id=str(call.id), error=str(exc))
+        return
     call.summary = summary.output_text
-    action_points = await extract_action_points(summary.output_text)
+    action_points = await extract_action_points(summary.output_text, str(call.business_id))
     call.action_points = {"items": action_points}
     await session.commit()
 
@@ -0,0 +1,128 @@
+"""Full-text search over call transcripts and summaries.
+
+Matches come from the GIN-indexed `content_tsv` of call messages and `summary_tsv` of
+calls (migration 0013). Each call is returned once, ranked by its best matching message
+or summary, with a highlighted snippet of that text. Snippets are only built for the
+rows of the requested page.
+"""
+
+import html
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+
+from sqlalchemy import Float, TextClause, bindparam, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+# Sentinels ts_headline wraps matches in; the text around them is HTML-escaped first.
+_START, _STOP = "⟦", "⟧"
+_HEADLINE_OPTIONS = (
+    f'MaxFragments=2, MaxWords=18, MinWords=6, FragmentDelimiter=" … ", StartSel={_START}, StopSel={_STOP}'
+)
+
+_SEARCH_SQL = """
+    WITH query AS (
+        SELECT websearch_to_tsquery('english', :query) AS q
+    ),
+    hits AS (
+        SELECT m.call_id, m.id AS message_id, m.content AS text, ts_rank_cd(m.content_tsv, query.q) AS rank
+        FROM call_messages AS m
+        JOIN calls AS c ON c.id = m.call_id, query
+        WHERE m.content_tsv @@ query.q AND c.business_id = :business_id{staff_filter}
+        UNION ALL
+        SELECT c.id, NULL, c.summary, ts_rank_cd(c.summary_tsv, query.q)
+        FROM calls AS c, query
+        WHERE c.summary_tsv @@ query.q AND c.business_id = :business_id{staff_filter}
+    ),
+    best AS (
+        SELECT DISTINCT ON (call_id) call_id, message_id, text, rank
+        FROM hits
+        ORDER BY call_id, rank DESC
+    ),
+    page AS (
+        SELECT best.*
+        FROM best
+        WHERE true{cursor_filter}
+        ORDER BY rank DESC, call_id DESC
+        LIMIT :limit
+    )
+    SELECT c.id AS call_id, c.caller_number, c.started_at, c.status, page.message_id, page.rank,
+           ts_headline('english', page.text, query.q, :headline_options) AS snippet
+    FROM page
+    JOIN calls AS c ON c.id = page.call_id, query
+    ORDER BY page.rank DESC, page.call_id DESC
+"""
+
+
+@dataclass
+class CallSearchHit:
+    call_id: uuid.UUID
+    caller_number: str
+    started_at: datetime
+    status: str
+    # None when the match is in the call summary.
+    message_id: uuid.UUID | None
+    rank: float
+    snippet: str
+
+
+@lru_cache
+def _search_statement(staff: bool, with_cursor: bool) -> TextClause:
+    sql = _SEARCH_SQL.format(
+        staff_filter=" AND c.escalated_to_user_id = :staff_user_id" if staff else "",
+        cursor_filter=" AND (rank, call_id) < (:after_rank, :after_call_id)" if with_cursor else "",
+    )
+    statement = text(sql)
+    if staff:
+        statement = statement.bindparams(bindparam("staff_user_id", type_=UUID(as_uuid=True)))
+    if with_cursor:
+        statement = statement.bindparams(
+            bindparam("after_rank", type_=Float), bindparam("after_call_id", type_=UUID(as_uuid=True))
+        )
+    return statement
+
+
+def highlight(snippet: str) -> str:
+    """HTML-safe snippet with matches wrapped in <mark>."""
+    return html.escape(snippet).replace(_START, "<mark>").replace(_STOP, "</mark>")
+
+
+async def search_calls(
+    session: AsyncSession,
+    business_id: str,
+    query: str,
+    limit: int = 20,
+    after: tuple[float, uuid.UUID] | None = None,
+    staff_user_id: uuid.UUID | None = None,
+) -> list[CallSearchHit]:
+    """Calls of a business matching `query` (web search syntax), best first.
+
+    `after` is the (rank, call_id) of the last hit of the previous page; staff only see
+    calls escalated to them.
+    """
+    params = {
+        "query": query,
+        "business_id": business_id,
+        "limit": limit,
+        "headline_options": _HEADLINE_OPTIONS,
+    }
+    if staff_user_id is not None:
+        params["staff_user_id"] = staff_user_id
+    if after is not None:
+        params["after_rank"], params["after_call_id"] = after
+    result = await session.execute(_search_statement(staff_user_id is not None, after is not None), params)
+    return [
+        CallSearchHit(
+            call_id=row.call_id,
+            caller_number=row.caller_number,
+            started_at=row.started_at,
+            status=row.status,
+            message_id=row.message_id,
+            rank=float(row.rank),
+            snippet=highlight(row.snippet or ""),
+        )
+        for row in result.all()
+    ]
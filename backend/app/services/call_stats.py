@@ -0,0 +1,243 @@
+"""Per-call aggregates and daily call rollups for the analytics endpoints.
+
+The call loop keeps running totals for a call (`CallAggregates`) and writes them onto its
+`calls` row at hangup, so list views and rollups never re-read its messages. Each finished
+call then adds its contribution to `call_daily_stats` (keyed by business and UTC day of
+`started_at`) in the same transaction, so analytics reads one row per day instead of
+scanning calls. `reconcile_daily_stats` recomputes a range of days from the raw tables,
+to backfill history or repair drift.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timezone
+
+import numpy as np
+from sqlalchemy import Integer, Text, cast, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logging import get_logger
+from app.db.models import Call, CallDailyStats, CallEvent, CallMessage, CallStatus
+
+
+logger = get_logger()
+# Reported for escalated calls whose escalation event carries no reason.
+DEFAULT_ESCALATION_REASON = "Escalated"
+_COUNTERS = (
+    "call_count",
+    "duration_sum",
+    "duration_count",
+    "escalated_count",
+    "transferred_count",
+    "sentiment_sum",
+    "sentiment_count",
+)
+
+_RECONCILE_SQL = """
+    WITH per_call AS (
+        SELECT c.business_id,
+               (c.started_at AT TIME ZONE 'UTC')::date AS day,
+               c.status,
+               c.duration_seconds,
+               m.sentiment_sum,
+               m.sentiment_count,
+               e.reason
+        FROM calls AS c
+        LEFT JOIN LATERAL (
+            SELECT sum(sentiment_score) AS sentiment_sum, count(sentiment_score) AS sentiment_count
+            FROM call_messages
+            WHERE call_id = c.id
+        ) AS m ON true
+        LEFT JOIN LATERAL (
+            SELECT nullif(details->>'reason', '') AS reason
+            FROM call_events
+            WHERE call_id = c.id AND event_type = 'escalation_detected'
+            ORDER BY timestamp
+            LIMIT 1
+        ) AS e ON c.status = 'escalated'
+        WHERE c.ended_at IS NOT NULL AND c.started_at >= :start AND c.started_at < :end{call_filter}
+    ),
+    reasons AS (
+        SELECT business_id, day, jsonb_object_agg(reason, calls) AS escalation_reasons
+        FROM (
+            SELECT business_id, day, coalesce(reason, :default_reason) AS reason, count(*) AS calls
+            FROM per_call
+            WHERE status = 'escalated'
+            GROUP BY 1, 2, 3
+        ) AS by_reason
+        GROUP BY business_id, day
+    ),
+    totals AS (
+        SELECT business_id,
+               day,
+               count(*) AS call_count,
+               coalesce(sum(duration_seconds), 0) AS duration_sum,
+               count(duration_seconds) AS duration_count,
+               count(*) FILTER (WHERE status = 'escalated') AS escalated_count,
+               count(*) FILTER (WHERE status = 'transferred') AS transferred_count,
+               coalesce(sum(sentiment_sum), 0) AS sentiment_sum,
+               coalesce(sum(sentiment_count), 0) AS sentiment_count
+        FROM per_call
+        GROUP BY business_id, day
+    )
+    INSERT INTO call_daily_stats (
+        business_id, day, call_count, duration_sum, duration_count, escalated_count,
+        transferred_count, sentiment_sum, sentiment_count, escalation_reasons, updated_at
+    )
+    SELECT totals.*, coalesce(reasons.escalation_reasons, '{{}}'::jsonb), now()
+    FROM totals
+    LEFT JOIN reasons USING (business_id, day)
+    ON CONFLICT (business_id, day) DO UPDATE SET
+        call_count = excluded.call_count,
+        duration_sum = excluded.duration_sum,
+        duration_count = excluded.duration_count,
+        escalated_count = excluded.escalated_count,
+        transferred_count = excluded.transferred_count,
+        sentiment_sum = excluded.sentiment_sum,
+        sentiment_count = excluded.sentiment_count,
+        escalation_reasons = excluded.escalation_reasons,
+        updated_at = excluded.updated_at
+"""
+
+
+@dataclass
+class CallAggregates:
+    """Running totals of one live call, applied to its `calls` row at hangup."""
+
+    turns: int = 0
+    customer_messages: int = 0
+    ai_messages: int = 0
+    sentiment_sum: float = 0.0
+    sentiment_count: int = 0
+    sentiment_min: float | None = None
+    # Turn start to first reply audio frame, per turn.
+    latencies_ms: list[float] = field(default_factory=list)
+
+    def add_turn(self, sentiment: float | None) -> None:
+        self.turns += 1
+        self.customer_messages += 1
+        self.ai_messages += 1
+        if sentiment is not None:
+            self.sentiment_sum += sentiment
+            self.sentiment_count += 1
+            self.sentiment_min = sentiment if self.sentiment_min is None else min(self.sentiment_min, sentiment)
+
+    def add_latency(self, latency_ms: float) -> None:
+        self.latencies_ms.append(latency_ms)
+
+    def apply(self, call: Call) -> None:
+        call.turn_count = self.turns
+        call.customer_message_count = self.customer_messages
+        call.ai_message_count = self.ai_messages
+        call.sentiment_avg = self.sentiment_sum / self.sentiment_count if self.sentiment_count else None
+        call.sentiment_min = self.sentiment_min
+        if self.latencies_ms:
+            latencies = np.asarray(self.latencies_ms)
+            call.ai_latency_avg_ms = round(float(latencies.mean()), 1)
+            call.ai_latency_p95_ms = round(float(np.percentile(latencies, 95)), 1)
+            call.ai_latency_max_ms = round(float(latencies.max()), 1)
+
+
+def stats_day(started_at: datetime) -> date:
+    """The rollup day of a call: the UTC date it started (naive datetimes are UTC)."""
+    if started_at.tzinfo is not None:
+        started_at = started_at.astimezone(timezone.utc)
+    return started_at.date()
+
+
+async def _first_escalation_reason(session: AsyncSession, call_id) -> str:
+    result = await session.execute(
+        select(CallEvent.details)
+        .where(CallEvent.call_id == call_id, CallEvent.event_type == "escalation_detected")
+        .order_by(CallEvent.timestamp)
+        .limit(1)
+    )
+    details = result.scalar_one_or_none() or {}
+    return details.get("reason") or DEFAULT_ESCALATION_REASON
+
+
+async def _add_call(session: AsyncSession, call: Call, aggregates: CallAggregates | None) -> None:
+    if aggregates is not None:
+        sentiment_sum, sentiment_count = aggregates.sentiment_sum, aggregates.sentiment_count
+    else:
+        sentiment = await session.execute(
+            select(
+                func.coalesce(func.sum(CallMessage.sentiment_score), 0.0),
+                func.count(CallMessage.sentiment_score),
+            ).where(CallMessage.call_id == call.id)
+        )
+        sentiment_sum, sentiment_count = sentiment.one()
+    escalated = call.status == CallStatus.escalated
+    reason = await _first_escalation_reason(session, call.id) if escalated else None
+
+    table = CallDailyStats.__table__
+    statement = insert(table).values(
+        business_id=call.business_id,
+        day=stats_day(call.started_at),
+        call_count=1,
+        duration_sum=call.duration_seconds or 0,
+        duration_count=int(call.duration_seconds is not None),
+        escalated_count=int(escalated),
+        transferred_count=int(call.status == CallStatus.transferred),
+        sentiment_sum=float(sentiment_sum),
+        sentiment_count=sentiment_count,
+        escalation_reasons={reason: 1} if reason else {},
+        updated_at=func.now(),
+    )
+    increments = {name: table.c[name] + statement.excluded[name] for name in _COUNTERS}
+    if reason:
+        key = cast(reason, Text)
+        current = func.coalesce(cast(table.c.escalation_reasons.op("->>")(key), Integer), 0)
+        increments["escalation_reasons"] = table.c.escalation_reasons.op("||")(
+            func.jsonb_build_object(key, current + 1)
+        )
+    await session.execute(
+        statement.on_conflict_do_update(
+            index_elements=[table.c.business_id, table.c.day],
+            set_={**increments, "updated_at": func.now()},
+        )
+    )
+
+
+async def record_call_stats(session: AsyncSession, call: Call, aggregates: CallAggregates | None = None) -> None:
+    """Add a finished call to its day's rollup; the caller commits.
+
+    Sentiment comes from the call loop's `aggregates` when given, else from its messages.
+
+    Runs in a savepoint so a failure only loses the rollup row (which the reconcile
+    runner repairs), never the call's own end-of-call update.
+    """
+    try:
+        async with session.begin_nested():
+            await _add_call(session, call, aggregates)
+    except SQLAlchemyError as exc:
+        logger.warning("call_stats_update_failed", call_id=str(call.id), error=str(exc))
+
+
+async def reconcile_daily_stats(
+    session: AsyncSession, start: date, end: date, business_id: str | None = None
+) -> int:
+    """Recompute the rollups of days in [start, end) from the raw tables; returns rows written."""
+    params = {
+        "start": datetime.combine(start, time.min, tzinfo=timezone.utc),
+        "end": datetime.combine(end, time.min, tzinfo=timezone.utc),
+        "start_day": start,
+        "end_day": end,
+        "default_reason": DEFAULT_ESCALATION_REASON,
+    }
+    stats_filter = call_filter = ""
+    if business_id:
+        params["business_id"] = business_id
+        stats_filter = " AND business_id = :business_id"
+        call_filter = " AND c.business_id = :business_id"
+    # Days whose calls were all deleted must not keep their old totals.
+    await session.execute(
+        text(f"DELETE FROM call_daily_stats WHERE day >= :start_day AND day < :end_day{stats_filter}"),
+        {key: value for key, value in params.items() if key in ("start_day", "end_day", "business_id")},
+    )
+    result = await session.execute(
+        text(_RECONCILE_SQL.format(call_filter=call_filter)),
+        {key: value for key, value in params.items() if key not in ("start_day", "end_day")},
+    )
+    return result.rowcount
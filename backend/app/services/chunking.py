@@ -0,0 +1,188 @@
+"""Sentence-aware knowledge base chunking over a text stream.
+
+`chunk_document` reads its source in blocks and yields chunks as it goes, holding only
+the current paragraph (cut between words once it passes `_MAX_PARAGRAPH_CHARS`) and the
+chunk being built. Callers that collect every chunk (ingestion diffs a whole category)
+still hold roughly the document's text. Chunks are packed from whole sentences up to
+a token target and never span a Markdown heading. Each chunk is a verbatim slice of the
+source, so concatenating a category's chunks gives back the uploaded text; the heading
+path it belongs to ("Returns > Electronics") is kept apart and only added to the text
+that is embedded, which keeps short chunks retrievable on their own. Each sentence is
+tokenized once.
+"""
+
+import codecs
+import io
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import IO
+
+from app.services.text_tokens import count_tokens
+
+
+_HEADING = re.compile(r"^\s{0,3}(#{1,6})\s+(.+?)\s*#*\s*$")
+_LIST_ITEM = re.compile(r"^\s*(?:[-*+•]|\d+[.)])\s+")
+# A sentence ends at . ! ? (plus closing quotes/brackets) followed by whitespace.
+_SENTENCE_END = re.compile(r"(?<=[.!?])[\"')\]]*\s+")
+_WORD = re.compile(r"\S+\s*")
+_BLOCK_SIZE = 64 * 1024
+# Paragraphs are split into sentences whenever they grow past this; an unfinished
+# sentence longer than half of it (CSV rows, tables, logs) is cut between words.
+_MAX_PARAGRAPH_CHARS = 64 * 1024
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """A verbatim slice of an uploaded document and the heading path it sits under."""
+
+    text: str
+    headings: str = ""
+
+    def embedding_input(self) -> str:
+        text = self.text.strip()
+        return f"{self.headings}\n{text}" if self.headings else text
+
+
+def _lines(source: IO[str] | IO[bytes], block_size: int) -> Iterator[str]:
+    # Lines keep their "\n", so nothing of the source is lost between chunks.
+    decoder = None
+    pending = ""
+    while True:
+        block = source.read(block_size)
+        if not block:
+            break
+        if isinstance(block, bytes):
+            decoder = decoder or codecs.getincrementaldecoder("utf-8")(errors="replace")
+            block = decoder.decode(block)
+        lines = (pending + block).split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line + "\n"
+    if decoder is not None:
+        pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def split_sentences(text: str) -> list[str]:
+    """Sentences of `text`, each with the whitespace that follows it; they join back to `text`."""
+    sentences = []
+    start = 0
+    for match in _SENTENCE_END.finditer(text):
+        sentences.append(text[start : match.end()])
+        start = match.end()
+    if start < len(text):
+        sentences.append(text[start:])
+    return sentences
+
+
+class _ChunkBuilder:
+    def __init__(self, target_tokens: int) -> None:
+        self._target = target_tokens
+        self._headings: list[tuple[int, str]] = []
+        # Source text of the chunk being built: headings and blank lines before its
+        # first sentence, its sentences, and the whitespace after them.
+        self._parts: list[str] = []
+        self._tokens = 0
+        self._has_sentences = False
+
+    def _chunk(self) -> Chunk:
+        return Chunk("".join(self._parts), " > ".join(title for _, title in self._headings))
+
+    def flush(self) -> Iterator[Chunk]:
+        if self._has_sentences:
+            yield self._chunk()
+            self._parts = []
+            self._tokens = 0
+            self._has_sentences = False
+
+    def finish(self) -> Iterator[Chunk]:
+        # Headings or whitespace after the last sentence have no chunk of their own to join.
+        if "".join(self._parts).strip():
+            yield self._chunk()
+        self._parts = []
+
+    def heading(self, level: int, title: str, line: str) -> Iterator[Chunk]:
+        yield from self.flush()
+        while self._headings and self._headings[-1][0] >= level:
+            self._headings.pop()
+        self._headings.append((level, title))
+        self._parts.append(line)
+
+    def whitespace(self, text: str) -> None:
+        self._parts.append(text)
+
+    def sentence(self, sentence: str) -> Iterator[Chunk]:
+        tokens = count_tokens(sentence.strip())
+        if tokens > self._target:
+            yield from self._long_sentence(sentence)
+            return
+        if self._has_sentences and self._tokens + tokens > self._target:
+            yield from self.flush()
+        self._parts.append(sentence)
+        self._tokens += tokens
+        self._has_sentences = True
+
+    def _long_sentence(self, sentence: str) -> Iterator[Chunk]:
+        # Sentences longer than a whole chunk (tables, run-on lists) are cut between words.
+        yield from self.flush()
+        indent = sentence[: len(sentence) - len(sentence.lstrip())]
+        if indent:
+            self._parts.append(indent)
+        for match in _WORD.finditer(sentence):
+            word = match.group()
+            word_tokens = count_tokens(" " + word.strip())
+            if self._has_sentences and self._tokens + word_tokens > self._target:
+                yield from self.flush()
+            self._parts.append(word)
+            self._tokens += word_tokens
+            self._has_sentences = True
+
+
+def chunk_document(
+    source: str | IO[str] | IO[bytes],
+    target_tokens: int = 200,
+    block_size: int = _BLOCK_SIZE,
+) -> Iterator[Chunk]:
+    """Yield chunks of about `target_tokens` tokens from text, a text stream or UTF-8 bytes."""
+    if isinstance(source, str):
+        source = io.StringIO(source)
+    builder = _ChunkBuilder(target_tokens)
+    paragraph: list[str] = []
+    paragraph_chars = 0
+
+    def sentences(final: bool) -> Iterator[Chunk]:
+        nonlocal paragraph, paragraph_chars
+        found = split_sentences("".join(paragraph))
+        # Mid-paragraph flushes keep the last (possibly unfinished) sentence for later.
+        paragraph = [] if final or not found else [found.pop()]
+        if paragraph and len(paragraph[0]) > _MAX_PARAGRAPH_CHARS // 2:
+            # Carry only its last word, so each flush starts from a short paragraph and
+            # text without sentence ends is not re-split on every line.
+            last_word = re.search(r"\S+\s*$", paragraph[0])
+            cut = last_word.start() if last_word else 0
+            found.append(paragraph[0][:cut] or paragraph[0])
+            paragraph = [paragraph[0][cut:]] if cut else []
+        paragraph_chars = len(paragraph[0]) if paragraph else 0
+        for sentence in found:
+            if sentence.strip():
+                yield from builder.sentence(sentence)
+            else:
+                builder.whitespace(sentence)
+
+    for line in _lines(source, block_size):
+        heading = _HEADING.match(line)
+        if heading or not line.strip() or _LIST_ITEM.match(line):
+            yield from sentences(final=True)
+        if heading:
+            yield from builder.heading(len(heading.group(1)), heading.group(2), line)
+        elif not line.strip():
+            builder.whitespace(line)
+        else:
+            paragraph.append(line)
+            paragraph_chars += len(line)
+            if paragraph_chars > _MAX_PARAGRAPH_CHARS:
+                yield from sentences(final=False)
+    yield from sentences(final=True)
+    yield from builder.finish()
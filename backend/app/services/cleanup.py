@@ -1,6 +1,7 @@
 from datetime import datetime, timedelta
 
 from sqlalchemy import select
+from sqlalchemy.orm import load_only
 
 from app.core.config import get_settings
 from app.core.logging import get_logger
@@ -21,7 +22,11 @@ async def cleanup_old_audio() -> int:
         return 0
     deleted = 0
     async with AsyncSessionLocal() as session:
-        result = await session.execute(select(Call).where(Call.started_at < cutoff, Call.audio_url.is_not(None)))
+        result = await session.execute(
+            select(Call)
+            .options(load_only(Call.id, Call.audio_url))
+            .where(Call.started_at < cutoff, Call.audio_url.is_not(None))
+        )
         for call in result.scalars().all():
             try:
                 client.delete_object(Bucket=settings.s3_bucket, Key=call.audio_url)
@@ -0,0 +1,134 @@
+"""Turn retrieved knowledge base chunks into a compact prompt context.
+
+Retrieval over-fetches a few candidates; packing then
+  1. picks chunks by maximal marginal relevance, so near-duplicates (adjacent chunks
+     share `chunk_text`'s 100-character overlap) do not crowd out other facts,
+  2. merges chunks that were consecutive in the uploaded text, dropping the overlap or
+     the repeated heading line,
+  3. keeps the most relevant groups within a token budget.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.services.text_tokens import count_tokens, truncate_tokens
+
+
+# Shorter leftovers are dropped rather than truncated into a fragment.
+_MIN_TRUNCATED_TOKENS = 24
+
+
+@dataclass
+class RetrievedChunk:
+    content: str
+    category: str
+    chunk_index: int
+    embedding: np.ndarray
+    # Cosine similarity to the query.
+    relevance: float
+
+
+def _unit_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+def query_relevance(embeddings: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """Cosine similarity of each row of `embeddings` to `query`."""
+    query = np.asarray(query, dtype=np.float32)
+    norm = float(np.linalg.norm(query))
+    return _unit_rows(np.asarray(embeddings, dtype=np.float32)) @ (query / norm if norm else query)
+
+
+def mmr_select(relevance: np.ndarray, embeddings: np.ndarray, count: int, mmr_lambda: float) -> list[int]:
+    """Indices chosen by maximal marginal relevance, in selection order.
+
+    Each step takes the row maximizing mmr_lambda * relevance - (1 - mmr_lambda) * (its
+    highest similarity to an already selected row).
+    """
+    total = len(relevance)
+    if total == 0 or count <= 0:
+        return []
+    unit = _unit_rows(np.asarray(embeddings, dtype=np.float32))
+    redundancy = np.zeros(total, dtype=np.float32)
+    available = np.ones(total, dtype=bool)
+    selected: list[int] = []
+    for _ in range(min(count, total)):
+        scores = mmr_lambda * relevance - (1.0 - mmr_lambda) * redundancy
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        redundancy = np.maximum(redundancy, unit @ unit[best])
+    return selected
+
+
+def _overlap(left: str, right: str, max_overlap: int) -> int:
+    """Length of the longest suffix of `left` that is also a prefix of `right`."""
+    for size in range(min(len(left), len(right), max_overlap), 0, -1):
+        if left.endswith(right[:size]):
+            return size
+    return 0
+
+
+def _continuation(previous: str, following: str, max_overlap: int) -> str:
+    """What `following` adds to `previous` when the two were consecutive chunks."""
+    size = _overlap(previous, following, max_overlap)
+    if size:
+        return following[size:]
+    # Sentence chunks (see chunking) are consecutive slices that end in their own whitespace.
+    if previous[-1:].isspace():
+        return following
+    return "\n" + following
+
+
+def _merge_adjacent(chunks: list[RetrievedChunk], max_overlap: int) -> list[tuple[str, float]]:
+    """(text, best relevance) groups of chunks that were consecutive in their category."""
+    ordered = sorted(chunks, key=lambda chunk: (chunk.category, chunk.chunk_index))
+    groups: list[tuple[str, float]] = []
+    previous: RetrievedChunk | None = None
+    for chunk in ordered:
+        if (
+            previous is not None
+            and groups
+            and chunk.category == previous.category
+            and chunk.chunk_index == previous.chunk_index + 1
+        ):
+            text, relevance = groups[-1]
+            addition = _continuation(previous.content, chunk.content, max_overlap)
+            groups[-1] = (text + addition, max(relevance, chunk.relevance))
+        else:
+            groups.append((chunk.content, chunk.relevance))
+        previous = chunk
+    return groups
+
+
+def pack_context(
+    chunks: list[RetrievedChunk],
+    token_budget: int,
+    max_chunks: int = 5,
+    mmr_lambda: float = 0.7,
+    max_overlap: int = 200,
+) -> list[str]:
+    """Context snippets to put in the prompt, most relevant first."""
+    if not chunks:
+        return []
+    relevance = np.asarray([chunk.relevance for chunk in chunks], dtype=np.float32)
+    embeddings = np.vstack([np.asarray(chunk.embedding, dtype=np.float32) for chunk in chunks])
+    picked = [chunks[index] for index in mmr_select(relevance, embeddings, max_chunks, mmr_lambda)]
+    groups = sorted(_merge_adjacent(picked, max_overlap), key=lambda group: -group[1])
+
+    snippets: list[str] = []
+    remaining = token_budget
+    for text, _ in groups:
+        tokens = count_tokens(text)
+        if tokens <= remaining:
+            snippets.append(text)
+            remaining -= tokens
+        elif remaining >= _MIN_TRUNCATED_TOKENS:
+            snippets.append(truncate_tokens(text, remaining))
+            break
+        else:
+            break
+    return snippets
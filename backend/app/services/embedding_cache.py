@@ -0,0 +1,115 @@
+"""Two-tier cache for query embeddings.
+
+Vectors live in an in-process LRU as read-only float32 arrays and in Redis as packed
+float32 bytes, keyed by model plus a hash of the normalized text, so repeated caller
+questions ("what are your hours") skip the OpenAI round trip. Concurrent misses for the
+same key share one request, which covers the interim prefetch racing the final turn.
+"""
+
+import asyncio
+import hashlib
+import time
+from collections.abc import Awaitable, Callable
+
+import numpy as np
+from redis.exceptions import RedisError
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.core.logging import get_logger
+from app.core.metrics import EMBEDDING_CACHE, REDIS_ROUND_TRIPS
+from app.services.session_state import get_binary_redis
+
+
+logger = get_logger()
+_memory_hit = EMBEDDING_CACHE.labels("memory_hit")
+_redis_hit = EMBEDDING_CACHE.labels("redis_hit")
+_miss = EMBEDDING_CACHE.labels("miss")
+_redis_get = REDIS_ROUND_TRIPS.labels("embedding_get")
+_redis_set = REDIS_ROUND_TRIPS.labels("embedding_set")
+
+
+def cache_key(model: str, text: str) -> str:
+    digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+    return f"emb:{model}:{digest}"
+
+
+def _freeze(vector: np.ndarray) -> np.ndarray:
+    vector = np.ascontiguousarray(vector, dtype=np.float32)
+    vector.flags.writeable = False
+    return vector
+
+
+class EmbeddingCache:
+    def __init__(self, max_entries: int, ttl_seconds: int) -> None:
+        self._ttl_seconds = ttl_seconds
+        self._local: TTLCache[str, np.ndarray] = TTLCache(max_entries, ttl_seconds)
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    async def _redis_lookup(self, key: str) -> np.ndarray | None:
+        redis = get_binary_redis()
+        if redis is None:
+            return None
+        started = time.perf_counter()
+        try:
+            packed = await redis.get(key)
+        except (RedisError, OSError) as exc:
+            logger.warning("embedding_cache_redis_failed", error=str(exc))
+            return None
+        finally:
+            _redis_get.observe(time.perf_counter() - started)
+        return np.frombuffer(packed, dtype=np.float32) if packed else None
+
+    async def _redis_store(self, key: str, vector: np.ndarray) -> None:
+        redis = get_binary_redis()
+        if redis is None:
+            return
+        started = time.perf_counter()
+        try:
+            await redis.set(key, vector.tobytes(), ex=self._ttl_seconds)
+        except (RedisError, OSError) as exc:
+            logger.warning("embedding_cache_redis_failed", error=str(exc))
+        finally:
+            _redis_set.observe(time.perf_counter() - started)
+
+    async def _fill(self, key: str, compute: Callable[[], Awaitable[list[float]]]) -> np.ndarray:
+        try:
+            vector = await self._redis_lookup(key)
+            if vector is not None:
+                _redis_hit.inc()
+                vector = _freeze(vector)
+            else:
+                _miss.inc()
+                vector = _freeze(np.asarray(await compute(), dtype=np.float32))
+                await self._redis_store(key, vector)
+            self._local.set(key, vector)
+            return vector
+        finally:
+            self._inflight.pop(key, None)
+
+    async def get_or_compute(
+        self, model: str, text: str, compute: Callable[[], Awaitable[list[float]]]
+    ) -> np.ndarray:
+        key = cache_key(model, text)
+        vector = self._local.get(key)
+        if vector is not None:
+            _memory_hit.inc()
+            return vector
+        task = self._inflight.get(key)
+        if task is None:
+            # The fill runs as its own task so a cancelled requester (e.g. a rolled-back
+            # prefetch) doesn't fail the others waiting on the same text.
+            task = self._inflight[key] = asyncio.ensure_future(self._fill(key, compute))
+            task.add_done_callback(lambda done: done.cancelled() or done.exception())
+        return await asyncio.shield(task)
+
+
+_cache: EmbeddingCache | None = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    global _cache
+    if _cache is None:
+        settings = get_settings()
+        _cache = EmbeddingCache(settings.embedding_cache_max_entries, settings.embedding_cache_ttl_seconds)
+    return _cache
@@ -2,7 +2,12 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import EscalationRule
+from app.core.logging import get_logger
 from app.services.openai_client import get_openai_client
+from app.services.openai_gateway import CLASSIFY, OpenAIUnavailable, get_openai_gateway
+
+
+logger = get_logger()
 
 
 async def detect_sensitive(
@@ -34,13 +39,21 @@ async def detect_sensitive(
     if score >= 3:
         client = get_openai_client()
         prompt = f"Determine if this is sensitive or requires escalation:\n{text}"
-        response = await client.responses.create(
-            model="gpt-4o-mini",
-            input=prompt,
-        )
-        content = response.output_text.lower()
-        if "yes" in content or "sensitive" in content:
-            score += 5
-            reason = reason or "LLM sensitive classification"
+        try:
+            response = await get_openai_gateway().call(
+                CLASSIFY,
+                lambda: client.responses.create(
+                    model="gpt-4o-mini",
+                    input=prompt,
+                ),
+                tenant=business_id,
+            )
+        except OpenAIUnavailable as exc:
+            logger.warning("sensitive_classification_unavailable", error=str(exc))
+        else:
+            content = response.output_text.lower()
+            if "yes" in content or "sensitive" in content:
+                score += 5
+                reason = reason or "LLM sensitive classification"
 
     return score > 5, reason, score
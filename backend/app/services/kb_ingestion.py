@@ -0,0 +1,316 @@
+"""Incremental knowledge base ingestion.
+
+Uploading a category replaces its chunks by diffing content hashes against what is
+stored: unchanged chunks keep their rows and embeddings, removed ones are deleted and
+only new text is embedded (or copied from another row of the business with the same
+hash). Every chunk gets a row, repeated ones included, so a category's rows in
+`chunk_index` order still spell out the uploaded document. Embedding requests are
+batched within the API's per-request limits and run with bounded concurrency; new rows
+are written with a single COPY.
+
+Uploads run as background jobs; their progress is kept in Redis so any worker can
+answer `GET /businesses/{id}/knowledge/jobs/{job_id}`.
+"""
+
+import asyncio
+import csv
+import hashlib
+import io
+import json
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+import numpy as np
+from redis.exceptions import RedisError
+from sqlalchemy import bindparam, delete, func, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.logging import get_logger
+from app.db.models import KnowledgeBase
+from app.db.session import AsyncSessionLocal
+from app.services.chunking import Chunk
+from app.services.kb_version import bump_kb_version
+from app.services.knowledge_base import compact_embedding, embed_many
+from app.services.session_state import get_redis, redis_enabled
+from app.services.text_tokens import count_tokens
+
+
+logger = get_logger()
+JOB_TTL_SECONDS = 86400
+# Without Redis (Upstash REST only) job state is only visible to the worker running it.
+_local_jobs: dict[str, dict] = {}
+_COPY_COLUMNS = [
+    "id",
+    "business_id",
+    "category",
+    "content",
+    "chunk_index",
+    "content_hash",
+    "embedding",
+    "embedding_compact",
+    "updated_at",
+]
+
+
+def content_hash(content: str) -> str:
+    # Matches the backfill in migration 0008: sha256 of the UTF-8 text.
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CategoryPlan:
+    # ids of rows whose text is unchanged, and the new chunk_index of those that moved
+    keep: list[uuid.UUID] = field(default_factory=list)
+    moved: dict[uuid.UUID, int] = field(default_factory=dict)
+    remove: list[uuid.UUID] = field(default_factory=list)
+    # (chunk_index, content, content_hash) of chunks to insert
+    add: list[tuple[int, str, str]] = field(default_factory=list)
+
+
+def plan_category(chunks: list[str], existing: list[tuple[uuid.UUID, str | None, int]]) -> CategoryPlan:
+    """Diff the new chunks of a category against its stored (id, content_hash, chunk_index) rows."""
+    stored: dict[str, list[tuple[uuid.UUID, int]]] = {}
+    plan = CategoryPlan()
+    for row_id, row_hash, row_index in existing:
+        if row_hash is None:
+            plan.remove.append(row_id)
+        else:
+            stored.setdefault(row_hash, []).append((row_id, row_index))
+    for chunk_index, chunk in enumerate(chunks):
+        chunk_hash = content_hash(chunk)
+        if stored.get(chunk_hash):
+            row_id, row_index = stored[chunk_hash].pop(0)
+            plan.keep.append(row_id)
+            if row_index != chunk_index:
+                plan.moved[row_id] = chunk_index
+        else:
+            plan.add.append((chunk_index, chunk, chunk_hash))
+    plan.remove.extend(row_id for rows in stored.values() for row_id, _ in rows)
+    return plan
+
+
+def embedding_batches(texts: list[str], max_items: int, max_tokens: int) -> list[list[int]]:
+    """Group text indices into requests of at most `max_items` inputs and `max_tokens` tokens."""
+    batches: list[list[int]] = []
+    current: list[int] = []
+    current_tokens = 0
+    for index, content in enumerate(texts):
+        tokens = count_tokens(content)
+        if current and (len(current) >= max_items or current_tokens + tokens > max_tokens):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(index)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+async def embed_in_batches(
+    texts: list[str],
+    business_id: str,
+    on_batch: Callable[[int], Awaitable[None]] | None = None,
+) -> list[list[float]]:
+    """Embeddings for `texts`, requested in parallel batches; `on_batch` gets each batch size."""
+    settings = get_settings()
+    semaphore = asyncio.Semaphore(settings.kb_embed_concurrency)
+    embeddings: list[list[float] | None] = [None] * len(texts)
+
+    async def run(batch: list[int]) -> None:
+        async with semaphore:
+            vectors = await embed_many([texts[index] for index in batch], business_id)
+        for index, vector in zip(batch, vectors):
+            embeddings[index] = vector
+        if on_batch is not None:
+            await on_batch(len(batch))
+
+    batches = embedding_batches(texts, settings.kb_embed_batch_size, settings.kb_embed_batch_tokens)
+    await asyncio.gather(*(run(batch) for batch in batches))
+    return embeddings
+
+
+def _job_key(job_id: str) -> str:
+    return f"kb_ingest:{job_id}"
+
+
+async def save_job(job: dict) -> None:
+    job["updated_at"] = datetime.now(timezone.utc).isoformat()
+    _local_jobs[job["job_id"]] = job
+    if redis_enabled():
+        try:
+            await get_redis().set(_job_key(job["job_id"]), json.dumps(job), ex=JOB_TTL_SECONDS)
+        except (RedisError, OSError) as exc:
+            logger.warning("kb_ingest_job_save_failed", job_id=job["job_id"], error=str(exc))
+
+
+async def get_job(job_id: str) -> dict | None:
+    if redis_enabled():
+        try:
+            data = await get_redis().get(_job_key(job_id))
+        except (RedisError, OSError) as exc:
+            logger.warning("kb_ingest_job_read_failed", job_id=job_id, error=str(exc))
+        else:
+            if data:
+                return json.loads(data)
+    return _local_jobs.get(job_id)
+
+
+async def create_job(business_id: str, category: str) -> dict:
+    job = {
+        "job_id": uuid.uuid4().hex,
+        "business_id": business_id,
+        "category": category,
+        "status": "queued",
+        "total_chunks": 0,
+        "to_embed": 0,
+        "embedded": 0,
+        "kept": 0,
+        "added": 0,
+        "removed": 0,
+        "reused": 0,
+        "error": None,
+    }
+    await save_job(job)
+    return job
+
+
+async def _existing_rows(session: AsyncSession, business_id: str, category: str):
+    result = await session.execute(
+        select(KnowledgeBase.id, KnowledgeBase.content_hash, KnowledgeBase.chunk_index).where(
+            KnowledgeBase.business_id == business_id, KnowledgeBase.category == category
+        )
+    )
+    return [tuple(row) for row in result.all()]
+
+
+async def _stored_embeddings(session: AsyncSession, business_id: str, hashes: list[str]) -> dict[str, list[float]]:
+    """Embeddings already stored for any of `hashes` in the business's other rows."""
+    if not hashes:
+        return {}
+    result = await session.execute(
+        select(KnowledgeBase.content_hash, KnowledgeBase.embedding).where(
+            KnowledgeBase.business_id == business_id,
+            KnowledgeBase.content_hash.in_(hashes),
+            KnowledgeBase.embedding.is_not(None),
+        )
+    )
+    return {row.content_hash: row.embedding for row in result.all()}
+
+
+def _vector_literal(vector) -> str:
+    return "[" + ",".join(map(str, np.asarray(vector).tolist())) + "]"
+
+
+async def _copy_rows(
+    session: AsyncSession, business_id: str, category: str, rows: list[tuple[int, str, str]], embeddings: dict
+) -> None:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    now = datetime.now(timezone.utc).isoformat()
+    for chunk_index, chunk, chunk_hash in rows:
+        embedding = embeddings[chunk_hash]
+        writer.writerow(
+            [
+                uuid.uuid4(),
+                business_id,
+                category,
+                chunk,
+                chunk_index,
+                chunk_hash,
+                _vector_literal(embedding),
+                _vector_literal(compact_embedding(embedding)),
+                now,
+            ]
+        )
+    connection = await session.connection()
+    raw = await connection.get_raw_connection()
+    # CSV text COPY needs no pgvector codec on the pooled asyncpg connection.
+    await raw.driver_connection.copy_to_table(
+        KnowledgeBase.__tablename__,
+        source=io.BytesIO(buffer.getvalue().encode("utf-8")),
+        columns=_COPY_COLUMNS,
+        format="csv",
+    )
+
+
+async def ingest_category(
+    session: AsyncSession, job: dict, business_id: str, category: str, chunks: list[Chunk]
+) -> None:
+    job.update(status="embedding", total_chunks=len(chunks))
+    texts = [chunk.text for chunk in chunks]
+    plan = plan_category(texts, await _existing_rows(session, business_id, category))
+    embeddings = await _stored_embeddings(session, business_id, [chunk_hash for _, _, chunk_hash in plan.add])
+    await session.rollback()
+    job["reused"] = len(embeddings)
+
+    async def embed_missing(rows: list[tuple[int, str, str]]) -> None:
+        # Embedded with their heading path; repeated chunks are embedded once.
+        missing = list(
+            {
+                chunk_hash: chunks[chunk_index].embedding_input()
+                for chunk_index, _, chunk_hash in rows
+                if chunk_hash not in embeddings
+            }.items()
+        )
+        job["to_embed"] += len(missing)
+        await save_job(job)
+
+        async def progress(count: int) -> None:
+            job["embedded"] += count
+            await save_job(job)
+
+        vectors = await embed_in_batches([content for _, content in missing], business_id, progress)
+        embeddings.update({chunk_hash: vector for (chunk_hash, _), vector in zip(missing, vectors)})
+
+    # Embedding runs outside any transaction; the write below re-plans under a lock in
+    # case another upload of the same category finished meanwhile.
+    await embed_missing(plan.add)
+    job["status"] = "writing"
+    await save_job(job)
+    await session.execute(
+        text("SELECT pg_advisory_xact_lock(hashtext(:lock_key))"), {"lock_key": f"kb:{business_id}:{category}"}
+    )
+    plan = plan_category(texts, await _existing_rows(session, business_id, category))
+    await embed_missing(plan.add)
+    if plan.remove:
+        await session.execute(delete(KnowledgeBase).where(KnowledgeBase.id.in_(plan.remove)))
+    if plan.moved:
+        table = KnowledgeBase.__table__
+        await session.execute(
+            update(table)
+            .where(table.c.id == bindparam("row_id"))
+            .values(chunk_index=bindparam("new_index"), updated_at=func.now()),
+            [{"row_id": row_id, "new_index": chunk_index} for row_id, chunk_index in plan.moved.items()],
+        )
+    if plan.add:
+        await _copy_rows(session, business_id, category, plan.add, embeddings)
+    await session.commit()
+    job.update(status="done", kept=len(plan.keep), added=len(plan.add), removed=len(plan.remove))
+    await bump_kb_version(business_id)
+
+
+async def run_ingestion(job: dict, category: str, chunks: list[Chunk]) -> None:
+    """Background task body: diff, embed and write one category upload."""
+    business_id = job["business_id"]
+    started = time.perf_counter()
+    try:
+        async with AsyncSessionLocal() as session:
+            await ingest_category(session, job, business_id, category, chunks)
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("kb_ingest_failed", job_id=job["job_id"], business_id=business_id)
+        job.update(status="failed", error=f"{type(exc).__name__}: {exc}")
+    else:
+        logger.info(
+            "kb_ingest_done",
+            job_id=job["job_id"],
+            business_id=business_id,
+            kept=job["kept"],
+            added=job["added"],
+            removed=job["removed"],
+            seconds=round(time.perf_counter() - started, 2),
+        )
+    await save_job(job)
@@ -0,0 +1,48 @@
+"""Per-business knowledge base version stamp.
+
+Anything derived from a business's knowledge base (cached answers, in-memory vector
+indexes) records the version it was built from and rebuilds when it changes. The stamp
+lives in Redis so an upload on one worker reaches the others within a few seconds.
+"""
+
+from redis.exceptions import RedisError
+
+from app.core.cache import TTLCache
+from app.core.logging import get_logger
+from app.services.session_state import get_redis, redis_enabled
+
+
+logger = get_logger()
+_REFRESH_SECONDS = 5.0
+_local_versions: TTLCache[str, int] = TTLCache(100_000, _REFRESH_SECONDS)
+# Without Redis (Upstash REST only) the version is per process.
+_process_versions: dict[str, int] = {}
+
+
+def _key(business_id: str) -> str:
+    return f"kb_version:{business_id}"
+
+
+async def get_kb_version(business_id: str) -> int:
+    version = _local_versions.get(business_id)
+    if version is not None:
+        return version
+    version = _process_versions.get(business_id, 0)
+    if redis_enabled():
+        try:
+            version = int(await get_redis().get(_key(business_id)) or 0)
+        except (RedisError, OSError) as exc:
+            logger.warning("kb_version_read_failed", business_id=business_id, error=str(exc))
+    _local_versions.set(business_id, version)
+    return version
+
+
+async def bump_kb_version(business_id: str) -> None:
+    """Invalidate everything derived from the business's knowledge base, on every worker."""
+    _process_versions[business_id] = _process_versions.get(business_id, 0) + 1
+    if redis_enabled():
+        try:
+            await get_redis().incr(_key(business_id))
+        except (RedisError, OSError) as exc:
+            logger.warning("kb_version_bump_failed", business_id=business_id, error=str(exc))
+    _local_versions.pop(business_id)
@@ -1,4 +1,13 @@
+import numpy as np
+
+from app.services.embedding_cache import get_embedding_cache
 from app.services.openai_client import get_openai_client
+from app.services.openai_gateway import BACKGROUND, EMBED, get_openai_gateway
+from app.services.turn_detection import normalize_utterance
+
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+COMPACT_DIMENSIONS = 512
 
 
 def chunk_text(text: str, chunk_size: int = 800, overlap: int = 100) -> list[str]:
@@ -15,13 +24,39 @@ def chunk_text(text: str, chunk_size: int = 800, overlap: int = 100) -> list[str
     return chunks
 
 
-async def embed_text(text: str) -> list[float]:
-    client = get_openai_client()
-    response = await client.embeddings.create(model="text-embedding-3-small", input=text)
-    return response.data[0].embedding
+def compact_embedding(vector) -> np.ndarray:
+    """Shorten a text-embedding-3 vector to COMPACT_DIMENSIONS.
+
+    These models are trained so a prefix of the vector is itself a usable embedding
+    (the API's `dimensions` parameter does the same), as long as it is re-normalized.
+    """
+    prefix = np.asarray(vector, dtype=np.float32)[:COMPACT_DIMENSIONS]
+    norm = float(np.linalg.norm(prefix))
+    return prefix / norm if norm else prefix
+
+
+async def embed_text(text: str, business_id: str | None = None) -> np.ndarray:
+    """Embed a caller query, served from the embedding cache where possible.
+
+    The cache is keyed on the normalized text so casing and punctuation variants share
+    an entry, but the original text is what gets embedded, like the stored chunks.
+    """
+    original = text.strip()
+    normalized = normalize_utterance(text) or original
+
+    async def compute() -> list[float]:
+        client = get_openai_client()
+        response = await get_openai_gateway().call(
+            EMBED, lambda: client.embeddings.create(model=EMBEDDING_MODEL, input=original), tenant=business_id
+        )
+        return response.data[0].embedding
+
+    return await get_embedding_cache().get_or_compute(EMBEDDING_MODEL, normalized, compute)
 
 
-async def embed_many(texts: list[str]) -> list[list[float]]:
+async def embed_many(texts: list[str], business_id: str | None = None) -> list[list[float]]:
     client = get_openai_client()
-    response = await client.embeddings.create(model="text-embedding-3-small", input=texts)
+    response = await get_openai_gateway().call(
+        BACKGROUND, lambda: client.embeddings.create(model=EMBEDDING_MODEL, input=texts), tenant=business_id
+    )
     return [item.embedding for item in response.data]
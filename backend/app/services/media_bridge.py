@@ -1,16 +1,36 @@
 import asyncio
 from collections.abc import AsyncIterator
 
+from app.core.metrics import ACTIVE_CALLS, MEDIA_QUEUE_DEPTH
+from app.services.observability import TurnTimer
+
 
 class CallMediaChannels:
     def __init__(self) -> None:
         self.inbound_audio: asyncio.Queue[bytes] = asyncio.Queue()
-        self.outbound_audio: asyncio.Queue[bytes] = asyncio.Queue()
+        # Reply frames carry the turn they answer, so the media sender marks that turn's
+        # first outbound frame rather than one left over from the previous reply.
+        self.outbound_audio: asyncio.Queue[tuple[TurnTimer | None, bytes]] = asyncio.Queue()
 
 
 _channels: dict[str, CallMediaChannels] = {}
 
 
+def _queue_depths() -> dict[tuple[str, ...], float]:
+    inbound = [channels.inbound_audio.qsize() for channels in _channels.values()] or [0]
+    outbound = [channels.outbound_audio.qsize() for channels in _channels.values()] or [0]
+    return {
+        ("inbound", "total"): sum(inbound),
+        ("inbound", "max"): max(inbound),
+        ("outbound", "total"): sum(outbound),
+        ("outbound", "max"): max(outbound),
+    }
+
+
+MEDIA_QUEUE_DEPTH.set_function(_queue_depths)
+ACTIVE_CALLS.set_function(lambda: len(_channels))
+
+
 def register_call(call_id: str) -> CallMediaChannels:
     channels = CallMediaChannels()
     _channels[call_id] = channels
@@ -31,10 +51,10 @@ async def push_audio(call_id: str, data: bytes) -> None:
         await channels.inbound_audio.put(data)
 
 
-async def push_tts_audio(call_id: str, data: bytes) -> None:
+async def push_tts_audio(call_id: str, data: bytes, turn: TurnTimer | None = None) -> None:
     channels = _channels.get(call_id)
     if channels:
-        await channels.outbound_audio.put(data)
+        await channels.outbound_audio.put((turn, data))
 
 
 async def iter_audio(call_id: str) -> AsyncIterator[bytes]:
@@ -45,7 +65,7 @@ async def iter_audio(call_id: str) -> AsyncIterator[bytes]:
         yield await channels.inbound_audio.get()
 
 
-async def iter_tts_audio(call_id: str) -> AsyncIterator[bytes]:
+async def iter_tts_audio(call_id: str) -> AsyncIterator[tuple[TurnTimer | None, bytes]]:
     channels = _channels.get(call_id)
     if not channels:
         return
@@ -1,5 +1,7 @@
 from app.core.config import get_settings
+from app.services.observability import stage_span
 from app.services.openai_client import get_openai_client
+from app.services.openai_gateway import CLASSIFY, OpenAIUnavailable, get_openai_gateway
 
 
 def heuristic_is_complex(text: str) -> bool:
@@ -9,21 +11,28 @@ def heuristic_is_complex(text: str) -> bool:
     return any(keyword in text.lower() for keyword in keywords)
 
 
-async def llm_is_complex(text: str) -> bool:
+async def llm_is_complex(text: str, business_id: str | None = None) -> bool:
     client = get_openai_client()
     prompt = (
         "Classify if this user request requires a complex model. "
         "Respond with only 'yes' or 'no'.\n\n"
         f"Text:\n{text}"
     )
-    response = await client.responses.create(model="gpt-4o-mini", input=prompt)
+    try:
+        response = await get_openai_gateway().call(
+            CLASSIFY, lambda: client.responses.create(model="gpt-4o-mini", input=prompt), tenant=business_id
+        )
+    except OpenAIUnavailable:
+        # The keyword heuristic has already run; default to the fast model rather than stall the turn.
+        return False
     return "yes" in response.output_text.lower()
 
 
-async def choose_model(text: str) -> str:
+async def choose_model(text: str, business_id: str | None = None) -> str:
     settings = get_settings()
-    if heuristic_is_complex(text):
-        return settings.openai_complex_model
-    if await llm_is_complex(text):
-        return settings.openai_complex_model
-    return settings.openai_primary_model
+    with stage_span("model_routing"):
+        if heuristic_is_complex(text):
+            return settings.openai_complex_model
+        if await llm_is_complex(text, business_id):
+            return settings.openai_complex_model
+        return settings.openai_primary_model
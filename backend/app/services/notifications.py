@@ -10,6 +10,7 @@ import httpx
 
 from app.core.config import get_settings
 from app.core.logging import get_logger
+from app.core.metrics import WEBHOOK_DELIVERIES, MeteredTransport, track_provider
 from app.realtime.socket import emit_escalation
 from app.services.action_delivery import create_delivery, update_delivery
 from app.db.models import ActionDeliveryStatus
@@ -52,7 +53,8 @@ def send_fcm(push_token: str, title: str, body: str) -> None:
         notification=messaging.Notification(title=title, body=body),
         token=push_token,
     )
-    messaging.send(message)
+    with track_provider("fcm"):
+        messaging.send(message)
 
 
 def send_sms(phone: str, body: str) -> None:
@@ -60,7 +62,8 @@ def send_sms(phone: str, body: str) -> None:
     if not settings.twilio_sid or not settings.twilio_token or not settings.twilio_from_number:
         return
     client = TwilioClient(settings.twilio_sid, settings.twilio_token)
-    client.messages.create(from_=settings.twilio_from_number, to=phone, body=body)
+    with track_provider("twilio"):
+        client.messages.create(from_=settings.twilio_from_number, to=phone, body=body)
 
 
 def send_email(to_email: str, subject: str, body: str) -> None:
@@ -68,7 +71,8 @@ def send_email(to_email: str, subject: str, body: str) -> None:
     if not settings.sendgrid_api_key or not settings.sendgrid_from_email:
         return
     message = Mail(from_email=settings.sendgrid_from_email, to_emails=to_email, subject=subject, html_content=body)
-    SendGridAPIClient(settings.sendgrid_api_key).send(message)
+    with track_provider("sendgrid"):
+        SendGridAPIClient(settings.sendgrid_api_key).send(message)
 
 
 async def trigger_action_point(action_type: str, details: dict[str, Any], call_id: str | None = None) -> None:
@@ -79,22 +83,29 @@ async def trigger_action_point(action_type: str, details: dict[str, Any], call_i
     if action_type == "sms":
         attempts = 1
         send_sms(details.get("to"), details.get("body", ""))
-        await update_delivery(delivery.id, ActionDeliveryStatus.success, attempts, None)
+        await _finish_delivery(delivery.id, action_type, ActionDeliveryStatus.success, attempts, None)
     elif action_type == "email":
         attempts = 1
         send_email(details.get("to"), details.get("subject", "Notification"), details.get("body", ""))
-        await update_delivery(delivery.id, ActionDeliveryStatus.success, attempts, None)
+        await _finish_delivery(delivery.id, action_type, ActionDeliveryStatus.success, attempts, None)
     elif action_type == "webhook":
         url = details.get("url")
         if url:
-            async with httpx.AsyncClient(timeout=10) as client:
+            async with httpx.AsyncClient(timeout=10, transport=MeteredTransport("webhook")) as client:
                 payload = details.get("payload", {})
                 headers = build_webhook_headers(payload)
                 attempts, last_error = await _post_with_retries(client, url, payload, headers)
                 status = ActionDeliveryStatus.success if not last_error else ActionDeliveryStatus.failed
-                await update_delivery(delivery.id, status, attempts, last_error)
+                await _finish_delivery(delivery.id, action_type, status, attempts, last_error)
     else:
-        await update_delivery(delivery.id, ActionDeliveryStatus.failed, attempts, "Unknown action type")
+        await _finish_delivery(delivery.id, action_type, ActionDeliveryStatus.failed, attempts, "Unknown action type")
+
+
+async def _finish_delivery(
+    delivery_id, action_type: str, status: ActionDeliveryStatus, attempts: int, last_error: str | None
+) -> None:
+    WEBHOOK_DELIVERIES.labels(action_type, status.value).inc()
+    await update_delivery(delivery_id, status, attempts, last_error)
 
 
 async def _post_with_retries(client: httpx.AsyncClient, url: str, payload: dict, headers: dict) -> tuple[int, str | None]:
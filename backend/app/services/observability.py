@@ -1,11 +1,118 @@
+import asyncio
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.logging import get_logger
+from app.core.metrics import TURN_STAGE_LATENCY
 from app.db.models import CallEvent
 
 
+logger = get_logger()
+
+TURN_STAGES = (
+    # Caller silence (VAD) when the turn was committed, i.e. the endpointing wait.
+    "endpoint_silence",
+    "rag_embed",
+    "rag_query",
+    "model_routing",
+    "llm_first_token",
+    "llm_complete",
+    "tts_first_byte",
+    "transcode",
+    "first_outbound_frame",
+)
+
+
 async def record_call_event(session: AsyncSession, call_id: str, event_type: str, details: dict) -> None:
     event = CallEvent(call_id=call_id, event_type=event_type, details=details, timestamp=datetime.utcnow())
     session.add(event)
     await session.commit()
+
+
+_stage_histograms = {stage: TURN_STAGE_LATENCY.labels(stage) for stage in TURN_STAGES}
+
+
+class TurnTimer:
+    """Per-turn stage timings in milliseconds.
+
+    Durations (`span`) accumulate if a stage runs more than once; `mark` records
+    the offset from the start of the turn, for first-token/first-frame style stages.
+    """
+
+    def __init__(self, turn: int = 0) -> None:
+        self.turn = turn
+        self.started = time.perf_counter()
+        self.stages: dict[str, float] = {}
+        self.first_frame_sent = asyncio.Event()
+
+    def record(self, stage: str, value_ms: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + value_ms
+
+    def mark(self, stage: str) -> None:
+        if stage not in self.stages:
+            self.stages[stage] = (time.perf_counter() - self.started) * 1000
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, (time.perf_counter() - started) * 1000)
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def details(self) -> dict:
+        return {
+            "turn": self.turn,
+            "total_ms": round(self.elapsed_ms(), 1),
+            "stages_ms": {stage: round(value, 1) for stage, value in self.stages.items()},
+        }
+
+
+_current_turn: ContextVar[TurnTimer | None] = ContextVar("current_turn", default=None)
+
+
+def current_turn() -> TurnTimer | None:
+    return _current_turn.get()
+
+
+@contextmanager
+def use_turn(timer: TurnTimer) -> Iterator[TurnTimer]:
+    token = _current_turn.set(timer)
+    try:
+        yield timer
+    finally:
+        _current_turn.reset(token)
+
+
+@contextmanager
+def stage_span(stage: str) -> Iterator[None]:
+    timer = _current_turn.get()
+    if timer is None:
+        yield
+        return
+    with timer.span(stage):
+        yield
+
+
+def record_stage(stage: str, value_ms: float) -> None:
+    timer = _current_turn.get()
+    if timer is not None:
+        timer.record(stage, value_ms)
+
+
+async def record_turn_latency(session: AsyncSession, call_id: str, timer: TurnTimer) -> None:
+    for stage, value in timer.stages.items():
+        histogram = _stage_histograms.get(stage)
+        if histogram:
+            histogram.observe(value / 1000)
+    details = timer.details()
+    logger.info("turn_latency", call_id=call_id, **details)
+    await record_call_event(session, call_id, "turn_latency", details)
@@ -1,6 +1,7 @@
-from openai import AsyncOpenAI
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 
 from app.core.config import get_settings
+from app.core.metrics import MeteredTransport
 
 
 _client: AsyncOpenAI | None = None
@@ -11,5 +12,11 @@ def get_openai_client() -> AsyncOpenAI:
     if _client is None:
         settings = get_settings()
         api_key = settings.openai_api_key.strip()
-        _client = AsyncOpenAI(api_key=api_key)
+        _client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=settings.openai_base_url,
+            # Retries, hedging and deadlines are owned by openai_gateway.
+            max_retries=0,
+            http_client=DefaultAsyncHttpxClient(transport=MeteredTransport("openai")),
+        )
     return _client
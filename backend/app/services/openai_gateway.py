@@ -0,0 +1,248 @@
+"""Deadlines, concurrency limits, retries and hedging for OpenAI requests.
+
+Callers keep building their own SDK calls and hand them to the gateway as a zero-argument
+factory, so one request can be retried or hedged by calling the factory again:
+
+    response = await get_openai_gateway().call(CLASSIFY, lambda: client.responses.create(...))
+
+Each purpose has a total deadline that includes waiting for a concurrency slot, backoff
+sleeps and hedged attempts. Anything that does not produce a result inside it surfaces as
+`OpenAIUnavailable`, so callers have a single failure to handle.
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import AsyncExitStack, asynccontextmanager, suppress
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+import openai
+
+from app.core.config import get_settings
+from app.core.logging import get_logger
+from app.core.metrics import OPENAI_GATEWAY_OUTCOMES
+
+
+logger = get_logger()
+T = TypeVar("T")
+
+REALTIME = "realtime"
+CLASSIFY = "classify"
+EMBED = "embed"
+BACKGROUND = "background"
+
+FALLBACK_REPLY = "Sorry, I'm having a little trouble on my end. Could you say that again?"
+
+
+class OpenAIUnavailable(Exception):
+    """No usable OpenAI result within the purpose's deadline."""
+
+
+@dataclass(frozen=True)
+class Budget:
+    deadline_seconds: float
+    max_attempts: int
+    hedge: bool
+
+
+class LatencyWindow:
+    """Rolling window of successful request latencies, used to pick the hedge delay."""
+
+    def __init__(self, size: int = 200, min_samples: int = 20) -> None:
+        self._samples: deque[float] = deque(maxlen=size)
+        self._min_samples = min_samples
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def p95(self) -> float | None:
+        if len(self._samples) < self._min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[int(len(ordered) * 0.95) - 1]
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, openai.APIConnectionError):
+        return True
+    if isinstance(exc, openai.APIStatusError):
+        return exc.status_code in {408, 409, 429} or exc.status_code >= 500
+    return False
+
+
+class OpenAIGateway:
+    def __init__(
+        self,
+        budgets: dict[str, Budget],
+        max_concurrency: int,
+        tenant_concurrency: int,
+        hedge_enabled: bool = True,
+    ) -> None:
+        self._budgets = budgets
+        self._global = asyncio.Semaphore(max_concurrency)
+        self._tenant_concurrency = tenant_concurrency
+        self._tenants: dict[str, asyncio.Semaphore] = {}
+        self._hedge_enabled = hedge_enabled
+        self._latency = {purpose: LatencyWindow() for purpose in budgets}
+
+    @asynccontextmanager
+    async def _slot(self, tenant: str | None) -> AsyncIterator[None]:
+        async with AsyncExitStack() as stack:
+            if tenant:
+                semaphore = self._tenants.get(tenant)
+                if semaphore is None:
+                    semaphore = self._tenants[tenant] = asyncio.Semaphore(self._tenant_concurrency)
+                await stack.enter_async_context(semaphore)
+            await stack.enter_async_context(self._global)
+            yield
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter keeps retries from a burst of 429s from arriving together.
+        return random.uniform(0, min(2.0, 0.2 * 2**attempt))
+
+    async def _hedged(self, purpose: str, request: Callable[[], Awaitable[T]]) -> T:
+        """Run `request`, starting a second copy if the first outlives the recent p95."""
+        budget = self._budgets[purpose]
+        window = self._latency[purpose]
+        delay = window.p95() if budget.hedge and self._hedge_enabled else None
+        started = time.perf_counter()
+        pending = {asyncio.ensure_future(request())}
+        hedge_slot = False
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(pending, timeout=delay)
+                # Only hedge with spare global capacity; a hedge must never queue behind real work.
+                if not done and not self._global.locked():
+                    await self._global.acquire()
+                    hedge_slot = True
+                    OPENAI_GATEWAY_OUTCOMES.labels(purpose, "hedge").inc()
+                    pending.add(asyncio.ensure_future(request()))
+            error: BaseException | None = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        window.record(time.perf_counter() - started)
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+            if hedge_slot:
+                self._global.release()
+
+    async def _attempts(
+        self,
+        purpose: str,
+        request: Callable[[], Awaitable[T]],
+        tenant: str | None,
+        keep_slot: AsyncExitStack | None = None,
+    ) -> T:
+        """Run `request` with retries, taking a concurrency slot per attempt.
+
+        Slots are not held through the backoff between attempts, so one tenant's retries
+        don't starve the limits. With `keep_slot`, the successful attempt's slot is
+        handed to that stack (for a stream still being read).
+        """
+        budget = self._budgets[purpose]
+        for attempt in range(budget.max_attempts):
+            try:
+                async with AsyncExitStack() as slot:
+                    await slot.enter_async_context(self._slot(tenant))
+                    result = await self._hedged(purpose, request)
+                    if keep_slot is not None:
+                        keep_slot.push_async_callback(slot.pop_all().aclose)
+                    return result
+            except Exception as exc:  # noqa: BLE001
+                if not _is_retryable(exc) or attempt == budget.max_attempts - 1:
+                    OPENAI_GATEWAY_OUTCOMES.labels(purpose, "error").inc()
+                    raise OpenAIUnavailable(f"{purpose}: {type(exc).__name__}: {exc}") from exc
+                OPENAI_GATEWAY_OUTCOMES.labels(purpose, "retry").inc()
+                await asyncio.sleep(self._backoff(attempt))
+        raise OpenAIUnavailable(f"{purpose}: no attempts configured")
+
+    async def call(self, purpose: str, request: Callable[[], Awaitable[T]], tenant: str | None = None) -> T:
+        budget = self._budgets[purpose]
+        try:
+            async with asyncio.timeout(budget.deadline_seconds):
+                result = await self._attempts(purpose, request, tenant)
+        except TimeoutError as exc:
+            OPENAI_GATEWAY_OUTCOMES.labels(purpose, "timeout").inc()
+            raise OpenAIUnavailable(f"{purpose}: deadline of {budget.deadline_seconds}s exceeded") from exc
+        OPENAI_GATEWAY_OUTCOMES.labels(purpose, "ok").inc()
+        return result
+
+    async def stream_text(
+        self,
+        purpose: str,
+        open_stream: Callable[[], Awaitable[Any]],
+        tenant: str | None = None,
+    ) -> AsyncIterator[str]:
+        """Yield output text deltas of a streamed Responses API call.
+
+        Retries and hedging cover the wait for the first token; after that the stream
+        is consumed as-is until the purpose's deadline.
+        """
+        budget = self._budgets[purpose]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + budget.deadline_seconds
+
+        async def first_delta() -> tuple[Any, str]:
+            stream = await open_stream()
+            try:
+                async for event in stream:
+                    if event.type == "response.output_text.delta":
+                        return stream, event.delta
+            except BaseException:
+                with suppress(Exception):
+                    await stream.close()
+                raise
+            return stream, ""
+
+        async with AsyncExitStack() as stack:
+            try:
+                async with asyncio.timeout_at(deadline):
+                    stream, delta = await self._attempts(purpose, first_delta, tenant, keep_slot=stack)
+            except TimeoutError as exc:
+                OPENAI_GATEWAY_OUTCOMES.labels(purpose, "timeout").inc()
+                raise OpenAIUnavailable(f"{purpose}: no first token within {budget.deadline_seconds}s") from exc
+            stack.push_async_callback(stream.close)
+            if delta:
+                yield delta
+            while True:
+                try:
+                    event = await asyncio.wait_for(anext(stream), timeout=max(0.0, deadline - loop.time()))
+                except StopAsyncIteration:
+                    break
+                except TimeoutError as exc:
+                    OPENAI_GATEWAY_OUTCOMES.labels(purpose, "timeout").inc()
+                    raise OpenAIUnavailable(f"{purpose}: stream exceeded {budget.deadline_seconds}s") from exc
+                if event.type == "response.output_text.delta":
+                    yield event.delta
+        OPENAI_GATEWAY_OUTCOMES.labels(purpose, "ok").inc()
+
+
+_gateway: OpenAIGateway | None = None
+
+
+def get_openai_gateway() -> OpenAIGateway:
+    global _gateway
+    if _gateway is None:
+        settings = get_settings()
+        budgets = {
+            REALTIME: Budget(settings.openai_realtime_deadline_seconds, max_attempts=2, hedge=True),
+            CLASSIFY: Budget(settings.openai_classify_deadline_seconds, max_attempts=1, hedge=True),
+            EMBED: Budget(settings.openai_embed_deadline_seconds, max_attempts=2, hedge=True),
+            BACKGROUND: Budget(settings.openai_background_deadline_seconds, max_attempts=4, hedge=False),
+        }
+        _gateway = OpenAIGateway(
+            budgets,
+            max_concurrency=settings.openai_max_concurrency,
+            tenant_concurrency=settings.openai_tenant_concurrency,
+            hedge_enabled=settings.openai_hedge_enabled,
+        )
+    return _gateway
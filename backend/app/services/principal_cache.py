@@ -0,0 +1,116 @@
+"""Short-lived cache of authenticated principals for `get_current_user`.
+
+Dashboard polling resolves the same user on every request. Principals are kept per worker
+for a few seconds and in Redis for `AUTH_PRINCIPAL_CACHE_SECONDS`, keyed by user, so most
+requests need no user lookup. A cached principal only answers tokens carrying its
+`token_version`; `revoke_tokens` bumps the version and drops the Redis entry, so tokens
+issued before a password or role change stop working at once on every worker but the
+one holding a local copy, which expires within `_LOCAL_SECONDS`. Updating or deleting a
+user (and linking a new business) drops the Redis entry the same way.
+
+Cached principals are detached `User` objects: routes may read them, but changes to the
+user must be written with an explicit UPDATE followed by `invalidate_principal`.
+"""
+
+import json
+import uuid
+
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.core.logging import get_logger
+from app.core.metrics import PRINCIPAL_CACHE
+from app.db.models import User, UserRole
+from app.services.session_state import get_redis, redis_enabled
+
+
+logger = get_logger()
+_LOCAL_SECONDS = 5.0
+_local: TTLCache[str, dict] = TTLCache(10_000, _LOCAL_SECONDS)
+_local_hit = PRINCIPAL_CACHE.labels("local_hit")
+_redis_hit = PRINCIPAL_CACHE.labels("redis_hit")
+_miss = PRINCIPAL_CACHE.labels("miss")
+
+
+def _key(user_id: uuid.UUID) -> str:
+    return f"principal:{user_id}"
+
+
+def _fields(user: User) -> dict:
+    return {
+        "id": str(user.id),
+        "email": user.email,
+        "role": user.role.value,
+        "business_id": str(user.business_id) if user.business_id else None,
+        "phone": user.phone,
+        "push_token": user.push_token,
+        "token_version": user.token_version,
+    }
+
+
+def _user(fields: dict) -> User:
+    return User(
+        id=uuid.UUID(fields["id"]),
+        email=fields["email"],
+        role=UserRole(fields["role"]),
+        business_id=uuid.UUID(fields["business_id"]) if fields["business_id"] else None,
+        phone=fields["phone"],
+        push_token=fields["push_token"],
+        token_version=fields["token_version"],
+    )
+
+
+async def get_principal(user_id: uuid.UUID, token_version: int) -> User | None:
+    if not get_settings().auth_principal_cache_seconds:
+        return None
+    key = _key(user_id)
+    fields = _local.get(key)
+    if fields is not None and fields["token_version"] == token_version:
+        _local_hit.inc()
+        return _user(fields)
+    if redis_enabled():
+        try:
+            data = await get_redis().get(key)
+        except (RedisError, OSError) as exc:
+            logger.warning("principal_cache_read_failed", user_id=str(user_id), error=str(exc))
+        else:
+            fields = json.loads(data) if data else None
+            if fields is not None and fields["token_version"] == token_version:
+                _redis_hit.inc()
+                _local.set(key, fields)
+                return _user(fields)
+    _miss.inc()
+    return None
+
+
+async def cache_principal(user: User) -> None:
+    ttl = get_settings().auth_principal_cache_seconds
+    if not ttl:
+        return
+    key = _key(user.id)
+    fields = _fields(user)
+    _local.set(key, fields)
+    if redis_enabled():
+        try:
+            await get_redis().set(key, json.dumps(fields), ex=ttl)
+        except (RedisError, OSError) as exc:
+            logger.warning("principal_cache_write_failed", user_id=str(user.id), error=str(exc))
+
+
+async def invalidate_principal(user: User) -> None:
+    key = _key(user.id)
+    _local.pop(key)
+    if redis_enabled():
+        try:
+            await get_redis().delete(key)
+        except (RedisError, OSError) as exc:
+            logger.warning("principal_cache_invalidate_failed", user_id=str(user.id), error=str(exc))
+
+
+async def revoke_tokens(session: AsyncSession, user: User) -> None:
+    """Reject every token issued to `user` so far: bump its version, commit, drop the cache."""
+    user.token_version += 1
+    await session.commit()
+    await invalidate_principal(user)
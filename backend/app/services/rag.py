@@ -1,38 +1,234 @@
-from sqlalchemy import text
+from functools import lru_cache
+
+import numpy as np
+from pgvector.sqlalchemy import HALFVEC, Vector
+from sqlalchemy import Float, Integer, String, Text, TextualSelect, bindparam, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.services.knowledge_base import embed_text
+from app.core.config import get_settings
+from app.core.logging import get_logger
+from app.services.context_packer import RetrievedChunk, query_relevance
+from app.services.knowledge_base import COMPACT_DIMENSIONS, compact_embedding, embed_text
+from app.services.observability import stage_span
+from app.services.openai_gateway import OpenAIUnavailable
+from app.services.vector_index import FusionWeights, get_vector_index
 
 
-async def rag_query(
-    session: AsyncSession,
-    business_id: str,
-    query: str,
-    limit: int = 5,
-    category: str | None = None,
-) -> list[str]:
-    embedding = await embed_text(query)
-    if category:
-        sql = text(
-            """
-            SELECT content
+logger = get_logger()
+
+# relaxed_order iterative scans may return neighbours slightly out of order, so the
+# materialized inner scan is re-sorted by its exact distance.
+_NEAREST_SQL = {
+    "full": """
+        WITH nearest AS MATERIALIZED (
+            SELECT content, category, chunk_index, embedding, embedding <-> :embedding AS distance
             FROM knowledge_bases
-            WHERE business_id = :business_id AND category = :category
+            WHERE business_id = :business_id{category_filter}
             ORDER BY embedding <-> :embedding
             LIMIT :limit
-            """
         )
-        params = {"business_id": business_id, "category": category, "embedding": embedding, "limit": limit}
-    else:
-        sql = text(
-            """
-            SELECT content
+        SELECT content, category, chunk_index, embedding FROM nearest ORDER BY distance
+    """,
+    "compact": """
+        WITH nearest AS MATERIALIZED (
+            SELECT id, embedding_compact <-> :compact AS distance
             FROM knowledge_bases
-            WHERE business_id = :business_id
-            ORDER BY embedding <-> :embedding
+            WHERE business_id = :business_id{category_filter}
+            ORDER BY embedding_compact <-> :compact
             LIMIT :limit
-            """
         )
-        params = {"business_id": business_id, "embedding": embedding, "limit": limit}
-    result = await session.execute(sql, params)
-    return [row[0] for row in result.fetchall()]
+        SELECT kb.content, kb.category, kb.chunk_index, kb.embedding
+        FROM knowledge_bases AS kb
+        JOIN nearest USING (id)
+        ORDER BY nearest.distance
+    """,
+    # Hamming distance on 64-byte binary codes picks candidates; full vectors decide the order.
+    "binary_rerank": """
+        WITH candidates AS MATERIALIZED (
+            SELECT id
+            FROM knowledge_bases
+            WHERE business_id = :business_id{category_filter}
+            ORDER BY binary_quantize(embedding_compact)::bit(512) <~> binary_quantize(CAST(:compact AS halfvec(512)))
+            LIMIT :candidates
+        )
+        SELECT kb.content, kb.category, kb.chunk_index, kb.embedding
+        FROM knowledge_bases AS kb
+        JOIN candidates USING (id)
+        ORDER BY kb.embedding <-> :embedding
+        LIMIT :limit
+    """,
+}
+
+# Vector and full-text candidates in one round trip, merged by weighted reciprocal rank
+# fusion: score = sum(weight / (rrf_k + rank)). The caller's words are OR-ed together so a
+# single matching SKU or name is enough to make a chunk a lexical candidate.
+_HYBRID_SQL = """
+    WITH weights AS (
+        SELECT coalesce(:vector_weight_override, kb_vector_weight, :vector_weight) AS vector_weight,
+               coalesce(:lexical_weight_override, kb_lexical_weight, :lexical_weight) AS lexical_weight
+        FROM businesses
+        WHERE id = :business_id
+    ),
+    vector_hits AS MATERIALIZED (
+        SELECT id, row_number() OVER (ORDER BY distance) AS rank
+        FROM (
+            SELECT id, {distance} AS distance
+            FROM knowledge_bases
+            WHERE business_id = :business_id{category_filter}
+            ORDER BY {distance}
+            LIMIT :candidates
+        ) AS nearest
+    ),
+    lexical_hits AS MATERIALIZED (
+        SELECT id, row_number() OVER (ORDER BY score DESC) AS rank
+        FROM (
+            SELECT id, ts_rank_cd(content_tsv, query) AS score
+            FROM knowledge_bases,
+                 CAST(replace(plainto_tsquery('english', :query)::text, ' & ', ' | ') AS tsquery) AS query
+            WHERE business_id = :business_id{category_filter} AND content_tsv @@ query
+            ORDER BY score DESC
+            LIMIT :candidates
+        ) AS matched
+    ),
+    fused AS (
+        SELECT hits.id, sum(hits.weight / (:rrf_k + hits.rank)) AS score
+        FROM (
+            SELECT id, rank, weights.vector_weight AS weight FROM vector_hits, weights
+            UNION ALL
+            SELECT id, rank, weights.lexical_weight AS weight FROM lexical_hits, weights
+        ) AS hits
+        GROUP BY hits.id
+    )
+    SELECT kb.content, kb.category, kb.chunk_index, kb.embedding
+    FROM fused
+    JOIN knowledge_bases AS kb USING (id)
+    ORDER BY fused.score DESC
+    LIMIT :limit
+"""
+
+_HYBRID_DISTANCE = {
+    "full": "embedding <-> :embedding",
+    "compact": "embedding_compact <-> :compact",
+}
+
+
+@lru_cache
+def _nearest_statement(mode: str, with_category: bool, hybrid: bool = False) -> TextualSelect:
+    category_filter = " AND category = :category" if with_category else ""
+    if hybrid:
+        sql = _HYBRID_SQL.format(distance=_HYBRID_DISTANCE[mode], category_filter=category_filter)
+    else:
+        sql = _NEAREST_SQL[mode].format(category_filter=category_filter)
+    statement = text(sql)
+    # Embeddings come back with each chunk so the context packer can de-duplicate them.
+    if ":embedding" in sql:
+        statement = statement.bindparams(bindparam("embedding", type_=Vector(1536)))
+    if ":compact" in sql:
+        statement = statement.bindparams(bindparam("compact", type_=HALFVEC(COMPACT_DIMENSIONS)))
+    if hybrid:
+        statement = statement.bindparams(
+            bindparam("vector_weight_override", type_=Float),
+            bindparam("lexical_weight_override", type_=Float),
+        )
+    return statement.columns(content=Text, category=String, chunk_index=Integer, embedding=Vector(1536))
+
+
+async def configure_vector_search(session: AsyncSession, min_ef_search: int = 0) -> None:
+    """Apply per-transaction HNSW settings for filtered nearest-neighbour queries.
+
+    With KB_HNSW_ITERATIVE_SCAN set (pgvector >= 0.8), iterative scans keep walking the
+    graph until enough rows pass the business/category filter, instead of returning
+    fewer than `limit` rows for small tenants. Custom plans
+    let the planner see the literal business_id, which per-tenant partial HNSW indexes
+    (see kb_partial_index_runner) need to be chosen.
+    """
+    settings = get_settings()
+    ef_search = max(settings.kb_hnsw_ef_search, min_ef_search)
+    params = {"ef_search": str(ef_search), "plan_cache_mode": "force_custom_plan"}
+    settings_sql = (
+        "set_config('hnsw.ef_search', :ef_search, true), set_config('plan_cache_mode', :plan_cache_mode, true)"
+    )
+    if settings.kb_hnsw_iterative_scan:
+        params["iterative_scan"] = settings.kb_hnsw_iterative_scan
+        settings_sql += ", set_config('hnsw.iterative_scan', :iterative_scan, true)"
+    await session.execute(text(f"SELECT {settings_sql}"), params)
+
+
+async def search_knowledge(
+    session: AsyncSession,
+    business_id: str,
+    query: str,
+    embedding: np.ndarray,
+    limit: int = 5,
+    category: str | None = None,
+    hybrid: bool | None = None,
+    weights: FusionWeights | None = None,
+    use_memory_index: bool | None = None,
+) -> list[RetrievedChunk]:
+    """Best knowledge base chunks for an already embedded query, best first.
+
+    `hybrid`, `weights` and `use_memory_index` default to the settings and the business's
+    own weights; the retrieval evaluation runner overrides them to compare configurations.
+    """
+    settings = get_settings()
+    hybrid = settings.kb_hybrid_enabled if hybrid is None else hybrid
+    if use_memory_index is None:
+        use_memory_index = settings.kb_memory_index_enabled
+    if use_memory_index:
+        with stage_span("rag_query"):
+            chunks = await get_vector_index().search(
+                session, business_id, embedding, limit, category, query if hybrid else None, weights
+            )
+        if chunks is not None:
+            return chunks
+    mode = settings.kb_vector_search if settings.kb_vector_search in _NEAREST_SQL else "full"
+    if hybrid and mode not in _HYBRID_DISTANCE:
+        # The binary first pass has no ranked candidate list to fuse; use full vectors.
+        mode = "full"
+    params = {"business_id": business_id, "embedding": embedding, "limit": limit}
+    if mode != "full":
+        params["compact"] = compact_embedding(embedding)
+    if mode == "binary_rerank":
+        params["candidates"] = max(settings.kb_rerank_candidates, limit)
+    if hybrid:
+        params.update(
+            query=query,
+            candidates=max(settings.kb_hybrid_candidates, limit),
+            rrf_k=settings.kb_rrf_k,
+            vector_weight=settings.kb_vector_weight,
+            lexical_weight=settings.kb_lexical_weight,
+            vector_weight_override=weights.vector if weights else None,
+            lexical_weight_override=weights.lexical if weights else None,
+        )
+    if category:
+        params["category"] = category
+    with stage_span("rag_query"):
+        await configure_vector_search(session, min_ef_search=params.get("candidates", 0))
+        result = await session.execute(_nearest_statement(mode, bool(category), hybrid), params)
+        rows = result.fetchall()
+    if not rows:
+        return []
+    relevance = query_relevance(np.vstack([row.embedding for row in rows]), embedding)
+    return [
+        RetrievedChunk(row.content, row.category, row.chunk_index, row.embedding, float(score))
+        for row, score in zip(rows, relevance)
+    ]
+
+
+async def rag_query(
+    session: AsyncSession,
+    business_id: str,
+    query: str,
+    limit: int | None = None,
+    category: str | None = None,
+) -> list[RetrievedChunk]:
+    """Retrieval candidates for a caller utterance; `pack_context` picks what reaches the prompt."""
+    limit = limit or get_settings().kb_context_candidates
+    try:
+        with stage_span("rag_embed"):
+            embedding = await embed_text(query, business_id)
+    except OpenAIUnavailable as exc:
+        # Answer without knowledge base context rather than hold up the turn.
+        logger.warning("rag_embed_unavailable", business_id=business_id, error=str(exc))
+        return []
+    return await search_knowledge(session, business_id, query, embedding, limit, category)
@@ -1,4 +1,5 @@
 import json
+import time
 from datetime import datetime, timezone
 from typing import Any
 from urllib.parse import quote
@@ -7,10 +8,14 @@ import httpx
 from redis.asyncio import Redis
 
 from app.core.config import get_settings
+from app.core.metrics import REDIS_ROUND_TRIPS
 
 
 _redis: Redis | None = None
+_binary_redis: Redis | None = None
 _upstash_client: httpx.AsyncClient | None = None
+_get_latency = REDIS_ROUND_TRIPS.labels("get")
+_set_latency = REDIS_ROUND_TRIPS.labels("set")
 
 
 def _use_upstash() -> bool:
@@ -26,6 +31,22 @@ def get_redis() -> Redis:
     return _redis
 
 
+def redis_enabled() -> bool:
+    """Whether a Redis server is reachable directly (not just through the Upstash REST API)."""
+    return not _use_upstash()
+
+
+def get_binary_redis() -> Redis | None:
+    """Redis client for raw bytes values; None when only the Upstash REST API is configured."""
+    global _binary_redis
+    if not redis_enabled():
+        return None
+    if _binary_redis is None:
+        settings = get_settings()
+        _binary_redis = Redis.from_url(settings.redis_url, decode_responses=False)
+    return _binary_redis
+
+
 def _get_upstash_client() -> httpx.AsyncClient:
     global _upstash_client
     if _upstash_client is None:
@@ -58,22 +79,26 @@ async def _upstash_set(key: str, value: str, ttl_seconds: int) -> None:
 
 
 async def get_session(call_id: str) -> dict[str, Any]:
+    started = time.perf_counter()
     if _use_upstash():
         data = await _upstash_get(f"call:{call_id}")
     else:
         redis = get_redis()
         data = await redis.get(f"call:{call_id}")
+    _get_latency.observe(time.perf_counter() - started)
     return json.loads(data) if data else {}
 
 
 async def set_session(call_id: str, state: dict[str, Any], ttl_seconds: int = 3600) -> None:
     state["updated_at"] = datetime.now(timezone.utc).isoformat()
     payload = json.dumps(state)
+    started = time.perf_counter()
     if _use_upstash():
         await _upstash_set(f"call:{call_id}", payload, ttl_seconds)
     else:
         redis = get_redis()
         await redis.set(f"call:{call_id}", payload, ex=ttl_seconds)
+    _set_latency.observe(time.perf_counter() - started)
 
 
 async def update_session(call_id: str, updates: dict[str, Any], ttl_seconds: int = 3600) -> dict[str, Any]:
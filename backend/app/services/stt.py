@@ -1,11 +1,18 @@
 import asyncio
+import time
+from collections import deque
+from contextlib import AsyncExitStack
 from typing import Any
 
 from app.core.config import get_settings
 from app.core.logging import get_logger
+from app.core.metrics import track_provider
+from app.services.vad import EnergyVAD
 
 try:
-    from deepgram import DeepgramClient, LiveOptions, LiveTranscriptionEvents
+    from deepgram import AsyncDeepgramClient, DeepgramClientEnvironment
+    from deepgram.core.events import EventType
+    from deepgram.extensions.types.sockets import ListenV1ControlMessage
 
     HAS_DEEPGRAM = True
 except Exception:  # noqa: BLE001
@@ -13,10 +20,239 @@ except Exception:  # noqa: BLE001
 
 
 logger = get_logger()
+# Deepgram closes a live socket after about 10 s without audio or a KeepAlive.
+_KEEPALIVE_SECONDS = 5.0
+
+
+def _live_options() -> dict[str, str]:
+    settings = get_settings()
+    return {
+        "model": "nova-2",
+        "encoding": "mulaw" if settings.telnyx_audio_format == "mulaw" else "linear16",
+        "sample_rate": str(settings.telnyx_sample_rate),
+        "interim_results": "true",
+        "punctuate": "true",
+        "endpointing": "300",
+        "utterance_end_ms": "1000",
+        "vad_events": "true",
+    }
+
+
+def _environment(base_url: str | None) -> "DeepgramClientEnvironment":
+    if not base_url:
+        return DeepgramClientEnvironment.PRODUCTION
+    base_url = base_url.rstrip("/")
+    if "://" not in base_url:
+        base_url = f"https://{base_url}"
+    socket_url = base_url.replace("https://", "wss://", 1).replace("http://", "ws://", 1)
+    return DeepgramClientEnvironment(base=base_url, production=socket_url, agent=socket_url)
+
+
+class _LiveConnection:
+    """A Deepgram live socket that can sit idle in the pool before a call claims it.
+
+    Deepgram events are handled once per socket and routed to whichever stream
+    currently owns the connection. A KeepAlive is sent whenever no audio went out for
+    a while, so pooled sockets are not closed for silence.
+    """
+
+    def __init__(self) -> None:
+        self.socket = None
+        self.listener: "DeepgramSTTStream | None" = None
+        self.opened_at = time.monotonic()
+        self.closed = False
+        self._stack = AsyncExitStack()
+        self._tasks: list[asyncio.Task] = []
+        self._last_send = self.opened_at
+
+    async def open(self, client: "AsyncDeepgramClient") -> None:
+        # connect() is a context manager; the exit stack keeps the socket open across calls.
+        self.socket = await self._stack.enter_async_context(client.listen.v1.connect(**_live_options()))
+        self.socket.on(EventType.MESSAGE, self._on_message)
+        self.socket.on(EventType.ERROR, self._on_error)
+        self.socket.on(EventType.CLOSE, self._on_close)
+        self._tasks = [asyncio.create_task(self.socket.start_listening()), asyncio.create_task(self._keepalive())]
+
+    async def _on_message(self, message) -> None:
+        if not self.listener:
+            return
+        kind = getattr(message, "type", None)
+        if kind == "Results":
+            await self.listener._on_transcript(message)
+        elif kind == "SpeechStarted":
+            await self.listener._on_speech_start()
+        elif kind == "UtteranceEnd":
+            await self.listener._on_speech_end()
+
+    async def _on_close(self, _data) -> None:
+        self.closed = True
+
+    async def _on_error(self, error) -> None:
+        logger.warning("deepgram_connection_error", error=str(error))
+        self.closed = True
+
+    async def _keepalive(self) -> None:
+        while not self.closed:
+            await asyncio.sleep(_KEEPALIVE_SECONDS)
+            if time.monotonic() - self._last_send < _KEEPALIVE_SECONDS:
+                continue
+            try:
+                await self.socket.send_control(ListenV1ControlMessage(type="KeepAlive"))
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("deepgram_keepalive_failed", error=str(exc))
+                self.closed = True
+
+    async def send(self, audio: bytes) -> bool:
+        if self.closed:
+            return False
+        try:
+            await self.socket.send_media(audio)
+            self._last_send = time.monotonic()
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("deepgram_send_failed", error=str(exc))
+            self.closed = True
+        return not self.closed
+
+    async def finish(self) -> None:
+        self.listener = None
+        was_open = not self.closed
+        self.closed = True
+        try:
+            if was_open and self.socket is not None:
+                await self.socket.send_control(ListenV1ControlMessage(type="CloseStream"))
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("deepgram_finish_failed", error=str(exc))
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except BaseException:  # noqa: BLE001
+                pass
+        self._tasks = []
+        try:
+            await self._stack.aclose()
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("deepgram_finish_failed", error=str(exc))
+
+
+class STTSessionManager:
+    """Owns the shared Deepgram client and a small pool of pre-opened live sockets.
+
+    Handing out an already-open socket at call start keeps the WebSocket and TLS
+    handshake off the path to the first transcript. `refresh_periodically` replaces
+    dropped sockets and those nearing `max_idle_seconds` in the background, so a call
+    after a quiet spell still finds a usable one.
+    """
+
+    def __init__(self, pool_size: int, max_idle_seconds: float) -> None:
+        self._pool_size = pool_size
+        self._max_idle_seconds = max_idle_seconds
+        self._client = None
+        self._idle: deque[_LiveConnection] = deque()
+        self._refill_task: asyncio.Task | None = None
+
+    @property
+    def enabled(self) -> bool:
+        settings = get_settings()
+        return bool(settings.deepgram_api_key and HAS_DEEPGRAM)
+
+    def _get_client(self) -> "AsyncDeepgramClient":
+        if self._client is None:
+            settings = get_settings()
+            self._client = AsyncDeepgramClient(
+                api_key=settings.deepgram_api_key, environment=_environment(settings.deepgram_base_url)
+            )
+        return self._client
+
+    async def _open(self) -> _LiveConnection | None:
+        live = _LiveConnection()
+        try:
+            with track_provider("deepgram"):
+                await live.open(self._get_client())
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("deepgram_connect_failed", error=str(exc))
+            await live.finish()
+            return None
+        return live
+
+    def _is_usable(self, live: _LiveConnection, max_age: float | None = None) -> bool:
+        age = time.monotonic() - live.opened_at
+        return not live.closed and age < (self._max_idle_seconds if max_age is None else max_age)
+
+    async def acquire(self) -> _LiveConnection | None:
+        if not self.enabled:
+            return None
+        live = None
+        while self._idle:
+            candidate = self._idle.popleft()
+            if self._is_usable(candidate):
+                live = candidate
+                break
+            await candidate.finish()
+        if live is None:
+            live = await self._open()
+        self._schedule_refill()
+        return live
+
+    def _schedule_refill(self) -> None:
+        if self._pool_size <= 0:
+            return
+        if self._refill_task is None or self._refill_task.done():
+            self._refill_task = asyncio.create_task(self.warm())
+
+    async def warm(self) -> None:
+        if not self.enabled:
+            return
+        while len(self._idle) < self._pool_size:
+            live = await self._open()
+            if live is None:
+                return
+            self._idle.append(live)
+
+    async def refresh(self, max_age: float) -> None:
+        """Replace idle sockets that dropped or are older than `max_age`, opening new ones first."""
+        stale = [live for live in self._idle if not self._is_usable(live, max_age)]
+        for live in stale:
+            self._idle.remove(live)
+        if stale:
+            await self.warm()
+        for live in stale:
+            await live.finish()
+
+    async def refresh_periodically(self) -> None:
+        # Checked ten times per idle lifetime and recycled at 80% of it, so a pooled
+        # socket is replaced well before acquire() would have to discard it.
+        interval = self._max_idle_seconds / 10
+        while True:
+            await asyncio.sleep(interval)
+            await self.refresh(self._max_idle_seconds - 2 * interval)
+
+    async def close(self) -> None:
+        if self._refill_task and not self._refill_task.done():
+            self._refill_task.cancel()
+        while self._idle:
+            await self._idle.popleft().finish()
+
+
+_manager: STTSessionManager | None = None
+
+
+def get_stt_manager() -> STTSessionManager:
+    global _manager
+    if _manager is None:
+        settings = get_settings()
+        _manager = STTSessionManager(settings.stt_pool_size, settings.stt_pool_max_idle_seconds)
+    return _manager
 
 
 class STTStream:
     enabled: bool = False
+    vad: EnergyVAD | None = None
+
+    @property
+    def silence_ms(self) -> float:
+        return self.vad.silence_ms if self.vad else 0.0
 
     async def start(self) -> None:
         return
@@ -29,41 +265,97 @@ class STTStream:
 
 
 class DeepgramSTTStream(STTStream):
-    def __init__(self, audio_queue: asyncio.Queue[bytes]) -> None:
+    def __init__(self, audio_queue: asyncio.Queue[bytes], manager: STTSessionManager | None = None) -> None:
+        settings = get_settings()
         self._audio_queue = audio_queue
         self._transcript_queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
-        self._dg_connection = None
-        settings = get_settings()
-        self.enabled = bool(settings.deepgram_api_key and HAS_DEEPGRAM)
+        self._manager = manager or get_stt_manager()
+        self._live: _LiveConnection | None = None
+        self._send_task: asyncio.Task | None = None
+        self._closing = False
+        # Audio not yet covered by a final transcript, replayed into a fresh socket after a drop.
+        # Offsets count bytes of the call's audio; Deepgram's result times count seconds of
+        # audio received by the current socket, which starts at `_socket_origin`.
+        self._bytes_per_second = settings.telnyx_sample_rate * (1 if settings.telnyx_audio_format == "mulaw" else 2)
+        self._replay_limit = self._bytes_per_second * settings.stt_replay_buffer_ms // 1000
+        self._replay: deque[bytes] = deque()
+        self._replay_bytes = 0
+        self._replay_start = 0
+        self._socket_origin = 0
+        self.vad = EnergyVAD(settings.telnyx_sample_rate, settings.telnyx_audio_format)
+        self.enabled = self._manager.enabled
 
     async def start(self) -> None:
         if not self.enabled:
             logger.warning("deepgram_disabled")
             return
-        settings = get_settings()
-        client = DeepgramClient(settings.deepgram_api_key)
-        self._dg_connection = client.listen.asyncwebsocket.v("1")
-        options = LiveOptions(
-            model="nova-2",
-            interim_results=True,
-            punctuate=True,
-            endpointing=300,
-            vad_events=True,
-        )
-        self._dg_connection.on(LiveTranscriptionEvents.Transcript, self._on_transcript)
-        self._dg_connection.on(LiveTranscriptionEvents.SpeechStarted, self._on_speech_start)
-        self._dg_connection.on(LiveTranscriptionEvents.UtteranceEnd, self._on_speech_end)
-        await self._dg_connection.start(options)
-        asyncio.create_task(self._send_audio())
+        self._live = await self._manager.acquire()
+        if self._live is None:
+            self.enabled = False
+            return
+        self._live.listener = self
+        self._send_task = asyncio.create_task(self._send_audio())
+
+    def _remember(self, audio: bytes) -> None:
+        self._replay.append(audio)
+        self._replay_bytes += len(audio)
+        while self._replay_bytes > self._replay_limit and self._replay:
+            self._forget_oldest()
+
+    def _forget_oldest(self) -> None:
+        frame = self._replay.popleft()
+        self._replay_bytes -= len(frame)
+        self._replay_start += len(frame)
+
+    def _forget_transcribed(self, end_seconds: float) -> None:
+        """Drop buffered frames that end before the audio a final result covers."""
+        covered = self._socket_origin + int(end_seconds * self._bytes_per_second)
+        while self._replay and self._replay_start + len(self._replay[0]) <= covered:
+            self._forget_oldest()
 
     async def _send_audio(self) -> None:
-        if not self._dg_connection:
-            return
         while True:
             audio = await self._audio_queue.get()
-            await self._dg_connection.send(audio)
+            self.vad.process(audio)
+            self._remember(audio)
+            if self._live and await self._live.send(audio):
+                continue
+            await self._reconnect()
+
+    async def _reconnect(self) -> None:
+        delays = [0, 0.25, 1, 2]
+        for delay in delays:
+            if self._closing:
+                return
+            if delay:
+                await asyncio.sleep(delay)
+            if self._live:
+                await self._live.finish()
+                self._live = None
+            live = await self._manager.acquire()
+            if live is None:
+                continue
+            live.listener = self
+            self._live = live
+            self._socket_origin = self._replay_start
+            # The buffer already holds the frame that failed to send.
+            replayed = True
+            for frame in list(self._replay):
+                if not await live.send(frame):
+                    replayed = False
+                    break
+            if replayed:
+                logger.info("deepgram_reconnected", replayed_bytes=self._replay_bytes)
+                return
+        logger.warning("deepgram_reconnect_failed")
 
-    async def _on_transcript(self, _, result) -> None:
+    async def _on_transcript(self, result) -> None:
+        is_final = bool(getattr(result, "is_final", False))
+        start, duration = getattr(result, "start", None), getattr(result, "duration", None)
+        if is_final and start is not None and duration is not None:
+            # Only the audio this final covers is done; what was sent since (the start of
+            # the next phrase) stays buffered for a reconnect.
+            self._forget_transcribed(start + duration)
         text = ""
         metadata: dict[str, Any] = {}
         try:
@@ -76,20 +368,28 @@ class DeepgramSTTStream(STTStream):
             }
         except Exception:  # noqa: BLE001
             return
-        is_final = bool(getattr(result, "is_final", False))
         await self._transcript_queue.put(
             {"type": "transcript", "is_final": is_final, "text": text, "metadata": metadata}
         )
 
-    async def _on_speech_start(self, *_args) -> None:
+    async def _on_speech_start(self) -> None:
         await self._transcript_queue.put({"type": "vad_start"})
 
-    async def _on_speech_end(self, *_args) -> None:
+    async def _on_speech_end(self) -> None:
         await self._transcript_queue.put({"type": "vad_end"})
 
     async def close(self) -> None:
-        if self._dg_connection:
-            await self._dg_connection.finish()
+        self._closing = True
+        if self._send_task:
+            self._send_task.cancel()
+            try:
+                await self._send_task
+            except asyncio.CancelledError:
+                pass
+            self._send_task = None
+        if self._live:
+            await self._live.finish()
+            self._live = None
 
     async def get_next_event(self, timeout: float = 20.0) -> dict[str, Any] | None:
         if not self.enabled:
@@ -1,8 +1,9 @@
 from app.core.config import get_settings
 from app.core.logging import get_logger
+from app.core.metrics import track_provider
 
 try:
-    import telnyx
+    from telnyx import AsyncTelnyx
 
     HAS_TELNYX = True
 except Exception:  # noqa: BLE001
@@ -11,38 +12,56 @@ except Exception:  # noqa: BLE001
 
 logger = get_logger()
 
+_client: "AsyncTelnyx | None" = None
 
-def _configure_telnyx() -> bool:
+
+def _api_base_url(api_base: str) -> str:
+    # TELNYX_API_BASE is the API host; the v4 SDK expects the versioned base URL.
+    api_base = api_base.rstrip("/")
+    return api_base if api_base.endswith("/v2") else f"{api_base}/v2"
+
+
+def get_telnyx_client() -> "AsyncTelnyx | None":
+    global _client
     settings = get_settings()
     if not settings.telnyx_api_key or not HAS_TELNYX:
-        return False
-    telnyx.api_key = settings.telnyx_api_key
-    return True
+        return None
+    if _client is None:
+        base_url = _api_base_url(settings.telnyx_api_base) if settings.telnyx_api_base else None
+        # Call control commands are time-sensitive; a late retry is worse than a logged failure.
+        _client = AsyncTelnyx(api_key=settings.telnyx_api_key, base_url=base_url, timeout=10, max_retries=1)
+    return _client
 
 
-def start_media_stream(call_control_id: str, stream_url: str) -> None:
-    if not _configure_telnyx():
+async def start_media_stream(call_control_id: str, stream_url: str) -> None:
+    client = get_telnyx_client()
+    if client is None:
         logger.warning("telnyx_disabled")
         return
     try:
-        telnyx.CallControl.start_streaming(call_control_id, stream_url=stream_url)
+        with track_provider("telnyx"):
+            await client.calls.actions.start_streaming(call_control_id, stream_url=stream_url)
     except Exception as exc:  # noqa: BLE001
         logger.warning("telnyx_start_stream_failed", error=str(exc))
 
 
-def stop_media_stream(call_control_id: str) -> None:
-    if not _configure_telnyx():
+async def stop_media_stream(call_control_id: str) -> None:
+    client = get_telnyx_client()
+    if client is None:
         return
     try:
-        telnyx.CallControl.stop_streaming(call_control_id)
+        with track_provider("telnyx"):
+            await client.calls.actions.stop_streaming(call_control_id)
     except Exception as exc:  # noqa: BLE001
         logger.warning("telnyx_stop_stream_failed", error=str(exc))
 
 
-def transfer_call_to_human(call_control_id: str, phone_number: str) -> None:
-    if not _configure_telnyx():
+async def transfer_call_to_human(call_control_id: str, phone_number: str) -> None:
+    client = get_telnyx_client()
+    if client is None:
         return
     try:
-        telnyx.CallControl.transfer(call_control_id, to=phone_number)
+        with track_provider("telnyx"):
+            await client.calls.actions.transfer(call_control_id, to=phone_number)
     except Exception as exc:  # noqa: BLE001
         logger.warning("telnyx_transfer_failed", error=str(exc))
@@ -0,0 +1,51 @@
+"""Prompt token counting, exact with tiktoken and estimated without it."""
+
+from functools import lru_cache
+
+from app.core.logging import get_logger
+
+try:
+    import tiktoken
+
+    HAS_TIKTOKEN = True
+except Exception:  # noqa: BLE001
+    HAS_TIKTOKEN = False
+
+
+logger = get_logger()
+# English prose averages about four characters per token for OpenAI tokenizers.
+_CHARS_PER_TOKEN = 4
+
+
+@lru_cache
+def _encoding():
+    if not HAS_TIKTOKEN:
+        return None
+    try:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception as exc:  # noqa: BLE001
+        # The encoding file is downloaded on first use; estimate if that fails.
+        logger.warning("tiktoken_unavailable", error=str(exc))
+        return None
+
+
+def count_tokens(text: str) -> int:
+    encoding = _encoding()
+    if encoding is None:
+        return (len(text) + _CHARS_PER_TOKEN - 1) // _CHARS_PER_TOKEN
+    return len(encoding.encode_ordinary(text))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Longest prefix of `text` within `max_tokens`, cut back to a word boundary."""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    encoding = _encoding()
+    if encoding is None:
+        prefix = text[: max_tokens * _CHARS_PER_TOKEN]
+    else:
+        prefix = encoding.decode(encoding.encode_ordinary(text)[:max_tokens])
+    cut = prefix.rfind(" ")
+    return prefix[:cut] if cut > 0 else prefix
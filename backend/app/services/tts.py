@@ -1,11 +1,14 @@
 import asyncio
+import time
 from collections.abc import Awaitable, Callable
 
 import httpx
 
 from app.core.config import get_settings
 from app.core.logging import get_logger
+from app.core.metrics import MeteredTransport
 from app.services.audio_transcoder import transcode_to_telnyx
+from app.services.observability import record_stage, stage_span
 
 
 logger = get_logger()
@@ -18,35 +21,56 @@ class TTSStream:
         self._active = False
         self._lock = asyncio.Lock()
 
-    async def send_stream(self, text: str) -> None:
+    async def send_stream(self, text: str) -> bytes | None:
+        """Synthesize `text` and play it; returns the audio as sent to the sink."""
         settings = get_settings()
         if not settings.elevenlabs_api_key or not settings.elevenlabs_voice_id:
             logger.warning("elevenlabs_disabled")
-            return
+            return None
         async with self._lock:
             self._active = True
             try:
-                url = f"https://api.elevenlabs.io/v1/text-to-speech/{settings.elevenlabs_voice_id}/stream"
+                url = f"{settings.elevenlabs_base_url}/v1/text-to-speech/{settings.elevenlabs_voice_id}/stream"
                 headers = {
                     "xi-api-key": settings.elevenlabs_api_key,
                     "accept": "audio/mpeg",
                 }
                 payload = {"text": text, "model_id": "eleven_turbo_v2"}
                 audio_buffer = bytearray()
-                async with httpx.AsyncClient(timeout=30) as client:
+                requested = time.perf_counter()
+                async with httpx.AsyncClient(timeout=30, transport=MeteredTransport("elevenlabs")) as client:
                     async with client.stream("POST", url, headers=headers, json=payload) as response:
                         response.raise_for_status()
                         async for chunk in response.aiter_bytes():
+                            if not audio_buffer:
+                                record_stage("tts_first_byte", (time.perf_counter() - requested) * 1000)
                             audio_buffer.extend(chunk)
-                if self._audio_sink:
-                    audio_bytes = bytes(audio_buffer)
+                if not self._audio_sink:
+                    return None
+                audio_bytes = bytes(audio_buffer)
+                with stage_span("transcode"):
                     audio_bytes = await transcode_to_telnyx(audio_bytes)
-                    chunk_size = 8000
-                    for i in range(0, len(audio_bytes), chunk_size):
-                        await self._audio_sink(audio_bytes[i : i + chunk_size])
+                await self._sink_audio(audio_bytes)
+                return audio_bytes
             finally:
                 self._active = False
 
+    async def play_audio(self, audio_bytes: bytes) -> None:
+        """Play audio previously returned by `send_stream`."""
+        if not self._audio_sink:
+            return
+        async with self._lock:
+            self._active = True
+            try:
+                await self._sink_audio(audio_bytes)
+            finally:
+                self._active = False
+
+    async def _sink_audio(self, audio_bytes: bytes) -> None:
+        chunk_size = 8000
+        for i in range(0, len(audio_bytes), chunk_size):
+            await self._audio_sink(audio_bytes[i : i + chunk_size])
+
     def flush_stream(self) -> None:
         # Placeholder for barge-in: stop current stream if audio sink supports it
         return
@@ -0,0 +1,111 @@
+import re
+import time
+from collections.abc import Callable
+
+
+# Words that rarely end a complete utterance; a trailing one means the caller is mid-thought.
+CONTINUATION_WORDS = {
+    "a", "an", "and", "are", "as", "at", "because", "but", "can", "could", "for", "from", "have",
+    "i", "if", "in", "is", "like", "my", "of", "on", "or", "our", "so", "than", "that", "the",
+    "then", "to", "uh", "um", "was", "were", "what", "when", "where", "which", "who", "will",
+    "with", "would", "your",
+}
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+def normalize_utterance(text: str) -> str:
+    return " ".join(_WORD_RE.findall(text.lower()))
+
+
+def punctuation_score(text: str) -> float:
+    stripped = text.rstrip()
+    if not stripped:
+        return 0.0
+    if stripped[-1] in ".?!":
+        return 1.0
+    if stripped[-1] in ",;:-":
+        return 0.0
+    return 0.3
+
+
+def completeness_score(text: str) -> float:
+    words = _WORD_RE.findall(text.lower())
+    if not words:
+        return 0.0
+    if words[-1] in CONTINUATION_WORDS:
+        return 0.0
+    if len(words) == 1:
+        return 0.5
+    return 1.0
+
+
+class TurnEndPredictor:
+    """Predicts end of turn from interim transcripts and local VAD silence.
+
+    Combines how long the interim text has been stable, trailing punctuation,
+    whether the last word usually continues a sentence, and audio silence. The
+    caller commits a turn early when `should_commit` is true and rolls back if
+    `observe_speech` or a changed interim shows the caller kept talking.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.75,
+        min_silence_ms: float = 200.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._threshold = threshold
+        self._min_silence_ms = min_silence_ms
+        self._clock = clock
+        self.text = ""
+        self._normalized = ""
+        self._stable_since: float | None = None
+        self._repeats = 0
+
+    def observe_interim(self, text: str) -> bool:
+        """Record an interim transcript; returns True when its wording changed."""
+        normalized = normalize_utterance(text)
+        self.text = text
+        if normalized == self._normalized:
+            self._repeats += 1
+            return False
+        self._normalized = normalized
+        self._stable_since = self._clock()
+        self._repeats = 0
+        return True
+
+    def observe_speech(self) -> None:
+        self._stable_since = self._clock()
+        self._repeats = 0
+
+    def reset(self) -> None:
+        self.text = ""
+        self._normalized = ""
+        self._stable_since = None
+        self._repeats = 0
+
+    @property
+    def pending(self) -> bool:
+        return bool(self._normalized)
+
+    def stability_score(self) -> float:
+        if self._stable_since is None:
+            return 0.0
+        stable_ms = (self._clock() - self._stable_since) * 1000
+        return min(1.0, stable_ms / 400 + self._repeats * 0.25)
+
+    def score(self, silence_ms: float) -> float:
+        if not self._normalized:
+            return 0.0
+        return (
+            0.3 * min(1.0, silence_ms / 500)
+            + 0.25 * punctuation_score(self.text)
+            + 0.25 * completeness_score(self.text)
+            + 0.2 * self.stability_score()
+        )
+
+    def should_commit(self, silence_ms: float) -> bool:
+        if silence_ms < self._min_silence_ms:
+            return False
+        return self.score(silence_ms) >= self._threshold
@@ -1,6 +1,57 @@
+import numpy as np
+
+
 class SileroVAD:
     def detect_start(self) -> bool:
         return False
 
     def detect_end(self) -> bool:
         return True
+
+
+def _mulaw_decode_table() -> np.ndarray:
+    codes = ~np.arange(256, dtype=np.uint8)
+    exponent = ((codes >> 4) & 0x07).astype(np.int32)
+    mantissa = (codes & 0x0F).astype(np.int32)
+    magnitude = (((mantissa << 3) + 0x84) << exponent) - 0x84
+    return np.where(codes & 0x80, -magnitude, magnitude).astype(np.int16)
+
+
+MULAW_TO_PCM = _mulaw_decode_table()
+
+
+def decode_frame(frame: bytes, encoding: str = "mulaw") -> np.ndarray:
+    if encoding == "mulaw":
+        return MULAW_TO_PCM[np.frombuffer(frame, dtype=np.uint8)]
+    return np.frombuffer(frame, dtype=np.int16)
+
+
+class EnergyVAD:
+    """Frame-energy voice activity detector for telephony audio.
+
+    Silence is measured in audio time, so it tracks the media stream rather than
+    event-loop scheduling.
+    """
+
+    def __init__(self, sample_rate: int = 8000, encoding: str = "mulaw", threshold: float = 500.0) -> None:
+        self._sample_rate = sample_rate
+        self._encoding = encoding
+        self._threshold = threshold
+        self._silent_samples = 0
+        self.speaking = False
+
+    def process(self, frame: bytes) -> bool:
+        samples = decode_frame(frame, self._encoding)
+        if samples.size == 0:
+            return self.speaking
+        rms = float(np.sqrt(np.mean(samples.astype(np.float32) ** 2)))
+        self.speaking = rms >= self._threshold
+        if self.speaking:
+            self._silent_samples = 0
+        else:
+            self._silent_samples += samples.size
+        return self.speaking
+
+    @property
+    def silence_ms(self) -> float:
+        return self._silent_samples * 1000 / self._sample_rate
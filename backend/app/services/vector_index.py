@@ -0,0 +1,323 @@
+"""In-process nearest-neighbour search for small knowledge bases.
+
+Most businesses have a few hundred chunks, which fit in a float32 matrix small enough
+that one matrix-vector product beats a round trip to Postgres. Each worker loads a
+business's embeddings on first use and keeps them under a global LRU memory budget.
+Indexes are tagged with the knowledge base version (see kb_version) and reloaded when
+it changes. Businesses above `KB_MEMORY_INDEX_MAX_ROWS`, or whose index would not fit
+the budget, return None from `search` and stay on pgvector.
+
+Hybrid retrieval mirrors the SQL path in rag.py: a small inverted index over chunk words
+supplies lexical candidates, fused with the vector candidates by reciprocal rank.
+"""
+
+import asyncio
+import math
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.core.logging import get_logger
+from app.core.metrics import VECTOR_INDEX, VECTOR_INDEX_BYTES
+from app.db.models import Business, KnowledgeBase
+from app.services.context_packer import RetrievedChunk
+from app.services.kb_version import get_kb_version
+
+
+logger = get_logger()
+_WORD = re.compile(r"\w+")
+# Words in more than this share of a business's chunks carry no lexical signal.
+_MAX_DOCUMENT_FREQUENCY = 0.5
+# Oversized businesses remembered per worker; forgotten ones are re-counted on next search.
+_OVERSIZED_ENTRIES = 10_000
+_OVERSIZED_TTL_SECONDS = 3600
+
+
+@dataclass(frozen=True)
+class FusionWeights:
+    vector: float
+    lexical: float
+
+
+def _words(text: str) -> set[str]:
+    return {word.lower() for word in _WORD.findall(text)}
+
+
+def _smallest(values: np.ndarray, count: int) -> np.ndarray:
+    """Indices of the `count` smallest values, in ascending order."""
+    if count < len(values):
+        indices = np.argpartition(values, count - 1)[:count]
+    else:
+        indices = np.arange(len(values))
+    return indices[np.argsort(values[indices], kind="stable")]
+
+
+def reciprocal_rank_fusion(rankings: list[tuple[np.ndarray, float]], rrf_k: int) -> np.ndarray:
+    """Merge ranked index lists by sum(weight / (rrf_k + rank)), best first."""
+    scores: dict[int, float] = {}
+    for ranking, weight in rankings:
+        for rank, index in enumerate(ranking.tolist(), start=1):
+            scores[index] = scores.get(index, 0.0) + weight / (rrf_k + rank)
+    ordered = sorted(scores, key=lambda index: (-scores[index], index))
+    return np.asarray(ordered, dtype=np.int64)
+
+
+@dataclass
+class _BusinessIndex:
+    version: int
+    matrix: np.ndarray
+    squared_norms: np.ndarray
+    contents: list[str]
+    chunk_indexes: list[int]
+    category_codes: np.ndarray
+    categories: dict[str, int]
+    postings: dict[str, np.ndarray]
+    weights: FusionWeights | None = None
+
+    @classmethod
+    def build(
+        cls, version: int, rows: list[tuple[str, str, int, np.ndarray]], weights: FusionWeights | None = None
+    ) -> "_BusinessIndex":
+        categories: dict[str, int] = {}
+        codes = np.fromiter((categories.setdefault(row[1], len(categories)) for row in rows), dtype=np.int32)
+        if rows:
+            matrix = np.ascontiguousarray(np.vstack([np.asarray(row[3], dtype=np.float32) for row in rows]))
+        else:
+            matrix = np.empty((0, 0), dtype=np.float32)
+        postings: dict[str, list[int]] = {}
+        for index, row in enumerate(rows):
+            for word in _words(row[0]):
+                postings.setdefault(word, []).append(index)
+        return cls(
+            version=version,
+            matrix=matrix,
+            squared_norms=np.einsum("ij,ij->i", matrix, matrix),
+            contents=[row[0] for row in rows],
+            chunk_indexes=[row[2] for row in rows],
+            category_codes=codes,
+            categories=categories,
+            postings={word: np.asarray(ids, dtype=np.int32) for word, ids in postings.items()},
+            weights=weights,
+        )
+
+    @property
+    def nbytes(self) -> int:
+        text_bytes = sum(len(content) for content in self.contents)
+        posting_bytes = sum(len(word) + ids.nbytes for word, ids in self.postings.items())
+        return (
+            self.matrix.nbytes + self.squared_norms.nbytes + self.category_codes.nbytes + text_bytes + posting_bytes
+        )
+
+    def _lexical_scores(self, query: str) -> np.ndarray:
+        scores = np.zeros(len(self.contents), dtype=np.float32)
+        total = len(self.contents)
+        for word in _words(query):
+            ids = self.postings.get(word)
+            if ids is None or (total >= 4 and len(ids) > total * _MAX_DOCUMENT_FREQUENCY):
+                continue
+            scores[ids] += math.log(1.0 + total / len(ids))
+        return scores
+
+    def top_k(
+        self,
+        vector: np.ndarray,
+        limit: int,
+        category: str | None = None,
+        query: str | None = None,
+        weights: FusionWeights | None = None,
+        candidates: int = 20,
+        rrf_k: int = 60,
+    ) -> list[RetrievedChunk]:
+        """The `limit` best rows, nearest first.
+
+        Rows are ordered by L2 distance to `vector`, or with `query` by rank fusion of
+        the `candidates` nearest rows and the `candidates` best lexical matches.
+        """
+        if not self.contents or limit <= 0:
+            return []
+        vector = np.asarray(vector, dtype=np.float32)
+        products = self.matrix @ vector
+        # |x - q|^2 = |x|^2 - 2 x.q + |q|^2; the last term does not change the order.
+        distances = self.squared_norms - 2.0 * products
+        rows = None
+        if category is not None:
+            code = self.categories.get(category)
+            if code is None:
+                return []
+            rows = np.flatnonzero(self.category_codes == code)
+            distances = distances[rows]
+        if query is None:
+            best = _smallest(distances, limit)
+        else:
+            weights = weights or self.weights or FusionWeights(1.0, 1.0)
+            lexical = self._lexical_scores(query)
+            if rows is not None:
+                lexical = lexical[rows]
+            matched = np.flatnonzero(lexical > 0)
+            rankings = [
+                (_smallest(distances, max(candidates, limit)), weights.vector),
+                (matched[_smallest(-lexical[matched], max(candidates, limit))], weights.lexical),
+            ]
+            best = reciprocal_rank_fusion(rankings, rrf_k)[:limit]
+        if rows is not None:
+            best = rows[best]
+        norms = np.sqrt(self.squared_norms[best]) * (float(np.linalg.norm(vector)) or 1.0)
+        relevance = products[best] / np.where(norms == 0, 1.0, norms)
+        category_names = list(self.categories)
+        return [
+            RetrievedChunk(
+                self.contents[index],
+                category_names[self.category_codes[index]],
+                self.chunk_indexes[index],
+                self.matrix[index],
+                float(score),
+            )
+            for index, score in zip(best.tolist(), relevance.tolist())
+        ]
+
+
+class VectorIndexCache:
+    def __init__(self, max_rows: int, budget_bytes: int, candidates: int = 20, rrf_k: int = 60) -> None:
+        self._max_rows = max_rows
+        self._budget_bytes = budget_bytes
+        self._candidates = candidates
+        self._rrf_k = rrf_k
+        self._indexes: OrderedDict[str, _BusinessIndex] = OrderedDict()
+        self._bytes = 0
+        # business_id -> kb version at which the business was found too large to hold.
+        self._oversized: TTLCache[str, int] = TTLCache(_OVERSIZED_ENTRIES, _OVERSIZED_TTL_SECONDS)
+        # Only while a load is in progress.
+        self._loading: dict[str, asyncio.Lock] = {}
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._indexes)
+
+    def _get(self, business_id: str, version: int) -> _BusinessIndex | None:
+        index = self._indexes.get(business_id)
+        if index is None:
+            return None
+        if index.version != version:
+            self._discard(business_id)
+            return None
+        self._indexes.move_to_end(business_id)
+        return index
+
+    def _discard(self, business_id: str) -> None:
+        index = self._indexes.pop(business_id, None)
+        if index is not None:
+            self._bytes -= index.nbytes
+
+    def put(self, business_id: str, index: _BusinessIndex) -> bool:
+        """Hold `index`, evicting least recently used businesses; False if it cannot fit."""
+        size = index.nbytes
+        if size > self._budget_bytes:
+            self._oversized.set(business_id, index.version)
+            return False
+        self._discard(business_id)
+        while self._indexes and self._bytes + size > self._budget_bytes:
+            _, evicted = self._indexes.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            VECTOR_INDEX.labels("evict").inc()
+        self._indexes[business_id] = index
+        self._bytes += size
+        return True
+
+    async def _load(self, session: AsyncSession, business_id: str, version: int) -> _BusinessIndex | None:
+        count = await session.scalar(
+            select(func.count()).select_from(KnowledgeBase).where(KnowledgeBase.business_id == business_id)
+        )
+        if count > self._max_rows:
+            self._oversized.set(business_id, version)
+            return None
+        result = await session.execute(
+            select(
+                KnowledgeBase.content, KnowledgeBase.category, KnowledgeBase.chunk_index, KnowledgeBase.embedding
+            ).where(
+                KnowledgeBase.business_id == business_id,
+                KnowledgeBase.embedding.is_not(None),
+            )
+        )
+        rows = [tuple(row) for row in result.all()]
+        result = await session.execute(
+            select(Business.kb_vector_weight, Business.kb_lexical_weight).where(Business.id == business_id)
+        )
+        vector_weight, lexical_weight = result.one_or_none() or (None, None)
+        settings = get_settings()
+        weights = FusionWeights(
+            settings.kb_vector_weight if vector_weight is None else vector_weight,
+            settings.kb_lexical_weight if lexical_weight is None else lexical_weight,
+        )
+        index = _BusinessIndex.build(version, rows, weights)
+        if not self.put(business_id, index):
+            return None
+        VECTOR_INDEX.labels("load").inc()
+        logger.info("vector_index_loaded", business_id=business_id, rows=len(index.contents), bytes=index.nbytes)
+        return index
+
+    async def search(
+        self,
+        session: AsyncSession,
+        business_id: str,
+        vector: np.ndarray,
+        limit: int,
+        category: str | None = None,
+        query: str | None = None,
+        weights: FusionWeights | None = None,
+    ) -> list[RetrievedChunk] | None:
+        """Best chunks, or None when the business should be searched in Postgres.
+
+        With `query`, vector and lexical candidates are fused, weighted by `weights` or
+        the business's own retrieval weights.
+        """
+        version = await get_kb_version(business_id)
+        if self._oversized.get(business_id) == version:
+            VECTOR_INDEX.labels("fallback").inc()
+            return None
+        index = self._get(business_id, version)
+        if index is None:
+            lock = self._loading.setdefault(business_id, asyncio.Lock())
+            try:
+                async with lock:
+                    # Concurrent turns for the same business wait for a single load.
+                    index = self._get(business_id, version)
+                    if index is None and self._oversized.get(business_id) != version:
+                        index = await self._load(session, business_id, version)
+            finally:
+                # Turns already queued on the lock keep their reference; later ones find the index.
+                if not lock.locked() and self._loading.get(business_id) is lock:
+                    del self._loading[business_id]
+            if index is None:
+                VECTOR_INDEX.labels("fallback").inc()
+                return None
+        else:
+            VECTOR_INDEX.labels("hit").inc()
+        return index.top_k(vector, limit, category, query, weights, self._candidates, self._rrf_k)
+
+
+_index: VectorIndexCache | None = None
+
+
+def get_vector_index() -> VectorIndexCache:
+    global _index
+    if _index is None:
+        settings = get_settings()
+        _index = VectorIndexCache(
+            settings.kb_memory_index_max_rows,
+            settings.kb_memory_index_budget_mb * 1024 * 1024,
+            candidates=settings.kb_hybrid_candidates,
+            rrf_k=settings.kb_rrf_k,
+        )
+    return _index
+
+
+VECTOR_INDEX_BYTES.set_function(lambda: _index.nbytes if _index is not None else 0)
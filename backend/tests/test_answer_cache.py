@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.services.answer_cache import AnswerCache
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.setattr("app.services.answer_cache.redis_enabled", lambda: False)
+    monkeypatch.setattr("app.services.kb_version.redis_enabled", lambda: False)
+    return AnswerCache(threshold=0.9, max_entries=2, ttl_seconds=60, budget_bytes=1 << 20)
+
+
+@pytest.mark.asyncio
+async def test_similar_question_hits(cache):
+    await cache.store("b1", "What are your hours?", np.array([1.0, 0.0, 0.0]), "9 to 5", b"audio")
+    hit = await cache.lookup("b1", "when are you open", np.array([0.95, 0.1, 0.0]))
+    assert hit is not None and hit.answer == "9 to 5" and hit.audio == b"audio"
+    assert await cache.lookup("b1", "do you deliver", np.array([0.0, 1.0, 0.0])) is None
+    assert await cache.lookup("b2", "when are you open", np.array([1.0, 0.0, 0.0])) is None
+
+
+@pytest.mark.asyncio
+async def test_eviction_and_false_hits(cache):
+    await cache.store("b1", "hours", np.array([1.0, 0.0, 0.0]), "a", None)
+    await cache.store("b1", "delivery", np.array([0.0, 1.0, 0.0]), "b", None)
+    await cache.store("b1", "parking", np.array([0.0, 0.0, 1.0]), "c", None)
+    assert await cache.lookup("b1", "hours", np.array([1.0, 0.0, 0.0])) is None
+    await cache.flag_false_hit("b1", "delivery")
+    assert await cache.lookup("b1", "delivery", np.array([0.0, 1.0, 0.0])) is None
+    assert (await cache.lookup("b1", "parking", np.array([0.0, 0.0, 1.0]))).answer == "c"
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_business_is_evicted_over_budget(cache):
+    cache._budget_bytes = 2500
+    vector = np.array([1.0, 0.0, 0.0])
+    await cache.store("b1", "hours", vector, "9 to 5", b"x" * 1000)
+    await cache.store("b2", "hours", vector, "9 to 5", b"x" * 1000)
+    assert await cache.lookup("b1", "hours", vector) is not None
+    await cache.store("b3", "hours", vector, "9 to 5", b"x" * 1000)
+    assert cache.nbytes <= 2500
+    assert await cache.lookup("b2", "hours", vector) is None
+    assert await cache.lookup("b1", "hours", vector) is not None
+
+
+@pytest.mark.asyncio
+async def test_redis_outage_does_not_fail_the_owner_endpoints(cache, monkeypatch):
+    class BrokenPipeline:
+        def __getattr__(self, name):
+            return lambda *args: None
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def execute(self):
+            raise RedisConnectionError("down")
+
+    class BrokenRedis:
+        def pipeline(self, transaction=True):
+            return BrokenPipeline()
+
+    monkeypatch.setattr("app.services.answer_cache.redis_enabled", lambda: True)
+    monkeypatch.setattr("app.services.answer_cache.get_redis", lambda: BrokenRedis())
+    await cache.flag_false_hit("b1", "hours")
+    assert (await cache.report("b1"))["lookups"] == 0
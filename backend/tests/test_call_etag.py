@@ -0,0 +1,65 @@
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Response
+from sqlalchemy.dialects import postgresql
+from starlette.requests import Request
+
+from app.db.models import User, UserRole
+from app.routers.calls import _call_etag, _etag_matches, get_call
+
+
+UPDATED_AT = datetime(2026, 3, 1, 12, 0, 0, 123456, tzinfo=timezone.utc)
+
+
+class _Session:
+    def __init__(self, row):
+        self.row = row
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return SimpleNamespace(one_or_none=lambda: self.row)
+
+
+def _request(if_none_match: str) -> Request:
+    return Request({"type": "http", "method": "GET", "headers": [(b"if-none-match", if_none_match.encode())]})
+
+
+def test_etag_changes_with_the_row_and_with_its_messages_and_events():
+    plain = _call_etag(UPDATED_AT, None)
+    expanded = _call_etag(UPDATED_AT, "3:2026-03-01 12:05:00+00/1:2026-03-01 12:00:01+00")
+
+    assert plain.startswith('W/"') and plain.endswith('-0"')
+    assert expanded != plain
+    assert _call_etag(UPDATED_AT, "4:2026-03-01 12:06:00+00/1:2026-03-01 12:00:01+00") != expanded
+    assert _call_etag(UPDATED_AT.replace(microsecond=123457), None) != plain
+
+
+def test_if_none_match_accepts_lists_and_wildcards():
+    etag = _call_etag(UPDATED_AT, None)
+
+    assert _etag_matches(f'W/"other", {etag}', etag)
+    assert _etag_matches(" * ", etag)
+    assert not _etag_matches('W/"other"', etag)
+
+
+@pytest.mark.asyncio
+async def test_matching_etag_gets_304_without_loading_the_call():
+    business_id = uuid.uuid4()
+    children = "2:2026-03-01 12:05:00+00/0:"
+    session = _Session(
+        SimpleNamespace(business_id=business_id, escalated_to_user_id=None, updated_at=UPDATED_AT, children=children)
+    )
+    owner = User(role=UserRole.owner, business_id=business_id)
+    etag = _call_etag(UPDATED_AT, children)
+
+    response = await get_call(str(uuid.uuid4()), _request(etag), Response(), True, session, owner)
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert len(session.statements) == 1
+    sql = str(session.statements[0].compile(dialect=postgresql.dialect()))
+    assert "count(*)" in sql and "max(call_messages.timestamp)" in sql and "max(call_events.timestamp)" in sql
@@ -0,0 +1,36 @@
+import csv
+import io
+import json
+import uuid
+from datetime import datetime, timezone
+
+from app.db.models import CallStatus
+from app.services.call_export import encode_rows, export_statement
+
+
+def test_ndjson_rows_are_plain_json_lines():
+    call_id = uuid.uuid4()
+    started_at = datetime(2026, 5, 1, 9, 0, tzinfo=timezone.utc)
+    body = encode_rows([(call_id, started_at, CallStatus.escalated, None)], ["id", "started_at", "status", "summary"], "ndjson")
+
+    assert body.endswith("\n")
+    assert json.loads(body) == {
+        "id": str(call_id),
+        "started_at": "2026-05-01T09:00:00+00:00",
+        "status": "escalated",
+        "summary": None,
+    }
+
+
+def test_csv_rows_keep_enum_values_and_nested_json_in_one_cell():
+    body = encode_rows([("turn_latency", CallStatus.completed, {"total_ms": 812.5})], ["a", "b", "c"], "csv")
+
+    assert next(csv.reader(io.StringIO(body))) == ["turn_latency", "completed", '{"total_ms": 812.5}']
+
+
+def test_message_export_is_scoped_to_the_business_and_range():
+    statement = export_statement("messages", str(uuid.uuid4()), datetime(2026, 5, 1), datetime(2026, 6, 1))
+
+    assert [column.key for column in statement.selected_columns][:2] == ["call_id", "id"]
+    assert "calls.business_id" in str(statement)
+    assert "calls.started_at <" in str(statement)
@@ -0,0 +1,16 @@
+from app.services.call_search import _search_statement, highlight
+
+
+def test_snippets_are_escaped_before_matches_are_marked():
+    assert highlight("<script>x</script> wants a ⟦refund⟧ & ⟦credit⟧") == (
+        "&lt;script&gt;x&lt;/script&gt; wants a <mark>refund</mark> &amp; <mark>credit</mark>"
+    )
+
+
+def test_staff_and_cursor_filters_are_only_added_when_used():
+    plain = str(_search_statement(False, False))
+    scoped = str(_search_statement(True, True))
+
+    assert ":staff_user_id" not in plain and ":after_rank" not in plain
+    assert scoped.count(":staff_user_id") == 2
+    assert "(rank, call_id) < (:after_rank, :after_call_id)" in scoped
@@ -0,0 +1,167 @@
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.db.models import Call, CallStatus, User, UserRole
+from app.routers.analytics import series
+from app.services.call_stats import CallAggregates, _add_call, reconcile_daily_stats, stats_day
+
+
+class _Result:
+    def __init__(self, value=None, rows=()):
+        self.value = value
+        self.rows = list(rows)
+        self.rowcount = len(self.rows)
+
+    def scalar_one_or_none(self):
+        return self.value
+
+    def all(self):
+        return self.rows
+
+
+class _Session:
+    """Records executed statements and answers them from a queue of results."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.executed = []
+
+    async def execute(self, statement, params=None):
+        self.executed.append((statement, params))
+        return self.results.pop(0) if self.results else _Result()
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_aggregates_are_applied_to_the_call_row():
+    aggregates = CallAggregates()
+    aggregates.add_turn(0.5)
+    aggregates.add_turn(None)
+    aggregates.add_turn(-0.3)
+    for latency in (400.0, 600.0, 2000.0):
+        aggregates.add_latency(latency)
+    call = Call()
+    aggregates.apply(call)
+
+    assert (call.turn_count, call.customer_message_count, call.ai_message_count) == (3, 3, 3)
+    assert call.sentiment_avg == 0.1
+    assert call.sentiment_min == -0.3
+    assert call.ai_latency_avg_ms == 1000.0
+    assert call.ai_latency_max_ms == 2000.0
+    assert 600.0 < call.ai_latency_p95_ms <= 2000.0
+
+
+def test_call_without_sentiment_or_latency_leaves_them_empty():
+    call = Call()
+    CallAggregates().apply(call)
+
+    assert call.turn_count == 0
+    assert call.sentiment_avg is None and call.sentiment_min is None
+    assert call.ai_latency_p95_ms is None
+
+
+def test_rollup_day_is_the_utc_start_date():
+    late_evening = datetime(2026, 3, 1, 22, 30, tzinfo=timezone(timedelta(hours=-5)))
+
+    assert stats_day(late_evening) == datetime(2026, 3, 2).date()
+    assert stats_day(datetime(2026, 3, 1, 23, 59)) == datetime(2026, 3, 1).date()
+
+
+@pytest.mark.asyncio
+async def test_finished_call_upsert_increments_counters_and_merges_its_reason():
+    call = Call(
+        id=uuid.uuid4(),
+        business_id=uuid.uuid4(),
+        started_at=datetime(2026, 3, 1, 12, tzinfo=timezone.utc),
+        duration_seconds=90,
+        status=CallStatus.escalated,
+    )
+    aggregates = CallAggregates(sentiment_sum=-0.5, sentiment_count=2)
+    session = _Session(_Result({"reason": "Refund dispute"}))
+
+    await _add_call(session, call, aggregates)
+
+    upsert = session.executed[-1][0]
+    sql = _sql(upsert)
+    params = upsert.compile(dialect=postgresql.dialect()).params
+    assert "ON CONFLICT (business_id, day) DO UPDATE" in sql
+    assert "call_count = (call_daily_stats.call_count + excluded.call_count)" in sql
+    assert "escalated_count = (call_daily_stats.escalated_count + excluded.escalated_count)" in sql
+    assert "escalation_reasons = (call_daily_stats.escalation_reasons || jsonb_build_object(" in sql
+    assert "coalesce(CAST(call_daily_stats.escalation_reasons ->> CAST(%(param_1)s AS TEXT) AS INTEGER)" in sql
+    assert params["day"] == date(2026, 3, 1)
+    assert (params["call_count"], params["duration_sum"], params["escalated_count"]) == (1, 90, 1)
+    assert (params["sentiment_sum"], params["sentiment_count"]) == (-0.5, 2)
+    assert params["escalation_reasons"] == {"Refund dispute": 1}
+    assert params["param_1"] == "Refund dispute"
+    assert (params["coalesce_1"], params["coalesce_2"]) == (0, 1)
+
+
+@pytest.mark.asyncio
+async def test_call_without_escalation_leaves_reasons_alone():
+    call = Call(
+        id=uuid.uuid4(),
+        business_id=uuid.uuid4(),
+        started_at=datetime(2026, 3, 1, 12),
+        status=CallStatus.transferred,
+    )
+    session = _Session()
+
+    await _add_call(session, call, CallAggregates())
+
+    assert len(session.executed) == 1
+    sql = _sql(session.executed[0][0])
+    params = session.executed[0][0].compile(dialect=postgresql.dialect()).params
+    assert "escalation_reasons = " not in sql.split("DO UPDATE SET", 1)[1]
+    assert (params["duration_count"], params["transferred_count"]) == (0, 1)
+
+
+@pytest.mark.asyncio
+async def test_reconcile_clears_then_rewrites_the_range_for_one_business():
+    session = _Session(_Result(), _Result(rows=[object(), object()]))
+
+    written = await reconcile_daily_stats(session, date(2026, 3, 1), date(2026, 3, 8), business_id="b1")
+
+    (delete, delete_params), (upsert, upsert_params) = session.executed
+    assert written == 2
+    assert str(delete) == (
+        "DELETE FROM call_daily_stats WHERE day >= :start_day AND day < :end_day AND business_id = :business_id"
+    )
+    assert delete_params == {"start_day": date(2026, 3, 1), "end_day": date(2026, 3, 8), "business_id": "b1"}
+    sql = str(upsert)
+    assert "c.started_at < :end AND c.business_id = :business_id" in sql
+    assert "coalesce(reasons.escalation_reasons, '{}'::jsonb)" in sql
+    assert upsert_params["start"] == datetime(2026, 3, 1, tzinfo=timezone.utc)
+    assert upsert_params["default_reason"] == "Escalated"
+    assert "start_day" not in upsert_params
+
+
+@pytest.mark.asyncio
+async def test_analytics_series_merges_daily_escalation_reasons():
+    business_id = uuid.uuid4()
+    owner = User(role=UserRole.owner, business_id=business_id)
+    rows = [
+        SimpleNamespace(
+            day=date(2026, 3, 2), call_count=4, duration_sum=400, duration_count=4,
+            escalation_reasons={"Refund": 2},
+        ),
+        SimpleNamespace(
+            day=date(2026, 3, 3), call_count=1, duration_sum=0, duration_count=0,
+            escalation_reasons={"Refund": 1, "Angry caller": 1},
+        ),
+    ]
+
+    response = await series(str(business_id), "30d", _Session(_Result(rows=rows)), owner)
+
+    assert [point.count for point in response.call_volume] == [4, 1]
+    assert [point.avg_duration for point in response.duration_by_day] == [100.0, 0.0]
+    assert [(point.reason, point.count) for point in response.escalation_reasons] == [
+        ("Refund", 3),
+        ("Angry caller", 1),
+    ]
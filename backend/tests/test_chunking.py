@@ -0,0 +1,57 @@
+import io
+
+from app.services.chunking import Chunk, chunk_document
+
+DOCUMENT = """# Store guide
+Welcome to Acme. We sell widgets! Call us at 555-0100.
+
+## Returns
+Returns are accepted within 30 days. Items must be unused.
+- Electronics: 15 days only.
+
+## Hours
+Mon-Fri 9am-5pm. Closed on public holidays.
+"""
+
+
+def test_chunks_hold_whole_sentences_under_their_heading_path():
+    chunks = list(chunk_document(DOCUMENT, target_tokens=200))
+    assert chunks == [
+        Chunk("# Store guide\nWelcome to Acme. We sell widgets! Call us at 555-0100.\n\n", "Store guide"),
+        Chunk(
+            "## Returns\nReturns are accepted within 30 days. Items must be unused.\n- Electronics: 15 days only.\n\n",
+            "Store guide > Returns",
+        ),
+        Chunk("## Hours\nMon-Fri 9am-5pm. Closed on public holidays.\n", "Store guide > Hours"),
+    ]
+    assert chunks[2].embedding_input() == "Store guide > Hours\n## Hours\nMon-Fri 9am-5pm. Closed on public holidays."
+
+
+def test_small_targets_split_between_sentences_and_long_sentences_between_words():
+    chunks = [chunk.text for chunk in chunk_document("One two three four. Five six. " + "word " * 50, target_tokens=6)]
+    assert chunks[0] == "One two three four. "
+    assert chunks[1] == "Five six. "
+    assert all(chunk.endswith("word ") for chunk in chunks[2:])
+
+
+def test_streamed_bytes_match_whole_text():
+    text = DOCUMENT + "Crème brûlée is on the menu. " * 40
+    streamed = list(chunk_document(io.BytesIO(text.encode("utf-8")), target_tokens=30, block_size=7))
+    assert streamed == list(chunk_document(text, target_tokens=30))
+
+
+def test_unpunctuated_text_is_cut_between_words_without_losing_any():
+    rows = "\n".join(f"{i},widget {i},serial SN{i:08d},warehouse north" for i in range(6000))
+    chunks = list(chunk_document(io.BytesIO(rows.encode("utf-8")), target_tokens=200))
+    assert len(chunks) > 100
+    assert "".join(chunk.text for chunk in chunks) == rows
+
+
+def test_relisted_document_chunks_the_same_as_the_upload():
+    document = "\n  " + DOCUMENT + "\n## Hours\nSame again.\nSame again.\n\n" + "Crème brûlée. " * 30 + "\n# Empty\n"
+    uploaded = list(chunk_document(document, target_tokens=20))
+    # The knowledge listing concatenates a category's chunks in order.
+    listed = "".join(chunk.text for chunk in uploaded)
+
+    assert listed == document
+    assert list(chunk_document(listed, target_tokens=20)) == uploaded
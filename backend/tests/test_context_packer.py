@@ -0,0 +1,28 @@
+import numpy as np
+
+from app.services.context_packer import RetrievedChunk, mmr_select, pack_context
+from app.services.knowledge_base import chunk_text
+
+
+def test_mmr_skips_near_duplicates():
+    embeddings = np.array([[1.0, 0.0], [0.99, 0.05], [0.6, 0.8]])
+    relevance = np.array([0.95, 0.94, 0.7])
+    assert mmr_select(relevance, embeddings, 2, mmr_lambda=0.5) == [0, 2]
+    assert mmr_select(relevance, embeddings, 2, mmr_lambda=1.0) == [0, 1]
+
+
+def test_pack_context_merges_adjacent_chunks_and_respects_budget():
+    text = " ".join(f"word{i}" for i in range(120))
+    pieces = chunk_text(text, chunk_size=300, overlap=100)
+    chunks = [
+        RetrievedChunk(piece, "faq", index, np.eye(len(pieces))[index], 0.9 - index * 0.01)
+        for index, piece in enumerate(pieces)
+    ]
+    other = RetrievedChunk("Parking is free after 6pm.", "parking", 0, np.ones(len(pieces)), 0.5)
+
+    packed = pack_context([*chunks[:2], other], token_budget=10_000)
+    assert packed[0] == text[: len(pieces[0]) + len(pieces[1]) - 100]
+    assert packed[1] == other.content
+
+    trimmed = pack_context([*chunks[:2], other], token_budget=40)
+    assert len(trimmed) == 1 and text.startswith(trimmed[0]) and len(trimmed[0]) <= 160
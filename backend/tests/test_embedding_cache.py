@@ -0,0 +1,69 @@
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.core.cache import TTLCache
+from app.services.embedding_cache import EmbeddingCache
+from app.services.knowledge_base import embed_text
+
+
+def test_ttl_cache_expiry_and_lru():
+    now = [0.0]
+    cache = TTLCache(max_entries=2, ttl_seconds=10, clock=lambda: now[0])
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    now[0] = 11
+    assert cache.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_request(monkeypatch):
+    monkeypatch.setattr("app.services.embedding_cache.get_binary_redis", lambda: None)
+    cache = EmbeddingCache(max_entries=10, ttl_seconds=60)
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return [0.5, 0.25]
+
+    first, second = await asyncio.gather(
+        cache.get_or_compute("m", "what are your hours", compute),
+        cache.get_or_compute("m", "what are your hours", compute),
+    )
+    again = await cache.get_or_compute("m", "what are your hours", compute)
+    assert calls == 1
+    assert first.dtype == np.float32
+    assert again is first
+    assert not first.flags.writeable
+
+
+class _Embeddings:
+    def __init__(self) -> None:
+        self.inputs: list[str] = []
+
+    async def create(self, model: str, input: str):
+        self.inputs.append(input)
+        return SimpleNamespace(data=[SimpleNamespace(embedding=[1.0, 0.0])])
+
+
+@pytest.mark.asyncio
+async def test_query_is_embedded_verbatim_and_cached_by_normalized_text(monkeypatch):
+    monkeypatch.setattr("app.services.embedding_cache.get_binary_redis", lambda: None)
+    embeddings = _Embeddings()
+    monkeypatch.setattr(
+        "app.services.knowledge_base.get_openai_client", lambda: SimpleNamespace(embeddings=embeddings)
+    )
+    cache = EmbeddingCache(10, 60)
+    monkeypatch.setattr("app.services.knowledge_base.get_embedding_cache", lambda: cache)
+
+    await embed_text("  Is the $20 plan refundable? ")
+    await embed_text("is the 20 plan refundable")
+    assert embeddings.inputs == ["Is the $20 plan refundable?"]
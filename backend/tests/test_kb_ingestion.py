@@ -0,0 +1,89 @@
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.db.models import User, UserRole
+from app.routers.businesses import list_knowledge
+from app.services.chunking import chunk_document
+from app.services.kb_ingestion import content_hash, embed_in_batches, embedding_batches, plan_category
+
+
+def test_plan_keeps_unchanged_chunks_and_replaces_the_rest():
+    kept, moved, stale, duplicate = (uuid.uuid4() for _ in range(4))
+    existing = [
+        (kept, content_hash("opening hours"), 0),
+        (moved, content_hash("parking"), 1),
+        (stale, content_hash("old prices"), 2),
+        (duplicate, content_hash("parking"), 3),
+    ]
+    plan = plan_category(["opening hours", "new prices", "parking", "new prices"], existing)
+
+    assert plan.keep == [kept, moved]
+    assert plan.moved == {moved: 2}
+    assert sorted(plan.remove) == sorted([stale, duplicate])
+    assert plan.add == [(1, "new prices", content_hash("new prices")), (3, "new prices", content_hash("new prices"))]
+
+
+def test_embedding_batches_respect_item_and_token_limits(monkeypatch):
+    monkeypatch.setattr("app.services.kb_ingestion.count_tokens", lambda text: len(text) // 4)
+    texts = ["x" * 400] * 5
+    assert embedding_batches(texts, max_items=2, max_tokens=10_000) == [[0, 1], [2, 3], [4]]
+    assert embedding_batches(texts, max_items=10, max_tokens=250) == [[0, 1], [2, 3], [4]]
+
+
+@pytest.mark.asyncio
+async def test_embed_in_batches_preserves_order(monkeypatch):
+    async def fake_embed_many(texts, business_id=None):
+        return [[float(len(text))] for text in texts]
+
+    monkeypatch.setattr("app.services.kb_ingestion.embed_many", fake_embed_many)
+    progress = []
+
+    async def on_batch(count):
+        progress.append(count)
+
+    texts = ["a" * n for n in range(1, 600)]
+    vectors = await embed_in_batches(texts, "b1", on_batch)
+    assert vectors == [[float(n)] for n in range(1, 600)]
+    assert sum(progress) == len(texts)
+
+
+@pytest.mark.asyncio
+async def test_listing_returns_the_uploaded_document():
+    document = "# FAQ\nDo you deliver? Yes.\n\n## Parking\nFree after 6pm.\nFree after 6pm.\n"
+    document += "Ask us anything. " * 20
+    rows: dict[uuid.UUID, tuple[int, str]] = {}
+
+    def upload(text: str) -> None:
+        chunks = [chunk.text for chunk in chunk_document(text, target_tokens=12)]
+        existing = [(row_id, content_hash(content), index) for row_id, (index, content) in rows.items()]
+        plan = plan_category(chunks, existing)
+        for row_id in plan.remove:
+            del rows[row_id]
+        for row_id, index in plan.moved.items():
+            rows[row_id] = (index, rows[row_id][1])
+        for index, content, _ in plan.add:
+            rows[uuid.uuid4()] = (index, content)
+
+    class Session:
+        async def execute(self, statement):
+            # Evaluate the listing's string_agg over the stored rows.
+            compiled = statement.compile(dialect=postgresql.dialect())
+            aggregate = "string_agg(knowledge_bases.content, %(param_1)s ORDER BY knowledge_bases.chunk_index)"
+            assert aggregate in str(compiled)
+            content = compiled.params["param_1"].join(content for _, content in sorted(rows.values()))
+            row = SimpleNamespace(category="faq", content=content, updated_at=datetime.now(timezone.utc))
+            return SimpleNamespace(all=lambda: [row])
+
+    business_id = uuid.uuid4()
+    owner = User(role=UserRole.owner, business_id=business_id)
+
+    upload(document)
+    listed = (await list_knowledge(str(business_id), Session(), owner))[0].content
+    assert listed == document
+
+    upload(listed)
+    assert (await list_knowledge(str(business_id), Session(), owner))[0].content == document
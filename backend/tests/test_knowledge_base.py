@@ -0,0 +1,12 @@
+import numpy as np
+import pytest
+
+from app.services.knowledge_base import COMPACT_DIMENSIONS, compact_embedding
+
+
+def test_compact_embedding_is_normalized_prefix():
+    vector = np.random.default_rng(0).normal(size=1536)
+    compact = compact_embedding(vector)
+    assert compact.shape == (COMPACT_DIMENSIONS,)
+    assert np.linalg.norm(compact) == pytest.approx(1.0, abs=1e-5)
+    assert np.allclose(compact * np.linalg.norm(vector[:COMPACT_DIMENSIONS]), vector[:COMPACT_DIMENSIONS], atol=1e-5)
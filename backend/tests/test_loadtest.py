@@ -0,0 +1,107 @@
+import asyncio
+import os
+import socket
+
+import numpy as np
+import pytest
+from nacl.signing import SigningKey
+
+from app.core.config import get_settings
+from app.loadtest.audio import encode_mulaw, synthetic_utterance
+from app.loadtest.fakes import FakeVendors
+from app.loadtest.harness import LoadTest, LoadTestConfig
+from app.loadtest.latency import LatencyModel, summarize
+from app.services import telephony
+from app.services.vad import MULAW_TO_PCM
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _fast_latencies() -> dict[str, LatencyModel]:
+    return {vendor: LatencyModel.parse("fixed:1") for vendor in ("openai", "deepgram", "elevenlabs", "telnyx")}
+
+
+def test_latency_spec_parsing():
+    assert LatencyModel.parse("fixed:120").sample_ms() == 120
+    uniform = LatencyModel.parse("uniform:10:20")
+    assert 10 <= uniform.sample_ms() <= 20
+    with pytest.raises(ValueError):
+        LatencyModel.parse("gamma:1")
+
+
+def test_summarize_percentiles():
+    report = summarize([float(i) for i in range(1, 101)])
+    assert report["count"] == 100
+    assert report["p50"] == pytest.approx(50.5)
+    assert report["max"] == 100
+    assert summarize([]) == {"count": 0}
+
+
+def test_mulaw_encode_roundtrip():
+    samples = np.array([0, 500, -500, 12000, -30000])
+    decoded = MULAW_TO_PCM[np.frombuffer(encode_mulaw(samples), dtype=np.uint8)]
+    assert np.all(np.abs(decoded - samples) <= np.maximum(16, np.abs(samples) * 0.04))
+
+
+@pytest.mark.asyncio
+async def test_telnyx_streaming_start_reaches_the_fake(monkeypatch):
+    started: asyncio.Queue[tuple[str, str]] = asyncio.Queue()
+
+    async def on_stream_start(call_control_id: str, stream_url: str) -> None:
+        await started.put((call_control_id, stream_url))
+
+    fakes = FakeVendors(_free_port(), _fast_latencies(), on_stream_start)
+    await fakes.start()
+    monkeypatch.setenv("TELNYX_API_BASE", fakes.base_url)
+    get_settings.cache_clear()
+    monkeypatch.setattr(telephony, "_client", None)
+    try:
+        await telephony.start_media_stream("call-1", "wss://example.test/media")
+        assert await asyncio.wait_for(started.get(), timeout=5) == ("call-1", "wss://example.test/media")
+    finally:
+        await fakes.stop()
+        get_settings.cache_clear()
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(
+    not os.environ.get("LOADTEST_SMOKE"), reason="set LOADTEST_SMOKE=1 with a migrated DATABASE_URL and REDIS_URL"
+)
+async def test_one_call_end_to_end_against_fakes(monkeypatch):
+    from app.scripts.loadtest_runner import InProcessServer, _seed_business, _server_env
+
+    signing_key = SigningKey.generate()
+    port = _free_port()
+    target = f"http://127.0.0.1:{port}"
+    config = LoadTestConfig(
+        target_url=target,
+        to_number="+15550000099",
+        calls=1,
+        concurrency=1,
+        turns=1,
+        turn_timeout=20,
+        utterances=[synthetic_utterance()],
+    )
+    load_test = LoadTest(config, signing_key)
+    fakes = FakeVendors(_free_port(), _fast_latencies(), load_test.on_stream_start)
+    await fakes.start()
+    for key, value in _server_env(fakes.base_url, target, signing_key).items():
+        monkeypatch.setenv(key, value)
+    get_settings.cache_clear()
+    monkeypatch.setattr(telephony, "_client", None)
+    server = InProcessServer(port)
+    try:
+        await server.start()
+        await asyncio.wrap_future(server.run(_seed_business(config.to_number)))
+        await load_test.run()
+        report = load_test.report()
+        assert report["calls"] == {"total": 1, "failed": 0}, report["errors"]
+        assert report["turn_latency_ms"]["count"] == 1
+    finally:
+        server.stop()
+        await fakes.stop()
+        get_settings.cache_clear()
@@ -0,0 +1,29 @@
+from app.core.metrics import Counter, Gauge, Histogram, Registry, render
+
+
+def _worker(pid: int, frames: int, active: int, latency: float) -> dict:
+    registry = Registry()
+    Counter("frames_total", "Frames.", ("direction",), registry=registry).labels("inbound").inc(frames)
+    Gauge("active_calls", "Active.", registry=registry).set_function(lambda: active)
+    Histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0), registry=registry).observe(latency)
+    snapshot = registry.snapshot()
+    snapshot["pid"] = pid
+    return snapshot
+
+
+def test_render_merges_worker_snapshots():
+    text = render([_worker(1, 3, 2, 0.05), _worker(2, 4, 5, 0.5)])
+    assert "# TYPE frames_total counter" in text
+    assert 'frames_total{direction="inbound"} 7.0' in text
+    assert 'active_calls{worker="1"} 2.0' in text
+    assert 'active_calls{worker="2"} 5.0' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 2' in text
+    assert "latency_seconds_count 2" in text
+
+
+def test_label_values_are_escaped():
+    registry = Registry()
+    Counter("errors_total", "Errors.", ("route",), registry=registry).labels('a"b\\c').inc()
+    assert 'errors_total{route="a\\"b\\\\c"} 1.0' in render([registry.snapshot()])
@@ -0,0 +1,123 @@
+import asyncio
+
+import httpx
+import openai
+import pytest
+
+from app.services.openai_gateway import Budget, OpenAIGateway, OpenAIUnavailable
+
+
+def _gateway(deadline: float = 1.0, attempts: int = 3, hedge: bool = True) -> OpenAIGateway:
+    return OpenAIGateway({"test": Budget(deadline, attempts, hedge)}, max_concurrency=4, tenant_concurrency=2)
+
+
+def _rate_limited() -> openai.RateLimitError:
+    response = httpx.Response(429, request=httpx.Request("POST", "https://api.openai.com/v1/responses"))
+    return openai.RateLimitError("rate limited", response=response, body=None)
+
+
+@pytest.mark.asyncio
+async def test_retries_retryable_errors():
+    calls = 0
+
+    async def request():
+        nonlocal calls
+        calls += 1
+        if calls < 3:
+            raise _rate_limited()
+        return "ok"
+
+    assert await _gateway().call("test", request) == "ok"
+    assert calls == 3
+
+
+@pytest.mark.asyncio
+async def test_deadline_raises_unavailable():
+    async def request():
+        await asyncio.sleep(1)
+
+    with pytest.raises(OpenAIUnavailable):
+        await _gateway(deadline=0.05).call("test", request)
+
+
+@pytest.mark.asyncio
+async def test_hedges_request_slower_than_p95():
+    gateway = _gateway()
+
+    async def fast():
+        return "fast"
+
+    for _ in range(20):
+        await gateway.call("test", fast)
+
+    calls = 0
+
+    async def first_slow():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await asyncio.sleep(1)
+            return "slow"
+        return "hedged"
+
+    assert await gateway.call("test", first_slow) == "hedged"
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_stream_text_yields_deltas():
+    class Event:
+        def __init__(self, type_: str, delta: str = "") -> None:
+            self.type = type_
+            self.delta = delta
+
+    class Stream:
+        def __init__(self) -> None:
+            self._events = iter(
+                [
+                    Event("response.created"),
+                    Event("response.output_text.delta", "Hi"),
+                    Event("response.output_text.delta", " there"),
+                    Event("response.completed"),
+                ]
+            )
+
+        def __aiter__(self):
+            return self
+
+        async def __anext__(self):
+            try:
+                return next(self._events)
+            except StopIteration:
+                raise StopAsyncIteration from None
+
+        async def close(self) -> None:
+            pass
+
+    async def open_stream():
+        return Stream()
+
+    parts = [delta async for delta in _gateway().stream_text("test", open_stream, tenant="b1")]
+    assert "".join(parts) == "Hi there"
+
+
+@pytest.mark.asyncio
+async def test_retry_backoff_does_not_hold_the_tenant_slot(monkeypatch):
+    gateway = OpenAIGateway({"test": Budget(2.0, 2, False)}, max_concurrency=4, tenant_concurrency=1)
+    monkeypatch.setattr(gateway, "_backoff", lambda attempt: 0.2)
+    failed = asyncio.Event()
+
+    async def flaky():
+        if not failed.is_set():
+            failed.set()
+            raise _rate_limited()
+        return "retried"
+
+    async def quick():
+        return "quick"
+
+    retrying = asyncio.create_task(gateway.call("test", flaky, tenant="t1"))
+    await failed.wait()
+    # The other request of the same tenant runs during the first one's backoff.
+    assert await asyncio.wait_for(gateway.call("test", quick, tenant="t1"), timeout=0.1) == "quick"
+    assert await retrying == "retried"
@@ -0,0 +1,21 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trips_its_sort_key():
+    started_at = datetime(2026, 5, 1, 12, 30, tzinfo=timezone.utc)
+    call_id = uuid.uuid4()
+    cursor = encode_cursor(started_at, call_id)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, datetime.fromisoformat, uuid.UUID) == (started_at, call_id)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor("2026-05-01"), encode_cursor("yesterday", "x")])
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, datetime.fromisoformat, uuid.UUID)
@@ -0,0 +1,82 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core import security
+from app.core.metrics import PASSWORD_HASH_PENDING
+from app.core.security import PasswordHasher, PasswordHasherBusy
+
+
+@pytest.mark.asyncio
+async def test_hashes_run_off_the_event_loop():
+    hasher = PasswordHasher(workers=1, max_pending=4)
+    try:
+        assert await hasher.run(threading.current_thread) is not threading.current_thread()
+    finally:
+        hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_full_queue_is_rejected_instead_of_waiting():
+    hasher = PasswordHasher(workers=1, max_pending=1)
+    release = threading.Event()
+    try:
+        first = asyncio.create_task(hasher.run(release.wait))
+        await asyncio.sleep(0)
+        with pytest.raises(PasswordHasherBusy):
+            await hasher.run(lambda: None)
+        release.set()
+        assert await first is True
+        assert hasher.pending == 0
+    finally:
+        release.set()
+        hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_callers_keep_their_slot_until_the_hash_finishes():
+    hasher = PasswordHasher(workers=1, max_pending=1)
+    release = threading.Event()
+    try:
+        caller = asyncio.create_task(hasher.run(release.wait))
+        await asyncio.sleep(0.05)
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+
+        assert hasher.pending == 1
+        with pytest.raises(PasswordHasherBusy):
+            await hasher.run(lambda: None)
+        release.set()
+        await asyncio.sleep(0.05)
+        assert hasher.pending == 0
+    finally:
+        release.set()
+        hasher.shutdown()
+
+
+def test_pending_gauge_reads_zero_after_shutdown():
+    security.get_password_hasher()
+    security.shutdown_password_hasher()
+
+    assert PASSWORD_HASH_PENDING.snapshot()["samples"] == [[[], 0.0]]
+
+
+def test_hash_with_other_rounds_is_upgraded_on_verify(monkeypatch):
+    monkeypatch.setenv("PASSWORD_HASH_ROUNDS", "1000")
+    security.get_settings.cache_clear()
+    security.get_pwd_context.cache_clear()
+    try:
+        old_hash = security.hash_password("s3cret-password")
+        monkeypatch.setenv("PASSWORD_HASH_ROUNDS", "2000")
+        security.get_settings.cache_clear()
+        security.get_pwd_context.cache_clear()
+
+        assert security.verify_and_update_password("wrong", old_hash) == (False, None)
+        valid, new_hash = security.verify_and_update_password("s3cret-password", old_hash)
+        assert valid and new_hash.startswith("$pbkdf2-sha256$2000$")
+        assert security.verify_and_update_password("s3cret-password", new_hash) == (True, None)
+    finally:
+        security.get_settings.cache_clear()
+        security.get_pwd_context.cache_clear()
@@ -0,0 +1,76 @@
+import uuid
+
+import pytest
+
+from app.db.models import User, UserRole
+from app.services import principal_cache
+
+
+@pytest.fixture(autouse=True)
+def local_only(monkeypatch):
+    monkeypatch.setattr("app.services.principal_cache.redis_enabled", lambda: False)
+    principal_cache._local.clear()
+
+
+def _owner(token_version: int = 0) -> User:
+    return User(
+        id=uuid.uuid4(),
+        email="owner@example.com",
+        role=UserRole.owner,
+        business_id=uuid.uuid4(),
+        phone=None,
+        push_token="device-token",
+        token_version=token_version,
+    )
+
+
+@pytest.mark.asyncio
+async def test_cached_principal_is_a_detached_copy_without_the_password_hash():
+    user = _owner()
+    user.password_hash = "secret-hash"
+    await principal_cache.cache_principal(user)
+
+    cached = await principal_cache.get_principal(user.id, 0)
+
+    assert cached is not user
+    assert (cached.id, cached.role, cached.business_id, cached.push_token) == (
+        user.id,
+        UserRole.owner,
+        user.business_id,
+        "device-token",
+    )
+    assert cached.password_hash is None
+
+
+@pytest.mark.asyncio
+async def test_principals_are_keyed_by_token_version_and_invalidated():
+    user = _owner(token_version=2)
+    await principal_cache.cache_principal(user)
+
+    assert await principal_cache.get_principal(user.id, 1) is None
+    assert await principal_cache.get_principal(user.id, 2) is not None
+
+    await principal_cache.invalidate_principal(user)
+
+    assert await principal_cache.get_principal(user.id, 2) is None
+
+
+@pytest.mark.asyncio
+async def test_revoking_tokens_rejects_the_cached_old_version():
+    class Session:
+        commits = 0
+
+        async def commit(self):
+            self.commits += 1
+
+    user = _owner(token_version=2)
+    await principal_cache.cache_principal(user)
+    session = Session()
+
+    await principal_cache.revoke_tokens(session, user)
+
+    assert (user.token_version, session.commits) == (3, 1)
+    assert await principal_cache.get_principal(user.id, 2) is None
+    await principal_cache.cache_principal(user)
+    assert await principal_cache.get_principal(user.id, 2) is None
+    assert await principal_cache.get_principal(user.id, 3) is not None
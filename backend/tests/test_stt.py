@@ -0,0 +1,111 @@
+import asyncio
+import socket
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import get_settings
+from app.loadtest.audio import frames, silence, synthetic_utterance
+from app.loadtest.fakes import CALLER_SCRIPT, FakeVendors
+from app.loadtest.latency import LatencyModel
+from app.services.stt import HAS_DEEPGRAM, DeepgramSTTStream, STTSessionManager, _environment
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_base_url_maps_to_socket_environment():
+    environment = _environment("http://127.0.0.1:9000/")
+    assert environment.base == "http://127.0.0.1:9000"
+    assert environment.production == "ws://127.0.0.1:9000"
+    assert _environment("api.example.com").production == "wss://api.example.com"
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not HAS_DEEPGRAM, reason="deepgram-sdk not installed")
+async def test_pooled_stream_transcribes_against_fake_deepgram(monkeypatch):
+    latencies = {vendor: LatencyModel.parse("fixed:1") for vendor in ("openai", "deepgram", "elevenlabs", "telnyx")}
+
+    async def on_stream_start(call_control_id: str, stream_url: str) -> None:
+        return
+
+    fakes = FakeVendors(_free_port(), latencies, on_stream_start)
+    await fakes.start()
+    monkeypatch.setenv("DEEPGRAM_BASE_URL", fakes.base_url)
+    get_settings.cache_clear()
+    manager = STTSessionManager(pool_size=1, max_idle_seconds=60)
+    audio: asyncio.Queue[bytes] = asyncio.Queue()
+    stream = DeepgramSTTStream(audio, manager)
+    try:
+        await manager.warm()
+        await stream.start()
+        assert stream.enabled
+        for frame in frames(synthetic_utterance(1.0) + silence(0.6)):
+            await audio.put(frame)
+        final = None
+        while final is None:
+            event = await stream.get_next_event(timeout=5)
+            assert event is not None
+            if event["type"] == "transcript" and event["is_final"]:
+                final = event["text"]
+        assert final == CALLER_SCRIPT[0]
+    finally:
+        await stream.close()
+        await manager.close()
+        await fakes.stop()
+        get_settings.cache_clear()
+
+
+@pytest.mark.asyncio
+async def test_final_only_releases_the_audio_it_covers():
+    class Manager:
+        enabled = True
+
+    stream = DeepgramSTTStream(asyncio.Queue(), Manager())
+    frame = b"\xff" * 160  # 20 ms of 8 kHz mu-law
+    for _ in range(10):
+        stream._remember(frame)
+
+    final = SimpleNamespace(
+        is_final=True, start=0.0, duration=0.1, channel=SimpleNamespace(alternatives=[SimpleNamespace(transcript="Hi")])
+    )
+    await stream._on_transcript(final)
+    # The final covers 100 ms; the 100 ms sent after it still belong to the next phrase.
+    assert stream._replay_bytes == 5 * 160
+
+    # After a reconnect the socket's clock starts at the replayed audio.
+    stream._socket_origin = stream._replay_start
+    await stream._on_transcript(SimpleNamespace(**{**vars(final), "start": 0.04, "duration": 0.02}))
+    assert stream._replay_bytes == 2 * 160
+
+
+@pytest.mark.asyncio
+async def test_refresh_replaces_dropped_and_ageing_idle_sockets():
+    class Live:
+        def __init__(self, age: float = 0.0, closed: bool = False):
+            self.opened_at = time.monotonic() - age
+            self.closed = closed
+            self.finished = False
+
+        async def finish(self):
+            self.finished = True
+
+    class Manager(STTSessionManager):
+        enabled = True
+
+        async def _open(self):
+            return Live()
+
+    manager = Manager(pool_size=3, max_idle_seconds=300)
+    fresh, ageing, dropped = Live(age=10), Live(age=250), Live(closed=True)
+    manager._idle.extend([fresh, ageing, dropped])
+
+    await manager.refresh(max_age=240)
+
+    assert len(manager._idle) == 3 and manager._idle[0] is fresh
+    assert ageing not in manager._idle and dropped not in manager._idle
+    assert ageing.finished and dropped.finished and not fresh.finished
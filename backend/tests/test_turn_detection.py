@@ -0,0 +1,180 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.db.models import Call
+from app.routers.media import _send_tts_audio
+from app.services import call_handler
+from app.services.call_handler import _commit_early_turn, _EarlyTurn, _finish_turn_timing, _Reply, _uncommitted_tail
+from app.services.call_stats import CallAggregates
+from app.services.media_bridge import push_tts_audio, register_call, unregister_call
+from app.services.observability import TurnTimer, current_turn
+from app.services.turn_detection import TurnEndPredictor, completeness_score, normalize_utterance
+from app.services.vad import EnergyVAD, MULAW_TO_PCM
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_commits_complete_question_after_short_silence():
+    clock = FakeClock()
+    predictor = TurnEndPredictor(clock=clock)
+    predictor.observe_interim("What are your hours?")
+    clock.now += 0.4
+    assert predictor.should_commit(silence_ms=300)
+
+
+def test_holds_trailing_conjunction():
+    clock = FakeClock()
+    predictor = TurnEndPredictor(clock=clock)
+    predictor.observe_interim("I want to book a table and")
+    clock.now += 0.4
+    assert not predictor.should_commit(silence_ms=300)
+
+
+def test_never_commits_while_speaking():
+    clock = FakeClock()
+    predictor = TurnEndPredictor(clock=clock)
+    predictor.observe_interim("What are your hours?")
+    clock.now += 1
+    assert not predictor.should_commit(silence_ms=0)
+
+
+def test_changed_interim_resets_stability():
+    clock = FakeClock()
+    predictor = TurnEndPredictor(clock=clock)
+    assert predictor.observe_interim("what are")
+    assert not predictor.observe_interim("What are")
+    clock.now += 1
+    assert predictor.observe_interim("what are your hours")
+    assert predictor.stability_score() == 0
+
+
+def test_normalize_and_completeness():
+    assert normalize_utterance("Hi, there!") == "hi there"
+    assert completeness_score("my order number is") == 0
+
+
+def test_energy_vad_tracks_silence_in_audio_time():
+    assert MULAW_TO_PCM[0xFF] == 0
+    vad = EnergyVAD(sample_rate=8000)
+    assert vad.process(bytes([0x00]) * 160)
+    assert vad.silence_ms == 0
+    vad.process(bytes([0xFF]) * 160)
+    vad.process(bytes([0xFF]) * 160)
+    assert vad.silence_ms == 40
+
+
+def test_uncommitted_tail_skips_punctuation_and_abbreviations():
+    committed = normalize_utterance("I need a - uh - refund")
+    assert _uncommitted_tail("I need a - uh - refund for order 42", committed) == "for order 42"
+    committed = normalize_utterance("Hi, it is 5 p.m.")
+    assert _uncommitted_tail("Hi, it is 5 p.m. and my order is late", committed) == "and my order is late"
+    assert _uncommitted_tail("I need a... refund", normalize_utterance("I need a")) == "refund"
+    assert _uncommitted_tail("Where is my order", normalize_utterance("What is")) == "Where is my order"
+
+
+@pytest.mark.asyncio
+async def test_turn_timing_waits_for_first_frame_off_the_live_loop(monkeypatch):
+    recorded = []
+
+    @asynccontextmanager
+    async def session_factory():
+        yield None
+
+    async def record(session, call_id, timer):
+        recorded.append((call_id, timer.stages["first_outbound_frame"]))
+
+    monkeypatch.setattr(call_handler, "AsyncSessionLocal", session_factory)
+    monkeypatch.setattr(call_handler, "record_turn_latency", record)
+    timer = TurnTimer()
+    aggregates = CallAggregates()
+    task = asyncio.create_task(_finish_turn_timing("call-1", timer, aggregates))
+    await asyncio.sleep(0.01)
+    assert not task.done() and not aggregates.latencies_ms
+
+    timer.mark("first_outbound_frame")
+    timer.first_frame_sent.set()
+    await task
+    assert aggregates.latencies_ms == [timer.stages["first_outbound_frame"]]
+    assert recorded == [("call-1", timer.stages["first_outbound_frame"])]
+
+
+@pytest.mark.asyncio
+async def test_early_reply_is_committed_with_its_turn_timing(monkeypatch):
+    class Session:
+        def __init__(self):
+            self.added = []
+
+        def add(self, row):
+            self.added.append(row)
+
+        async def commit(self):
+            pass
+
+    class TTS:
+        played = b""
+        turn = None
+
+        async def play_audio(self, audio):
+            # The call's TTS sink tags each frame with this turn.
+            self.played, self.turn = audio, current_turn()
+
+    async def not_sensitive(session, business_id, text, metadata):
+        return False, None, 0.0
+
+    async def finish(call_id, timer, aggregates):
+        finished.append((call_id, timer.turn))
+
+    finished = []
+    monkeypatch.setattr(call_handler, "detect_sensitive", not_sensitive)
+    monkeypatch.setattr(call_handler, "_finish_turn_timing", finish)
+    call = Call(id=uuid.uuid4(), business_id=uuid.uuid4())
+    task = asyncio.get_running_loop().create_future()
+    task.set_result(_Reply("We open at nine.", audio=b"\xff" * 160))
+    early = _EarlyTurn("What time do you open?", task, TurnTimer())
+    session, tts, aggregates, timing_tasks = Session(), TTS(), CallAggregates(), set()
+
+    assert await _commit_early_turn(session, call, early, 3, {}, tts, aggregates, timing_tasks)
+    await asyncio.gather(*timing_tasks)
+
+    assert [message.content for message in session.added] == ["What time do you open?", "We open at nine."]
+    assert tts.played == b"\xff" * 160
+    assert tts.turn is early.timer
+    assert aggregates.turns == 1
+    assert finished == [(str(call.id), 3)]
+
+
+@pytest.mark.asyncio
+async def test_first_frame_is_stamped_on_the_turns_own_reply_audio():
+    class WebSocket:
+        def __init__(self):
+            self.stamped_at_send: list[bool] = []
+
+        async def send_text(self, text):
+            # Whether the new turn was already stamped before this frame went out.
+            self.stamped_at_send.append(turn.first_frame_sent.is_set())
+
+    previous, turn = TurnTimer(), TurnTimer()
+    previous.first_frame_sent.set()
+    register_call("call-frames")
+    try:
+        await push_tts_audio("call-frames", b"\x01", previous)
+        await push_tts_audio("call-frames", b"\x02", previous)
+        await push_tts_audio("call-frames", b"\x03", turn)
+        websocket = WebSocket()
+        sender = asyncio.create_task(_send_tts_audio(websocket, "call-frames"))
+        await asyncio.wait_for(turn.first_frame_sent.wait(), timeout=1)
+        sender.cancel()
+    finally:
+        unregister_call("call-frames")
+
+    assert websocket.stamped_at_send == [False, False, False]
+    assert "first_outbound_frame" in turn.stages
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from app.core.cache import TTLCache
+from app.services.vector_index import FusionWeights, VectorIndexCache, _BusinessIndex, reciprocal_rank_fusion
+
+
+def _rows(count: int, dims: int = 16) -> list[tuple[str, str, int, np.ndarray]]:
+    vectors = np.random.default_rng(1).normal(size=(count, dims)).astype(np.float32)
+    return [(f"chunk-{i}", "faq" if i % 2 else "hours", i, vectors[i]) for i in range(count)]
+
+
+def _contents(chunks) -> list[str]:
+    return [chunk.content for chunk in chunks]
+
+
+def test_top_k_matches_exact_l2_order():
+    rows = _rows(200)
+    index = _BusinessIndex.build(1, rows)
+    query = np.random.default_rng(2).normal(size=16).astype(np.float32)
+
+    distances = [float(np.linalg.norm(vector - query)) for _, _, _, vector in rows]
+    expected = [rows[i][0] for i in np.argsort(distances)[:5]]
+    top = index.top_k(query, 5)
+    assert _contents(top) == expected
+    best = rows[int(np.argmin(distances))]
+    assert top[0].chunk_index == best[2] and top[0].category == best[1]
+    cosine = float(best[3] @ query / (np.linalg.norm(best[3]) * np.linalg.norm(query)))
+    assert abs(top[0].relevance - cosine) < 1e-5
+
+    faq = [i for i in np.argsort(distances) if rows[i][1] == "faq"][:3]
+    assert _contents(index.top_k(query, 3, category="faq")) == [rows[i][0] for i in faq]
+    assert index.top_k(query, 3, category="missing") == []
+    assert len(index.top_k(query, 500)) == 200
+
+
+def test_cache_evicts_least_recently_used_within_budget():
+    first, second, third = (_BusinessIndex.build(1, _rows(10)) for _ in range(3))
+    cache = VectorIndexCache(max_rows=100, budget_bytes=first.nbytes * 2)
+
+    assert cache.put("a", first) and cache.put("b", second)
+    assert cache._get("a", 1) is first
+    assert cache.put("c", third)
+    assert cache._get("b", 1) is None
+    assert len(cache) == 2 and cache.nbytes == first.nbytes * 2
+
+    # A newer knowledge base version drops the stale index.
+    assert cache._get("a", 2) is None
+    assert len(cache) == 1
+
+    assert not cache.put("huge", _BusinessIndex.build(1, _rows(100)))
+
+
+def test_reciprocal_rank_fusion_weights_each_ranking():
+    fused = reciprocal_rank_fusion([(np.array([0, 1, 2]), 1.0), (np.array([2, 3]), 1.0)], rrf_k=60)
+    assert fused.tolist()[0] == 2
+    assert reciprocal_rank_fusion([(np.array([0, 1]), 1.0), (np.array([1]), 0.0)], rrf_k=60).tolist() == [0, 1]
+
+
+def test_hybrid_search_surfaces_exact_term_matches():
+    rows = _rows(50)
+    rows[37] = ("The SKU ZX-4410 costs $149.", "faq", 37, rows[37][3])
+    index = _BusinessIndex.build(1, rows)
+    query = np.random.default_rng(3).normal(size=16).astype(np.float32)
+
+    assert "The SKU ZX-4410 costs $149." not in _contents(index.top_k(query, 3))
+    hybrid = index.top_k(query, 3, query="how much is the zx-4410", weights=FusionWeights(1.0, 2.0))
+    assert hybrid[0].content == "The SKU ZX-4410 costs $149."
+
+
+@pytest.mark.asyncio
+async def test_load_state_is_not_kept_per_business(monkeypatch):
+    cache = VectorIndexCache(max_rows=5, budget_bytes=1 << 20)
+
+    async def version(business_id):
+        return 1
+
+    async def load(session, business_id, version):
+        cache._oversized.set(business_id, version)
+        return None
+
+    monkeypatch.setattr("app.services.vector_index.get_kb_version", version)
+    monkeypatch.setattr(cache, "_load", load)
+    cache._oversized = TTLCache(3, 60)
+    for business in range(10):
+        assert await cache.search(None, f"b{business}", np.zeros(16, dtype=np.float32), 3) is None
+    assert cache._loading == {}
+    assert len(cache._oversized) == 3